@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+from generators import long_format_data
+
+from twinn_ml_interface.input_data import InputData
+
+# The executor benchmarks use the dummy model of the tests
+sys.path.append(str(Path(__file__).parents[1] / "tests"))
+
+# (number of unit tags, rows per unit tag): few long series, and many short ones
+SIZES = [(10, 100_000), (1_000, 1_000)]
+
+
+@pytest.fixture(scope="session", params=SIZES, ids=lambda size: f"{size[0]}tags-{size[1]}rows")
+def long_df(request):
+    n_tags, rows_per_tag = request.param
+    return long_format_data(n_tags, rows_per_tag)
+
+
+@pytest.fixture(scope="session")
+def input_data(long_df):
+    return InputData.from_long_df(long_df)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+
+def long_format_data(
+    n_tags: int,
+    rows_per_tag: int,
+    freq: str = "1min",
+    tags_per_unit: int = 4,
+    shuffle: bool = True,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Generate synthetic data in long format, with the columns TIME, ID, TYPE and VALUE.
+
+    Args:
+        n_tags (int): number of unit tags.
+        rows_per_tag (int): number of timestamps per unit tag.
+        freq (str, optional): frequency of the timestamps. Defaults to "1min".
+        tags_per_unit (int, optional): number of tags per unit. Defaults to 4.
+        shuffle (bool, optional): Whether to shuffle the rows, like data that is combined from
+            several sources. Defaults to True, False orders by time and then unit tag.
+        seed (int, optional): seed of the random values. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: the data, with n_tags * rows_per_tag rows
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-01", periods=rows_per_tag, freq=freq, tz="UTC")
+    keys = np.arange(n_tags)
+    df = pd.DataFrame(
+        {
+            "TIME": np.repeat(times, n_tags),
+            "ID": np.tile([f"UNIT{key // tags_per_unit}" for key in keys], rows_per_tag),
+            "TYPE": np.tile([f"TAG{key % tags_per_unit}" for key in keys], rows_per_tag),
+            "VALUE": rng.normal(size=n_tags * rows_per_tag),
+        }
+    )
+    if shuffle:
+        df = df.sample(frac=1, random_state=seed, ignore_index=True)
+    return df
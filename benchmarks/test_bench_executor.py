@@ -0,0 +1,33 @@
+import tempfile
+from pathlib import Path
+
+import pytest
+from dummy_model import DummyModel
+from generators import long_format_data
+
+from twinn_ml_interface.mocks import ConfigurationMock, ExecutorMock, LocalConfig
+from twinn_ml_interface.objectmodels import UnitTag
+
+
+@pytest.fixture(scope="module")
+def executor():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "data.parquet"
+        long_format_data(n_tags=100, rows_per_tag=10_000).to_parquet(path)
+        local_config = LocalConfig(
+            DummyModel, path, path, directory, "model", Path(directory) / "predictions.parquet"
+        )
+        target = UnitTag.from_string("UNIT0:TAG0")
+        config = ConfigurationMock(str(target), "UNIT0", {}, [], [target])
+        yield ExecutorMock(local_config, config)
+
+
+def test_train_flow(benchmark, executor):
+    performance_value = benchmark(executor.run_train_flow)
+    assert performance_value is not None
+
+
+def test_predict_flow(benchmark, executor):
+    executor.run_train_flow()
+    benchmark(executor.run_predict_flow)
+    assert Path(executor.local_config.predictions_path).exists()
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+import pandas as pd
+
+from twinn_ml_interface.input_data import InputData, concat, take_slice
+
+
+def test_from_long_df(benchmark, long_df):
+    result = benchmark(InputData.from_long_df, long_df)
+    assert len(result) == long_df.groupby(["ID", "TYPE"]).ngroups
+
+
+def test_from_sorted_long_df(benchmark, long_df):
+    sorted_df = long_df.sort_values(["ID", "TYPE", "TIME"], ignore_index=True)
+    result = benchmark(InputData.from_long_df, sorted_df, assume_sorted=True)
+    assert result.unit_tags == InputData.from_long_df(long_df).unit_tags
+
+
+def test_to_long_format(benchmark, input_data):
+    result = benchmark(input_data.to_long_format)
+    assert len(result) == sum(len(df) for df in input_data.values())
+
+
+def test_concat(benchmark, input_data):
+    middle = input_data.min_datetime + (input_data.max_datetime - input_data.min_datetime) / 2
+    first = take_slice(input_data, input_data.min_datetime, middle)
+    second = take_slice(input_data, middle, input_data.max_datetime + timedelta(seconds=1))
+
+    result = benchmark(concat, first, second)
+    assert result.unit_tags == input_data.unit_tags
+
+
+def test_take_slice(benchmark, input_data):
+    start = input_data.min_datetime + timedelta(hours=1)
+    result = benchmark(take_slice, input_data, start, start + timedelta(hours=6))
+    assert result.min_datetime >= start
+
+
+def test_equals(benchmark, input_data):
+    # Fresh objects every round, so nothing that is cached by the first round is reused
+    def setup():
+        left = InputData({key: df.copy() for key, df in input_data.items()})
+        right = InputData({key: df.copy() for key, df in input_data.items()})
+        return (left, right), {}
+
+    assert benchmark.pedantic(InputData.__eq__, setup=setup, rounds=10)
+
+
+def test_validation(benchmark, input_data):
+    mapping = dict(input_data)
+    result = benchmark(InputData, mapping)
+    assert len(result) == len(input_data)
+
+
+def test_to_wide(benchmark, input_data):
+    result = benchmark(input_data.to_wide, "15min")
+    assert isinstance(result, pd.DataFrame)
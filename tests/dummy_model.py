@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import pickle
+import time
+from collections.abc import Sequence
+from os import PathLike
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from twinn_ml_interface.input_data import InputData
+from twinn_ml_interface.mocks import ConfigurationMock, LocalConfig
+from twinn_ml_interface.objectmodels import (
+    Configuration,
+    DataLabelConfigTemplate,
+    DataLevel,
+    MetaDataLogger,
+    Metric,
+    ModelCategory,
+    RelativeType,
+    Tag,
+    UnitTag,
+    UnitTagTemplate,
+)
+
+TEMPLATE = UnitTagTemplate([RelativeType.SELF], [Tag("TAG")])
+
+
+class DummyModel:
+    """Model that predicts the mean of its target, used to test the executors."""
+
+    model_type_name = "dummy_model"
+    model_category = ModelCategory.PREDICTION
+    base_features = None
+    target = None
+
+    def __init__(self, configuration: Configuration, logger: MetaDataLogger) -> None:
+        self.configuration = configuration
+        self.logger = logger
+        self.target = configuration.target_name
+        self.mean = None
+
+    @staticmethod
+    def get_target_template() -> UnitTagTemplate | UnitTag:
+        return TEMPLATE
+
+    @staticmethod
+    def get_data_config_template() -> list[DataLabelConfigTemplate]:
+        return [DataLabelConfigTemplate(DataLevel.SENSOR, [TEMPLATE])]
+
+    @staticmethod
+    def get_result_template() -> UnitTagTemplate | UnitTag:
+        return TEMPLATE
+
+    @classmethod
+    def initialize(cls, configuration: Configuration, logger: MetaDataLogger) -> DummyModel:
+        return cls(configuration, logger)
+
+    def preprocess(self, input_data: InputData) -> InputData:
+        return input_data
+
+    def train(self, input_data: InputData, **kwargs) -> tuple[float, object]:
+        self.mean = float(input_data[self.target][self.target].mean())
+        self.logger.log_metric(Metric("mean", self.mean))
+        return self.mean, None
+
+    def predict(self, input_data: InputData, **kwargs) -> tuple[list[pd.DataFrame], object]:
+        properties = self.configuration.get_unit_properties(self.configuration.modelled_unit_code)
+        time.sleep(properties.get("delay", 0))
+        index = input_data[self.target].index
+        return [pd.DataFrame({self.target: self.mean}, index=index)], None
+
+    def dump(self, foldername: PathLike, filename: str) -> None:
+        with open(Path(foldername) / f"{filename}.pkl", "wb") as file:
+            pickle.dump((self.target, self.mean), file)
+
+    @staticmethod
+    def load(
+        foldername: PathLike, filename: str, configuration: Configuration, logger: MetaDataLogger
+    ) -> DummyModel:
+        model = DummyModel(configuration, logger)
+        with open(Path(foldername) / f"{filename}.pkl", "rb") as file:
+            model.target, model.mean = pickle.load(file)  # noqa: S301
+        return model
+
+
+def long_data(unit_codes: Sequence[str], periods: int) -> pd.DataFrame:
+    """Hourly long format data of the tag TAG, with the unit codes taking turns and the values
+    0, 1, 2, ..."""
+    return pd.DataFrame(
+        {
+            "TIME": pd.date_range(start="2024-01-01", periods=periods, freq="1h", tz="UTC"),
+            "ID": [unit_codes[i % len(unit_codes)] for i in range(periods)],
+            "TYPE": "TAG",
+            "VALUE": np.arange(periods, dtype="float64"),
+        }
+    )
+
+
+def write_long_data(path: PathLike, unit_codes: Sequence[str], periods: int) -> pd.DataFrame:
+    """Write `long_data` to a parquet file and return it."""
+    data = long_data(unit_codes, periods)
+    data.to_parquet(path)
+    return data
+
+
+def unit_config(unit_code: str, delay: float = 0) -> ConfigurationMock:
+    """Configuration of a model of the tag TAG of a unit, whose predictions take `delay`
+    seconds."""
+    unit_tags = [UnitTag.from_string(f"{unit_code}:TAG")]
+    properties = {unit_code: {"delay": delay}}
+    return ConfigurationMock(f"{unit_code}:TAG", unit_code, properties, [], unit_tags)
+
+
+def local_config(model: type, path: PathLike, directory: PathLike, model_name: str) -> LocalConfig:
+    """Local configuration that trains and predicts on the data at `path`, and stores the model
+    and its predictions in `directory`."""
+    predictions_path = Path(directory) / f"{model_name}_predictions.parquet"
+    return LocalConfig(model, path, path, directory, model_name, predictions_path)
@@ -0,0 +1,108 @@
+import unittest
+
+import numpy as np
+import pyarrow as pa
+from dummy_model import long_data
+
+from twinn_ml_interface.input_data import ArrowLayout, InputData
+
+
+class TestArrow(unittest.TestCase):
+    def setUp(self):
+        self.data = long_data(["UNIT1", "UNIT2"], 100)
+        self.input_data = InputData.from_long_df(self.data)
+
+    def test_long_round_trip_without_copies(self):
+        table = self.input_data.to_arrow()
+        values = self.input_data["UNIT1:TAG"]["UNIT1:TAG"].to_numpy()
+
+        assert table.column_names == ["TIME", "VALUE", "ID", "TYPE"]
+        assert table.schema.field("TIME").type == pa.timestamp("ns", tz="UTC")
+        assert table.column("VALUE").chunks[0].buffers()[1].address == values.ctypes.data
+        epochs = self.input_data["UNIT1:TAG"].index.asi8
+        assert table.column("TIME").chunks[0].buffers()[1].address == epochs.ctypes.data
+
+        result = InputData.from_arrow(table)
+        assert result == self.input_data
+        assert np.shares_memory(result["UNIT1:TAG"]["UNIT1:TAG"].to_numpy(), values)
+
+    def test_from_unsorted_long_table(self):
+        data = self.data.assign(EXTRA=np.arange(100)).sample(frac=1, random_state=0)
+        table = pa.Table.from_pandas(data, preserve_index=False)
+
+        assert InputData.from_arrow(table) == InputData.from_long_df(data)
+
+    def test_timezones(self):
+        input_data = InputData.from_long_df(
+            self.data.assign(TIME=self.data["TIME"].dt.tz_convert("Europe/Amsterdam"))
+        )
+        result = InputData.from_arrow(input_data.to_arrow())
+
+        assert str(result["UNIT1:TAG"].index.tz) == "Europe/Amsterdam"
+        assert result == input_data
+
+    def test_different_columns(self):
+        input_data = InputData(
+            {
+                "UNIT1:TAG": self.input_data["UNIT1:TAG"].assign(EXTRA=1.0),
+                "UNIT2:TAG": self.input_data["UNIT2:TAG"],
+            }
+        )
+        table = input_data.to_arrow()
+
+        assert table.column_names == ["TIME", "VALUE", "EXTRA", "ID", "TYPE"]
+        assert table.num_rows == 100
+        assert InputData.from_arrow(table) == input_data
+
+    def test_different_dtypes(self):
+        input_data = InputData(
+            {
+                "UNIT1:TAG": self.input_data["UNIT1:TAG"].astype("int64"),
+                "UNIT2:TAG": self.input_data["UNIT2:TAG"],
+            }
+        )
+        table = input_data.to_arrow()
+
+        assert table.schema.field("VALUE").type == pa.float64()
+        result = InputData.from_arrow(table)
+        assert result["UNIT1:TAG"]["UNIT1:TAG"].dtype == "int64"
+        assert result == input_data
+
+    def test_incompatible_dtypes(self):
+        input_data = InputData(
+            {
+                "UNIT1:TAG": self.input_data["UNIT1:TAG"].astype("int64"),
+                "UNIT2:TAG": self.input_data["UNIT2:TAG"].astype(str),
+            }
+        )
+        with self.assertRaisesRegex(TypeError, "VALUE"):
+            input_data.to_arrow()
+
+    def test_copy(self):
+        table = self.input_data.to_arrow()
+        df = InputData.from_arrow(table)["UNIT1:TAG"]
+        with self.assertRaises(ValueError):
+            df.iloc[0, 0] = -1.0
+
+        df = InputData.from_arrow(table, copy=True)["UNIT1:TAG"]
+        df.iloc[0, 0] = -1.0
+        assert self.input_data["UNIT1:TAG"].iloc[0, 0] == 0.0
+
+    def test_wide(self):
+        table = self.input_data.to_arrow(ArrowLayout.WIDE, freq="2h")
+
+        assert table.column_names == ["TIME", "UNIT1:TAG", "UNIT2:TAG"]
+        result = InputData.from_arrow(table, layout="wide")
+        wide = self.input_data.to_wide("2h")
+        assert result == InputData({key: wide[[key]] for key in wide.columns})
+
+    def test_record_batch_stream(self):
+        sink = pa.BufferOutputStream()
+        reader = self.input_data.to_arrow_batches(max_chunksize=20)
+        with pa.ipc.new_stream(sink, reader.schema) as writer:
+            for batch in reader:
+                assert batch.num_rows <= 20
+                writer.write_batch(batch)
+
+        result = InputData.from_arrow(pa.ipc.open_stream(sink.getvalue()))
+        assert result == self.input_data
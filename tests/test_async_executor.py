@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from dummy_model import DummyModel, local_config, unit_config, write_long_data
+
+from twinn_ml_interface.mocks import (
+    AsyncExecutorMock,
+    BatchExecutorMock,
+    LocalDataLake,
+)
+
+
+class EventDataLake(LocalDataLake):
+    """Data lake that signals the read of UNIT2, and lets the write of UNIT1 wait until UNIT2
+    is predicted."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_unit2 = threading.Event()
+        self.predicting_unit2 = threading.Event()
+        self.overlaps: dict[str, bool] = {}
+
+    def read(self, unit_tags, start=None, end=None):
+        if "UNIT2:TAG" in unit_tags:
+            self.read_unit2.set()
+        return super().read(unit_tags, start, end)
+
+    def write(self, model_name, predictions):
+        if model_name == "UNIT1":
+            self.overlaps["write"] = self.predicting_unit2.wait(10)
+        super().write(model_name, predictions)
+
+
+class EventModel(DummyModel):
+    data_lake: EventDataLake
+
+    def predict(self, input_data, **kwargs):
+        unit_code = self.configuration.modelled_unit_code
+        if unit_code == "UNIT1":
+            self.data_lake.overlaps["read"] = self.data_lake.read_unit2.wait(10)
+        elif unit_code == "UNIT2":
+            self.data_lake.predicting_unit2.set()
+        return super().predict(input_data, **kwargs)
+
+    @staticmethod
+    def load(foldername, filename, configuration, logger) -> EventModel:
+        model = EventModel(configuration, logger)
+        loaded = DummyModel.load(foldername, filename, configuration, logger)
+        model.target, model.mean = loaded.target, loaded.mean
+        return model
+
+
+class TestAsyncExecutorMock(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "data.parquet"
+        self.unit_codes = ["UNIT1", "UNIT2", "UNIT3"]
+        write_long_data(self.path, self.unit_codes, 30)
+        self.local_configs = [
+            local_config(DummyModel, self.path, self.tmpdir.name, code) for code in self.unit_codes
+        ]
+        BatchExecutorMock(
+            [(config, unit_config(config.model_name)) for config in self.local_configs],
+            max_workers=1,
+        ).run_train_flow()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_predict(self):
+        jobs = [(config, unit_config(config.model_name)) for config in self.local_configs]
+        jobs.append((local_config(DummyModel, self.path, self.tmpdir.name, "X"), None))
+        data_lake = LocalDataLake(self.path, Path(self.tmpdir.name) / "predictions")
+
+        results = asyncio.run(AsyncExecutorMock(jobs, data_lake).run_predict_flow())
+
+        assert [result.model_name for result in results] == [*self.unit_codes, "X"]
+        assert [result.error for result in results[:3]] == [None, None, None]
+        # The model that was not trained fails without stopping the others
+        assert "FileNotFoundError" in results[3].error
+        predictions = pd.read_parquet(data_lake.sink.files[0])
+        assert predictions.groupby("MODEL").size().to_dict() == dict.fromkeys(self.unit_codes, 10)
+
+    def test_overlap(self):
+        jobs = [
+            (
+                local_config(EventModel, self.path, self.tmpdir.name, code),
+                unit_config(code),
+            )
+            for code in self.unit_codes
+        ]
+        data_lake = EventDataLake(self.path, Path(self.tmpdir.name) / "predictions")
+        EventModel.data_lake = data_lake
+
+        results = asyncio.run(AsyncExecutorMock(jobs, data_lake).run_predict_flow())
+
+        assert all(result.error is None for result in results)
+        # UNIT2 is read while UNIT1 predicts, and UNIT1 is written while UNIT2 predicts.
+        # Sequentially, these waits would time out.
+        assert data_lake.overlaps == {"read": True, "write": True}
@@ -0,0 +1,109 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from dummy_model import DummyModel, local_config, unit_config, write_long_data
+
+from twinn_ml_interface.input_data import ColumnarInputData
+from twinn_ml_interface.mocks import (
+    BatchExecutorMock,
+    ConfigurationMock,
+    LocalConfig,
+    PredictionSink,
+    required_unit_tags,
+)
+
+
+class TestBatchExecutorMock(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "train.parquet"
+        write_long_data(self.path, ["UNIT1", "UNIT2", "UNIT3"], 30)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def jobs(self, unit_codes: list[str]) -> list[tuple[LocalConfig, ConfigurationMock]]:
+        return [
+            (
+                local_config(DummyModel, self.path, self.tmpdir.name, code),
+                unit_config(code),
+            )
+            for code in unit_codes
+        ]
+
+    def test_required_unit_tags(self):
+        assert required_unit_tags(DummyModel, unit_config("UNIT1")) == {"UNIT1:TAG"}
+        assert required_unit_tags(DummyModel, ConfigurationMock("", "", {}, [], [])) == set()
+
+    def test_shared_data_reference_time(self):
+        reference_time = pd.Timestamp("2024-01-01 05:00", tz="UTC")
+        executor = BatchExecutorMock(self.jobs(["UNIT1", "UNIT2"]), reference_time=reference_time)
+        shared = executor.load_shared_data(self.tmpdir.name)
+
+        data = ColumnarInputData.load(shared[0][0])
+        assert data.unit_tags == {"UNIT1:TAG", "UNIT2:TAG"}
+        assert data.max_datetime == pd.Timestamp("2024-01-01 04:00", tz="UTC")
+
+    def test_shared_data(self):
+        executor = BatchExecutorMock(self.jobs(["UNIT1", "UNIT2"]))
+        shared = executor.load_shared_data(self.tmpdir.name)
+
+        assert [unit_tags for _, unit_tags in shared] == [{"UNIT1:TAG"}, {"UNIT2:TAG"}]
+        # The data of both models is read once, without the unit tags that no model needs
+        assert shared[0][0] == shared[1][0]
+        assert len(list(Path(self.tmpdir.name).glob("[0-9]*"))) == 1
+
+    def test_train_in_process(self):
+        results = BatchExecutorMock(self.jobs(["UNIT1", "UNIT2"]), max_workers=1).run_train_flow()
+
+        assert [result.model_name for result in results] == ["UNIT1", "UNIT2"]
+        assert [result.performance_value for result in results] == [13.5, 14.5]
+        assert (Path(self.tmpdir.name) / "UNIT2.pkl").exists()
+
+    def test_train_in_pool(self):
+        jobs = self.jobs(["UNIT1", "UNIT2", "UNIT3", "UNKNOWN"])
+        results = BatchExecutorMock(jobs, max_workers=2).run_train_flow()
+
+        assert [result.performance_value for result in results[:3]] == [13.5, 14.5, 15.5]
+        # A failing model does not stop the others
+        assert results[3].performance_value is None
+        assert "KeyError" in results[3].error
+
+    def test_predict(self):
+        jobs = self.jobs(["UNIT1", "UNIT2", "UNIT3"])
+        BatchExecutorMock(jobs, max_workers=1).run_train_flow()
+        jobs[2] = (jobs[2][0], unit_config("UNIT3", delay=2))
+
+        executor = BatchExecutorMock(
+            jobs, max_workers=2, max_pending=2, timeout=0.5, use_threads=True
+        )
+        with PredictionSink(Path(self.tmpdir.name) / "predictions", max_rows=10) as sink:
+            results = executor.run_predict_flow(sink)
+
+        assert [result.error for result in results[:2]] == [None, None]
+        assert results[2].error == "Timed out after 0.5 seconds"
+        # Both predictions of 10 rows were written in separate batches
+        assert len(sink.files) == 2
+        predictions = pd.concat([pd.read_parquet(path) for path in sink.files])
+        assert predictions.groupby("MODEL")["UNIT2:TAG"].mean()["UNIT2"] == 14.5
+
+    def test_timeout_starts_with_the_model(self):
+        jobs = [
+            (
+                local_config(DummyModel, self.path, self.tmpdir.name, f"model{i}"),
+                unit_config("UNIT1", delay=0.3),
+            )
+            for i in range(4)
+        ]
+        BatchExecutorMock(jobs, max_workers=1).run_train_flow()
+
+        # The last two models wait 0.3 seconds for a worker, which does not count
+        executor = BatchExecutorMock(
+            jobs, max_workers=2, max_pending=4, timeout=0.5, use_threads=True
+        )
+        with PredictionSink(Path(self.tmpdir.name) / "predictions") as sink:
+            results = executor.run_predict_flow(sink)
+
+        assert [result.error for result in results] == [None] * 4
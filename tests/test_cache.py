@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import tempfile
+import time
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+import pandas as pd
+from dummy_model import DummyModel, local_config, long_data, unit_config
+
+from twinn_ml_interface.input_data import InputData, InputDataCache, PreprocessCache
+from twinn_ml_interface.mocks import ConfigurationMock, ExecutorMock
+from twinn_ml_interface.objectmodels import DataLabelConfigTemplate, DataLevel, UnitTag
+
+
+class ModelStub:
+    @staticmethod
+    def get_data_config_template() -> list[DataLabelConfigTemplate]:
+        return [
+            DataLabelConfigTemplate(
+                DataLevel.SENSOR,
+                [UnitTag.from_string("UNIT1:TAG")],
+                max_lookback=timedelta(days=7),
+            )
+        ]
+
+
+class TestInputDataCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data = long_data(["UNIT1", "UNIT2"], 100)
+        self.input_data = InputData.from_long_df(self.data)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put_get(self):
+        cache = InputDataCache(self.tmpdir.name)
+        key = cache.make_key(ModelStub.get_data_config_template(), "2024-01-01", "2024-01-05")
+
+        assert cache.get(key) is None
+        cache.put(key, self.input_data)
+        assert key in cache
+        assert cache.get(key) == self.input_data
+        assert cache.get(key).to_input_data() == self.input_data
+
+    def test_put_uncacheable(self):
+        cache = InputDataCache(self.tmpdir.name)
+        data = InputData.from_long_df(self.data.astype({"VALUE": str}))
+
+        with self.assertRaises(TypeError):
+            cache.put("key", data)
+        # Nothing is left behind
+        assert not list(cache.directory.iterdir())
+
+    def test_keys(self):
+        config = ModelStub.get_data_config_template()
+        key = InputDataCache.make_key(config, "2024-01-01", "2024-01-05")
+
+        assert key == InputDataCache.make_key(
+            ModelStub.get_data_config_template(), "2024-01-01", "2024-01-05"
+        )
+        assert key != InputDataCache.make_key(config, "2024-01-01", "2024-01-06")
+        config[0].max_lookback = timedelta(days=1)
+        assert key != InputDataCache.make_key(config, "2024-01-01", "2024-01-05")
+
+    def test_lru_eviction(self):
+        cache = InputDataCache(self.tmpdir.name)
+        cache.put("first", self.input_data)
+        entry_size = cache.size
+        cache.max_bytes = 2 * entry_size
+
+        time.sleep(0.01)
+        cache.put("second", self.input_data)
+        time.sleep(0.01)
+        cache.get("first")
+        time.sleep(0.01)
+        cache.put("third", self.input_data)
+
+        assert "first" in cache and "third" in cache
+        assert "second" not in cache
+        assert cache.size <= cache.max_bytes
+
+    def test_max_age(self):
+        cache = InputDataCache(self.tmpdir.name, max_age=timedelta(seconds=0.05))
+        cache.put("first", self.input_data)
+        assert cache.get("first") is not None
+
+        time.sleep(0.1)
+        assert cache.get("first") is None
+        cache.put("second", self.input_data)
+        assert not (cache.directory / "first").exists()
+
+    def test_executor_uses_cache(self):
+        path = Path(self.tmpdir.name) / "train.parquet"
+        self.data.to_parquet(path)
+        config = local_config(ModelStub, path, self.tmpdir.name, "model")
+        cache = InputDataCache(Path(self.tmpdir.name) / "cache")
+        executor = ExecutorMock(config, data_cache=cache)
+
+        assert executor.get_training_data(ModelStub) == self.input_data
+        assert len(list(cache.directory.iterdir())) == 1
+        assert executor.get_training_data(ModelStub) == self.input_data
+        assert len(list(cache.directory.iterdir())) == 1
+
+    def test_executor_keeps_columns(self):
+        path = Path(self.tmpdir.name) / "train.parquet"
+        data = self.data.assign(QUALITY=1)
+        data.to_parquet(path)
+        config = local_config(ModelStub, path, self.tmpdir.name, "model")
+        cache = InputDataCache(Path(self.tmpdir.name) / "cache")
+        executor = ExecutorMock(config, data_cache=cache)
+
+        # The cache would drop the other columns, so the data is not cached
+        assert executor.get_training_data(ModelStub) == InputData.from_long_df(data)
+        assert not list(cache.directory.iterdir())
+
+        # Nor would it keep strings
+        data = self.data.astype({"VALUE": str})
+        data.to_parquet(path)
+        assert executor.get_training_data(ModelStub) == InputData.from_long_df(data)
+        assert not list(cache.directory.iterdir())
+
+
+class FeatureModel(DummyModel):
+    preprocess_calls = 0
+
+    def preprocess(self, input_data: InputData) -> InputData:
+        FeatureModel.preprocess_calls += 1
+        return InputData(
+            {
+                key: df.assign(DOUBLE=df[key] * 2, LABEL=pd.array(["a"] * len(df), "string"))
+                for key, df in input_data.items()
+            }
+        )
+
+    @staticmethod
+    def load(foldername, filename, configuration, logger) -> FeatureModel:
+        model = FeatureModel(configuration, logger)
+        loaded = DummyModel.load(foldername, filename, configuration, logger)
+        model.target, model.mean = loaded.target, loaded.mean
+        return model
+
+
+class TestPreprocessCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.data = long_data(["UNIT1", "UNIT2"], 100)
+        self.input_data = InputData.from_long_df(self.data)
+        FeatureModel.preprocess_calls = 0
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put_get_keeps_columns(self):
+        cache = PreprocessCache(self.tmpdir.name)
+        preprocessed = FeatureModel(ConfigurationMock("", "", {}, [], []), None).preprocess(
+            self.input_data
+        )
+        preprocessed["UNIT3:TAG"] = self.input_data["UNIT1:TAG"].rename(
+            columns={"UNIT1:TAG": "UNIT3:TAG"}
+        )
+        key = cache.make_key(FeatureModel, self.input_data)
+
+        assert cache.get(key) is None
+        assert cache.put(key, preprocessed) is preprocessed
+        stored = cache.get(key)
+        assert list(stored) == list(preprocessed)
+        assert stored == preprocessed
+        assert stored["UNIT1:TAG"]["LABEL"].dtype == "string"
+
+    def test_modify_in_place(self):
+        cache = PreprocessCache(self.tmpdir.name)
+        preprocessed = FeatureModel(ConfigurationMock("", "", {}, [], []), None).preprocess(
+            self.input_data
+        )
+        key = cache.make_key(FeatureModel, self.input_data)
+
+        # Both the data of a miss and of a hit can be modified by the model
+        for data in (cache.put(key, preprocessed), cache.get(key)):
+            df = data["UNIT1:TAG"]
+            df.iloc[0, 0] = -1.0
+            df.fillna({"DOUBLE": 0.0}, inplace=True)
+            assert df.iloc[0, 0] == -1.0
+
+        # Without a copy, the memory-mapped values are read-only
+        read_only = PreprocessCache(self.tmpdir.name, copy=False).get(key)
+        with self.assertRaises(ValueError):
+            read_only["UNIT1:TAG"].iloc[0, 0] = -1.0
+
+    def test_keys(self):
+        key = PreprocessCache.make_key(FeatureModel, self.input_data)
+        copy = InputData({key: df.copy() for key, df in self.input_data.items()})
+
+        assert key == PreprocessCache.make_key(FeatureModel, copy)
+        assert key != PreprocessCache.make_key(DummyModel, self.input_data)
+        assert key != PreprocessCache.make_key(FeatureModel, self.input_data, version="2")
+        assert key != PreprocessCache.make_key(FeatureModel, self.input_data, context="UNIT2")
+        copy["UNIT1:TAG"] = copy["UNIT1:TAG"] + 1
+        assert key != PreprocessCache.make_key(FeatureModel, copy)
+
+    def test_executor_skips_preprocessing(self):
+        path = Path(self.tmpdir.name) / "data.parquet"
+        self.data.to_parquet(path)
+        config = local_config(FeatureModel, path, self.tmpdir.name, "model")
+        cache = PreprocessCache(Path(self.tmpdir.name) / "cache")
+        executor = ExecutorMock(config, unit_config("UNIT1"), preprocess_cache=cache)
+
+        performance_value = executor.run_train_flow()
+        assert executor.run_train_flow() == performance_value
+        assert FeatureModel.preprocess_calls == 1
+
+        executor.predict()
+        executor.predict()
+        assert FeatureModel.preprocess_calls == 2
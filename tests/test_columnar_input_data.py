@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from twinn_ml_interface.input_data import ColumnarInputData, InputData
+
+
+class TestColumnarInputData(unittest.TestCase):
+    def setUp(self):
+        sensor1 = pd.DataFrame(
+            {
+                "TIME": pd.date_range(start="1970-01-01", periods=5, freq="1h", tz="UTC"),
+                "ID": "SENSOR1",
+                "TYPE": "TAG",
+                "VALUE": [1, 2, 3, 4, 5],
+            }
+        )
+        sensor2 = pd.DataFrame(
+            {
+                "TIME": pd.date_range(start="1970-02-01", periods=3, freq="1h", tz="UTC"),
+                "ID": "SENSOR2",
+                "TYPE": "TAG",
+                "VALUE": [7, 8, 9],
+            }
+        )
+        # Shuffle the rows, so that the grouping needs to reorder them
+        self.data = (
+            pd.concat([sensor1, sensor2])
+            .astype({"VALUE": "float64"})
+            .sample(frac=1, random_state=0)
+            .reset_index(drop=True)
+        )
+
+    def test_same_content_as_input_data(self):
+        columnar = ColumnarInputData.from_long_df(self.data)
+        input_data = InputData.from_long_df(self.data)
+
+        assert columnar.unit_tags == input_data.unit_tags
+        assert columnar.unit_codes == input_data.unit_codes
+        assert columnar.min_datetime == input_data.min_datetime
+        assert columnar.max_datetime == input_data.max_datetime
+        assert columnar == input_data
+        assert columnar.to_input_data() == input_data
+
+    def test_views_share_buffer(self):
+        columnar = ColumnarInputData.from_long_df(self.data)
+        frame = columnar["SENSOR2:TAG"]
+
+        assert frame.index.is_monotonic_increasing
+        assert np.shares_memory(frame["SENSOR2:TAG"].to_numpy(), columnar._values)
+
+    def test_from_input_data(self):
+        input_data = InputData.from_long_df(self.data)
+        columnar = ColumnarInputData.from_input_data(input_data)
+
+        assert columnar == input_data
+        assert not ColumnarInputData.from_input_data(InputData())
+
+    def test_load_is_memory_mapped(self):
+        columnar = ColumnarInputData.from_long_df(self.data)
+        with tempfile.TemporaryDirectory() as directory:
+            columnar.save(f"{directory}/data")
+            loaded = ColumnarInputData.load(f"{directory}/data")
+
+            assert loaded == columnar
+            # Neither the timestamps nor the values are copied into memory
+            assert isinstance(loaded._epochs, np.memmap)
+            assert isinstance(loaded._values, np.memmap)
+
+    def test_from_input_data_keeps_dtypes(self):
+        input_data = InputData.from_long_df(self.data)
+        input_data["SENSOR1:TAG"] = input_data["SENSOR1:TAG"].astype("int64")
+
+        # Concatenating would turn the integers into floats
+        with self.assertRaises(TypeError):
+            ColumnarInputData.from_input_data(input_data)
+        with self.assertRaises(TypeError):
+            ColumnarInputData.from_long_df(self.data.astype({"VALUE": str}))
+
+    def test_rows_without_id_are_dropped(self):
+        data = self.data.copy()
+        data.loc[0, "ID"] = None
+        columnar = ColumnarInputData.from_long_df(data)
+
+        assert len(columnar._values) == len(data) - 1
+        assert columnar == InputData.from_long_df(data)
+
+    def test_assume_sorted(self):
+        sorted_data = self.data.sort_values(["ID", "TYPE", "TIME"])
+        columnar = ColumnarInputData.from_long_df(sorted_data, assume_sorted=True)
+        assert columnar == InputData.from_long_df(self.data)
+
+        with self.assertRaises(ValueError):
+            ColumnarInputData.from_long_df(self.data, assume_sorted=True)
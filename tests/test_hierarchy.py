@@ -0,0 +1,190 @@
+import json
+import pickle
+import tempfile
+import unittest
+from dataclasses import asdict, fields
+from pathlib import Path
+
+import pandas as pd
+from dummy_model import DummyModel
+
+from twinn_ml_interface.mocks import HierarchyConfiguration, UnitHierarchy, required_unit_tags
+from twinn_ml_interface.objectmodels import (
+    Configuration,
+    RelativeType,
+    Tag,
+    Unit,
+    UnitTag,
+    UnitTagTemplate,
+)
+
+RECORDS = [
+    {"unit_code": "PLANT", "unit_type_code": "plant"},
+    {"unit_code": "PUMP1", "unit_type_code": "pump", "parent_unit_code": "PLANT"},
+    {"unit_code": "PUMP2", "unit_type_code": "pump", "parent_unit_code": "PLANT"},
+    {
+        "unit_code": "SENSOR1",
+        "unit_type_code": "sensor",
+        "parent_unit_code": "PUMP1",
+        "active": False,
+        "properties": {"delay": 0},
+    },
+]
+
+
+class TestUnitHierarchy(unittest.TestCase):
+    def setUp(self):
+        self.hierarchy = UnitHierarchy.from_records(RECORDS)
+
+    def codes(self, unit_code, relative_path):
+        return [unit.unit_code for unit in self.hierarchy.resolve(unit_code, relative_path)]
+
+    def test_resolve(self):
+        assert self.codes("PUMP1", []) == ["PUMP1"]
+        assert self.codes("PUMP1", [RelativeType.SELF]) == ["PUMP1"]
+        assert self.codes("PUMP1", [RelativeType.PARENT]) == ["PLANT"]
+        assert self.codes("PLANT", [RelativeType.PARENT]) == []
+        assert self.codes("PUMP1", [RelativeType.PARENT, RelativeType.CHILDREN]) == [
+            "PUMP1",
+            "PUMP2",
+        ]
+        assert self.codes("PLANT", [RelativeType.CHILDREN, RelativeType.PARENT]) == ["PLANT"]
+        with self.assertRaises(KeyError):
+            self.hierarchy.resolve("UNKNOWN", [])
+
+    def test_resolve_is_memoised(self):
+        path = [RelativeType.PARENT, RelativeType.CHILDREN]
+        assert self.hierarchy.resolve("PUMP1", path) is self.hierarchy.resolve("PUMP1", path)
+
+        self.hierarchy.clear_cache()
+        assert self.codes("PUMP1", path) == ["PUMP1", "PUMP2"]
+
+    def test_unit_tags(self):
+        template = UnitTagTemplate(
+            [RelativeType.PARENT, RelativeType.CHILDREN],
+            [Tag("FLOW"), Tag(mapping={"pump": "SPEED"})],
+        )
+        requests = [("SENSOR1", template), ("PUMP1", template)]
+        sensor_tags, pump_tags = self.hierarchy.resolve_many(requests)
+
+        assert [str(unit_tag) for unit_tag in sensor_tags] == ["SENSOR1:FLOW"]
+        assert [str(unit_tag) for unit_tag in pump_tags] == [
+            "PUMP1:FLOW",
+            "PUMP1:SPEED",
+            "PUMP2:FLOW",
+            "PUMP2:SPEED",
+        ]
+
+    def test_exports(self):
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "units.json"
+            json_path.write_text(json.dumps(RECORDS))
+            parquet_path = Path(directory) / "units.parquet"
+            pd.DataFrame(RECORDS).drop(columns="properties").to_parquet(parquet_path)
+
+            for hierarchy in UnitHierarchy.from_json(json_path), UnitHierarchy.from_parquet(
+                parquet_path
+            ):
+                assert len(hierarchy) == 4
+                assert not hierarchy.get_unit("SENSOR1").active
+                assert hierarchy.get_unit("PLANT").active
+                assert hierarchy.resolve("SENSOR1", [RelativeType.PARENT]) == (
+                    hierarchy.get_unit("PUMP1"),
+                )
+
+    def test_unknown_parent(self):
+        with self.assertRaises(ValueError):
+            UnitHierarchy.from_records([{"unit_code": "PUMP1", "parent_unit_code": "PLANT"}])
+
+
+class TestHierarchyConfiguration(unittest.TestCase):
+    def setUp(self):
+        self.config = HierarchyConfiguration(
+            UnitHierarchy.from_records(RECORDS), "SENSOR1", "SENSOR1:TAG"
+        )
+
+    def test_configuration_protocol(self):
+        assert isinstance(self.config, Configuration)
+        assert self.config.get_unit_properties("SENSOR1") == {"delay": 0}
+        assert self.config.get_unit_properties("UNKNOWN") is None
+        assert self.config.get_units("UNKNOWN", [RelativeType.SELF]) is None
+        assert [unit.unit_code for unit in self.config.get_units("PUMP1", [])] == ["PUMP1"]
+
+    def test_required_unit_tags(self):
+        assert required_unit_tags(DummyModel, self.config) == {"SENSOR1:TAG"}
+
+    def test_get_unit_tags_many(self):
+        templates = [
+            UnitTagTemplate([RelativeType.PARENT], [Tag("FLOW")]),
+            UnitTagTemplate([RelativeType.SELF], [Tag("TAG")]),
+        ]
+        parent_tags, own_tags = self.config.get_unit_tags_many("SENSOR1", templates)
+
+        assert [str(unit_tag) for unit_tag in parent_tags] == ["PUMP1:FLOW"]
+        assert [str(unit_tag) for unit_tag in own_tags] == ["SENSOR1:TAG"]
+        assert self.config.get_unit_tags_many("UNKNOWN", templates) == [[], []]
+
+
+class TestUnitTag(unittest.TestCase):
+    def test_from_strings(self):
+        first, second, third = UnitTag.from_strings(["PUMP1:FLOW", "PUMP1:SPEED", "PUMP2:FLOW"])
+
+        assert [str(first), str(second), str(third)] == ["PUMP1:FLOW", "PUMP1:SPEED", "PUMP2:FLOW"]
+        assert first == UnitTag(Unit("PUMP1", "UNKNOWN", True), Tag("FLOW"))
+        # The strings are shared between the parsed unit tags, the units and tags are not
+        assert first.unit.unit_code is second.unit.unit_code
+        assert first.tag.name is third.tag.name
+        first.unit.unit_type_code = "pump"
+        assert second.unit.unit_type_code == "UNKNOWN"
+        assert UnitTag.from_string("PUMP1|FLOW", separator="|") == first
+        assert len({first, second, third, UnitTag.from_string("PUMP1:FLOW")}) == 3
+
+    def test_string_follows_fields(self):
+        unit_tag = UnitTag(Unit("PUMP1", "pump", True), Tag(mapping={"pump": "SPEED"}))
+        assert str(unit_tag) == "PUMP1:SPEED"
+
+        unit_tag.unit = Unit("WELL1", "well", True)
+        unit_tag.tag = Tag(mapping={"well": "LEVEL"})
+        assert str(unit_tag) == "WELL1:LEVEL"
+        unit_tag.unit.unit_code = "WELL2"
+        assert str(unit_tag) == "WELL2:LEVEL"
+        assert hash(unit_tag) == hash("WELL2:LEVEL")
+
+    def test_mapping_hash(self):
+        tag = Tag(mapping={"pump": "SPEED"})
+        assert hash(tag) == hash(Tag(mapping={"pump": "SPEED"}))
+
+        tag.mapping = {"well": "LEVEL"}
+        assert hash(tag) == hash(Tag(mapping={"well": "LEVEL"}))
+        tag.mapping["well"] = "FLOW"
+        assert hash(tag) == hash(Tag(mapping={"well": "FLOW"}))
+
+    def test_string_follows_mapping(self):
+        unit = Unit("PUMP1", "pump", True)
+        unit_tag = UnitTag(unit, Tag(mapping={"pump": "SPEED", "well": "LEVEL"}))
+        assert str(unit_tag) == "PUMP1:SPEED"
+
+        # Changes in place are seen as well
+        unit_tag.tag.mapping["pump"] = "FLOW"
+        assert str(unit_tag) == "PUMP1:FLOW"
+        unit.unit_type_code = "well"
+        assert str(unit_tag) == "PUMP1:LEVEL"
+        assert hash(unit_tag) == hash("PUMP1:LEVEL")
+
+    def test_slots_and_pickle(self):
+        unit_tag = UnitTag.from_string("PUMP1:FLOW")
+        assert not hasattr(unit_tag, "__dict__")
+        assert not hasattr(unit_tag.unit, "__dict__")
+
+        loaded = pickle.loads(pickle.dumps(unit_tag))  # noqa: S301
+        assert loaded == unit_tag
+        assert str(loaded) == "PUMP1:FLOW"
+
+    def test_caches_are_not_fields(self):
+        unit_tag = UnitTag(Unit("PUMP1", "pump", True), Tag(mapping={"pump": "SPEED"}))
+        hash(unit_tag), hash(unit_tag.tag)
+
+        assert [field.name for field in fields(unit_tag)] == ["unit", "tag"]
+        assert [field.name for field in fields(unit_tag.tag)] == ["name", "mapping"]
+        assert "_string" not in repr(unit_tag)
+        assert asdict(unit_tag)["tag"] == {"name": None, "mapping": {"pump": "SPEED"}}
@@ -2,7 +2,7 @@ import unittest
 
 import pandas as pd
 
-from twinn_ml_interface.input_data import InputData
+from twinn_ml_interface.input_data import InputData, ValidationMode
 
 
 class TestInputData(unittest.TestCase):
@@ -56,14 +56,83 @@ class TestInputData(unittest.TestCase):
 
         assert set(input_data.unit_tags) == {"SENSOR1:TAG", "SENSOR2:TAG"}
 
+    def test_classmethod_keeps_extra_columns(self):
+        data = self.data.assign(QUALITY=range(len(self.data)))
+        input_data = InputData.from_long_df(data.iloc[::-1])
+
+        assert list(input_data["SENSOR1:TAG"].columns) == ["SENSOR1:TAG", "QUALITY"]
+        assert input_data["SENSOR1:TAG"].index.is_monotonic_increasing
+        assert input_data["SENSOR1:TAG"]["QUALITY"].tolist() == [0, 1, 2, 3, 4]
+
+    def test_classmethod_assume_sorted(self):
+        input_data = InputData.from_long_df(self.data, assume_sorted=True)
+        assert input_data == InputData.from_long_df(self.data)
+
+        # The result does not share memory with the original DataFrame
+        input_data["SENSOR1:TAG"].iloc[0, 0] = -1
+        assert self.data["VALUE"].iloc[0] == 1
+
+        with self.assertRaises(ValueError):
+            InputData.from_long_df(self.data.iloc[::-1], assume_sorted=True)
+
     def test_min_time(self):
         input_data = InputData.from_long_df(self.data)
         assert input_data.min_datetime == pd.Timestamp("1970-01-01 00:00:00")
 
+    def test_cached_metadata_is_updated(self):
+        input_data = InputData.from_long_df(self.data)
+        assert input_data.max_datetime == pd.Timestamp("1970-02-01 02:00:00")
+        assert input_data.unit_codes == {"SENSOR1", "SENSOR2"}
+
+        del input_data["SENSOR2:TAG"]
+        assert input_data.max_datetime == pd.Timestamp("1970-01-01 04:00:00")
+        assert input_data.unit_codes == {"SENSOR1"}
+
+        input_data["OTHER:TAG"] = pd.DataFrame(
+            {"OTHER:TAG": [1.0]}, index=pd.DatetimeIndex(["1971-01-01"], name="TIME")
+        )
+        assert input_data.max_datetime == pd.Timestamp("1971-01-01")
+        assert input_data.unit_codes == {"SENSOR1", "OTHER"}
+
+        input_data.clear()
+        assert not input_data
+
+    def test_summary(self):
+        data = self.data.copy()
+        data.loc[1, "VALUE"] = None
+        summary = InputData.from_long_df(data).summary()
+
+        assert summary.loc["SENSOR1:TAG", "COUNT"] == 5
+        assert summary.loc["SENSOR1:TAG", "NAN_COUNT"] == 1
+        assert summary.loc["SENSOR2:TAG", "FIRST"] == pd.Timestamp("1970-02-01")
+        assert summary.loc["SENSOR2:TAG", "LAST"] == pd.Timestamp("1970-02-01 02:00:00")
+
     def test_to_log_format(self):
         input_data = InputData.from_long_df(self.data)
         assert (input_data.to_long_format()[self.data.columns]).equals(self.data)
 
+    def test_to_long_format_categorical(self):
+        input_data = InputData.from_long_df(self.data)
+        long_format = input_data.to_long_format(categorical=True)
+
+        assert isinstance(long_format["ID"].dtype, pd.CategoricalDtype)
+        assert InputData.from_long_df(long_format) == input_data
+        assert InputData().to_long_format().empty
+
+    def test_to_long_format_dtypes(self):
+        input_data = InputData.from_long_df(self.data)
+        nullable = InputData.from_long_df(self.data.astype({"VALUE": "Float64"}))
+
+        assert input_data.to_long_format()["VALUE"].dtype == "float64"
+        assert nullable.to_long_format()["VALUE"].dtype == "Float64"
+
+    def test_to_arrow(self):
+        input_data = InputData.from_long_df(self.data)
+        table = input_data.to_arrow()
+
+        assert table.column_names == ["TIME", "VALUE", "ID", "TYPE"]
+        assert InputData.from_long_df(table.to_pandas()) == input_data
+
     def test_input_data_is_sorted(self):
         self.sensor1["TIME"] = self.sensor1["TIME"][::1]
 
@@ -83,3 +152,88 @@ class TestInputData(unittest.TestCase):
 
         # Original data remains unchanged
         assert not sensor2.index.is_monotonic_increasing
+
+    def test_sorted_data_is_copied(self):
+        df = InputData.from_long_df(self.sensor1)["SENSOR1:TAG"]
+        input_data = InputData({"SENSOR1:TAG": df})
+        fingerprint = input_data.fingerprint
+        df.iloc[0, 0] = -1.0
+
+        # Modifying the DataFrame of the caller does not change the data or its fingerprint
+        assert input_data["SENSOR1:TAG"].iloc[0, 0] != -1.0
+        assert input_data.fingerprint == fingerprint
+        assert input_data == InputData({"SENSOR1:TAG": input_data["SENSOR1:TAG"].copy()})
+
+    def test_lazy_validation(self):
+        df = InputData.from_long_df(self.sensor1)["SENSOR1:TAG"].iloc[::-1]
+        input_data = InputData({"SENSOR1:TAG": df, "bad": "no dataframe"}, ValidationMode.LAZY)
+
+        assert input_data.validation == ValidationMode.LAZY
+        assert input_data["SENSOR1:TAG"].index.is_monotonic_increasing
+        with self.assertRaises(TypeError):
+            input_data["bad"]
+        del input_data["bad"]
+
+        input_data["SENSOR1:TAG"] = df
+        assert input_data.max_datetime == df.index.max()
+
+    def test_lazy_validation_of_update(self):
+        input_data = InputData({}, ValidationMode.LAZY)
+        input_data.update({"bad": "no dataframe"})
+        input_data |= {"other": "no dataframe"}
+        input_data.setdefault("third", "no dataframe")
+
+        for key in ("bad", "other", "third"):
+            with self.assertRaises(TypeError):
+                input_data[key]
+
+    def test_trusted_validation(self):
+        df = InputData.from_long_df(self.sensor1)["SENSOR1:TAG"].iloc[::-1]
+        input_data = InputData({"SENSOR1:TAG": df}, validation=ValidationMode.TRUSTED)
+        input_data["foo"] = self.test_df
+
+        # Nothing is checked or sorted
+        assert input_data["SENSOR1:TAG"] is df
+        assert input_data.unit_tags == {"SENSOR1:TAG", "foo"}
+
+    def test_fingerprint(self):
+        input_data = InputData.from_long_df(self.data)
+        other = InputData({key: df.copy() for key, df in reversed(input_data.items())})
+
+        assert input_data.fingerprint == other.fingerprint
+        assert input_data.tag_fingerprints.keys() == {"SENSOR1:TAG", "SENSOR2:TAG"}
+
+        other["SENSOR2:TAG"] = other["SENSOR2:TAG"] + 1
+        assert input_data.fingerprint != other.fingerprint
+        assert input_data != other
+
+    def test_equal_data_with_different_fingerprint(self):
+        zeros = pd.DataFrame(
+            {"SENSOR1:TAG": [0.0, 0.0]}, index=pd.DatetimeIndex([0, 1], name="TIME")
+        )
+        input_data = InputData({"SENSOR1:TAG": zeros})
+        other = InputData({"SENSOR1:TAG": -zeros})
+
+        assert input_data.fingerprint != other.fingerprint
+        assert input_data == other
+
+    def test_fingerprint_object_values(self):
+        index = pd.DatetimeIndex([0, 1], name="TIME")
+        numbers = InputData(
+            {"SENSOR1:TAG": pd.DataFrame({"SENSOR1:TAG": [1, 2]}, index, dtype=object)}
+        )
+        strings = InputData(
+            {"SENSOR1:TAG": pd.DataFrame({"SENSOR1:TAG": ["1", "2"]}, index, dtype=object)}
+        )
+
+        assert numbers.fingerprint != strings.fingerprint
+        assert numbers != strings
+
+    def test_equal_after_modifying_in_place(self):
+        input_data = InputData.from_long_df(self.data)
+        other = InputData({key: df.copy() for key, df in input_data.items()})
+        assert input_data == other
+
+        df = other["SENSOR1:TAG"]
+        df.iloc[0, 0] = -1.0
+        assert input_data != other
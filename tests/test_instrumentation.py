@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from dummy_model import DummyModel, local_config, unit_config, write_long_data
+
+from twinn_ml_interface.mocks import ExecutorMock, Instrumentation
+from twinn_ml_interface.objectmodels import MetaDataLogger
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        path = Path(self.tmpdir.name) / "data.parquet"
+        write_long_data(path, ["UNIT1", "UNIT2"], 10)
+        config = local_config(DummyModel, path, self.tmpdir.name, "model")
+        self.hooked = []
+        self.instrumentation = Instrumentation(hooks=[self.hooked.append])
+        self.executor = ExecutorMock(
+            config, unit_config("UNIT1"), instrumentation=self.instrumentation
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_flows(self):
+        self.executor.run_full_flow()
+
+        stages = [(record.flow, record.stage) for record in self.instrumentation.records]
+        assert stages == [
+            ("train", "initialize"),
+            ("train", "get_training_data"),
+            ("train", "preprocess"),
+            ("train", "train"),
+            ("train", "write_results"),
+            ("predict", "load_model"),
+            ("predict", "get_prediction_data"),
+            ("predict", "preprocess"),
+            ("predict", "predict"),
+            ("predict", "write_predictions"),
+        ]
+        assert self.hooked == list(self.instrumentation.records)
+        data_record = self.instrumentation.records[1]
+        assert (data_record.rows, data_record.unit_tags) == (10, 2)
+        assert self.instrumentation.records[-1].rows == 5
+        assert all(record.wall_seconds >= 0 and record.error is None for record in self.hooked)
+
+    def test_failed_stage(self):
+        self.executor.local_config.model_name = "missing"
+        with self.assertRaises(FileNotFoundError):
+            self.executor.run_predict_flow()
+
+        assert self.hooked[-1].stage == "load_model"
+        assert self.hooked[-1].error == "FileNotFoundError"
+
+    def test_trace_memory(self):
+        instrumentation = Instrumentation(trace_memory=True)
+        with instrumentation.stage("train", "allocate"):
+            data = np.ones(2**20)
+
+        assert instrumentation.records[0].peak_traced_bytes >= data.nbytes
+
+    def test_log(self):
+        with self.instrumentation.stage("train", "preprocess") as record:
+            record.count({"UNIT1:TAG": pd.DataFrame({"UNIT1:TAG": [1, 2]})})
+
+        logger = MetaDataLogger()
+        Instrumentation.log_training_metrics([record], logger)
+        assert logger.get_metric_value("train/preprocess/rows") == 2
+        assert logger.is_metric_in_metrics("train/preprocess/wall_seconds")
+
+        Instrumentation.log_prediction_summary([record], logger)
+        assert logger.prediction_log[0].startswith("Stage wall times: preprocess=")
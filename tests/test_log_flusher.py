@@ -0,0 +1,213 @@
+import json
+import pickle
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from dummy_model import DummyModel, local_config, unit_config, write_long_data
+
+from twinn_ml_interface.mocks import (
+    ExecutorMock,
+    JsonLinesLogSink,
+    LogFlusher,
+    LogSink,
+    MlflowDirectoryLogSink,
+    SQLiteLogSink,
+)
+from twinn_ml_interface.objectmodels import LogBatch, MetaDataLogger, Metric
+
+
+class ListSink:
+    def __init__(self):
+        self.batches: list[LogBatch] = []
+        self.written = threading.Event()
+
+    def write(self, batch: LogBatch) -> None:
+        self.batches.append(batch)
+        self.written.set()
+
+    def close(self) -> None:
+        pass
+
+
+class FailingSink(ListSink):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def write(self, batch: LogBatch) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise OSError(f"Sink is full, {self.failures} failures left")
+        super().write(batch)
+
+
+def log_everything(logger: MetaDataLogger) -> None:
+    logger.log_metrics([Metric("loss", 0.5, step=0), Metric("loss", 0.25, step=1)])
+    logger.log_params({"alpha": "0.1"})
+    logger.log_db_logs({"features": ("A", "B")})
+    logger.log_prediction_string("predicted")
+
+
+class TestLogFlusher(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.logger = MetaDataLogger()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_drain(self):
+        log_everything(self.logger)
+        assert self.logger.pending == 5
+
+        batch = self.logger.drain()
+        assert len(batch) == 5
+        assert batch.metrics == [Metric("loss", 0.5, step=0), Metric("loss", 0.25, step=1)]
+        assert batch.params == {"alpha": "0.1"}
+        assert self.logger.pending == 0
+        assert not len(self.logger.drain())
+        # Drained items can still be looked up
+        assert self.logger.get_metric_value("loss") == 0.5
+        assert self.logger.is_metric_in_metrics("loss", 0.25)
+        assert self.logger.params == {"alpha": "0.1"}
+
+        self.logger.log_metric(Metric("loss", 0.125, step=2))
+        assert self.logger.drain().metrics == [Metric("loss", 0.125, step=2)]
+        assert len(self.logger.metrics) == 3
+
+    def test_flush_on_max_items(self):
+        sink = ListSink()
+        with LogFlusher(self.logger, sink, max_items=3, interval=60):
+            self.logger.log_metrics([Metric("loss", step) for step in range(3)])
+            assert sink.written.wait(10)
+            self.logger.log_metric(Metric("loss", 3))
+
+        assert [len(batch) for batch in sink.batches] == [3, 1]
+        assert self.logger.on_log is None
+
+    def test_flush_on_interval(self):
+        sink = ListSink()
+        with LogFlusher(self.logger, sink, interval=0.01):
+            self.logger.log_metric(Metric("loss", 1))
+            assert sink.written.wait(10)
+            assert self.logger.get_metric_value("loss") == 1
+            assert self.logger.pending == 0
+
+    def test_sink_error(self):
+        sink = FailingSink(failures=2)
+        flusher = LogFlusher(self.logger, sink)
+        self.logger.log_metric(Metric("loss", 1))
+        self.logger.log_params({"alpha": "0.1"})
+        flusher._write()
+        self.logger.log_metric(Metric("loss", 2))
+        self.logger.log_params({"alpha": "0.2"})
+        # The first error is raised, the failed batches are drained again
+        with self.assertRaisesRegex(OSError, "1 failures left"):
+            flusher.flush()
+        assert self.logger.metrics == [Metric("loss", 1), Metric("loss", 2)]
+        assert self.logger.pending == 3
+
+        flusher.flush()
+        assert sink.batches[0].metrics == [Metric("loss", 1), Metric("loss", 2)]
+        assert sink.batches[0].params == {"alpha": "0.2"}
+        assert self.logger.metrics == [Metric("loss", 1), Metric("loss", 2)]
+        assert not len(self.logger.drain())
+
+    def test_sink_error_does_not_hide_error(self):
+        with self.assertRaises(KeyError):
+            with LogFlusher(self.logger, FailingSink(failures=2)):
+                self.logger.log_metric(Metric("loss", 1))
+                raise KeyError("training failed")
+        assert self.logger.metrics == [Metric("loss", 1)]
+
+    def test_one_flusher_per_logger(self):
+        with LogFlusher(self.logger, ListSink()):
+            with self.assertRaisesRegex(RuntimeError, "another flusher"):
+                LogFlusher(self.logger, ListSink()).start()
+
+    def test_pickle(self):
+        with LogFlusher(self.logger, ListSink()):
+            self.logger.log_metric(Metric("loss", 1))
+            logger = pickle.loads(pickle.dumps(self.logger))  # noqa: S301
+        assert logger.on_log is None
+        logger.log_metric(Metric("loss", 2))
+        assert logger.metrics == [Metric("loss", 1), Metric("loss", 2)]
+
+    def test_json_lines_sink(self):
+        path = Path(self.tmpdir.name) / "logs.jsonl"
+        log_everything(self.logger)
+        with JsonLinesLogSink(path) as sink:
+            assert isinstance(sink, LogSink)
+            sink.write(self.logger.drain())
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["type"] for line in lines] == [
+            "metric",
+            "metric",
+            "param",
+            "db_log",
+            "prediction_log",
+        ]
+        assert lines[3]["value"] == ["A", "B"]
+
+    def test_sqlite_sink(self):
+        path = Path(self.tmpdir.name) / "logs.db"
+        with SQLiteLogSink(path) as sink:
+            for _ in range(2):
+                log_everything(self.logger)
+                sink.write(self.logger.drain())
+
+        with sqlite3.connect(path) as connection:
+            metrics = pd.read_sql("SELECT * FROM metrics", connection)
+            params = connection.execute("SELECT * FROM params").fetchall()
+        connection.close()
+        assert metrics["value"].tolist() == [0.5, 0.25, 0.5, 0.25]
+        assert params == [("alpha", '"0.1"')]
+
+    def test_mlflow_directory_sink(self):
+        directory = Path(self.tmpdir.name) / "run"
+        sink = MlflowDirectoryLogSink(directory)
+        log_everything(self.logger)
+        sink.write(self.logger.drain())
+
+        assert (directory / "metrics" / "loss").read_text().splitlines() == [
+            "0 0.5 0",
+            "0 0.25 1",
+        ]
+        assert (directory / "params" / "alpha").read_text() == "0.1"
+        assert (directory / "prediction_log.txt").read_text() == "predicted\n"
+
+    def test_executor(self):
+        path = Path(self.tmpdir.name) / "data.parquet"
+        write_long_data(path, ["UNIT1", "UNIT2"], 10)
+        config = local_config(DummyModel, path, self.tmpdir.name, "model")
+        sink = ListSink()
+        executor = ExecutorMock(config, unit_config("UNIT1"), log_sink=sink)
+        executor.run_full_flow()
+
+        metrics = [metric.key for batch in sink.batches for metric in batch.metrics]
+        assert "mean" in metrics
+        assert "train/train/wall_seconds" in metrics
+        assert sink.batches[-1].prediction_log
+        assert executor.metadata_logger.on_log is None
+
+    def test_executors_have_own_logger(self):
+        path = Path(self.tmpdir.name) / "data.parquet"
+        write_long_data(path, ["UNIT1", "UNIT2"], 10)
+        config = local_config(DummyModel, path, self.tmpdir.name, "model")
+        first = ExecutorMock(config, unit_config("UNIT1"), log_sink=ListSink())
+        second = ExecutorMock(config, unit_config("UNIT1"), log_sink=ListSink())
+        assert first.metadata_logger is not second.metadata_logger
+        assert first.metadata_logger is not ExecutorMock.metadata_logger
+
+        with first._flushing(first.metadata_logger), second._flushing(second.metadata_logger):
+            first.metadata_logger.log_metric(Metric("loss", 1))
+            first._log_flusher.flush()
+            assert first.metadata_logger.get_metric_value("loss") == 1
+            assert second.metadata_logger.get_metric_value("loss") is None
+        assert [len(batch) for batch in first.log_sink.batches] == [1]
+        assert not second.log_sink.batches
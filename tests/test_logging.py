@@ -1,10 +1,12 @@
 import tempfile
 import unittest
+from datetime import datetime, timezone
 from pathlib import Path
 
+import numpy as np
 from PIL import Image
 
-from twinn_ml_interface.objectmodels import MetaDataLogger, Metric
+from twinn_ml_interface.objectmodels import MetaDataLogger, Metric, MetricStore
 
 
 class TestMetaDataLogger(unittest.TestCase):
@@ -80,3 +82,115 @@ class TestMetaDataLogger(unittest.TestCase):
         assert self.md_logger.params == {}
         assert self.md_logger.artifacts == {}
         assert self.md_logger.db_logs == {}
+
+    def test_unpickle_earlier_version(self):
+        # The state of a logger pickled before the metrics were kept in a MetricStore
+        state = {
+            "created_on": datetime.now(timezone.utc),
+            "metrics": [Metric("m1", 0.5)],
+            "params": {"p1": 1},
+            "artifacts": {},
+            "db_logs": {},
+            "prediction_log": [],
+        }
+        md_logger = MetaDataLogger.__new__(MetaDataLogger)
+        md_logger.__setstate__(state)
+
+        md_logger.log_metric(Metric("m1", 0.7))
+        assert md_logger.metrics == [Metric("m1", 0.5), Metric("m1", 0.7)]
+        assert md_logger.get_metric_value("m1") == 0.5
+
+
+class TestMetricStore(unittest.TestCase):
+    def setUp(self):
+        self.store = MetricStore()
+        for step in range(10):
+            self.store.append(Metric("loss", 1 / (step + 1), timestamp=step, step=step))
+            self.store.append(Metric("accuracy", step / 10, timestamp=step, step=step))
+
+    def test_first_and_latest(self):
+        assert self.store.first("loss") == Metric("loss", 1.0, 0, 0)
+        assert self.store.latest("loss") == Metric("loss", 0.1, 9, 9)
+        assert self.store.latest("missing") is None
+        assert self.store.keys == ["loss", "accuracy"]
+
+    def test_query(self):
+        metrics = self.store.query("accuracy", start_step=3, end_step=5)
+        assert [metric.step for metric in metrics] == [3, 4, 5]
+        assert len(self.store.query("loss")) == 10
+        assert self.store.query("missing") == []
+
+    def test_contains(self):
+        assert self.store.contains("loss")
+        assert self.store.contains("accuracy", 0.5)
+        assert not self.store.contains("accuracy", 0.55)
+        assert not self.store.contains("missing")
+
+    def test_list_behaviour(self):
+        metrics = list(self.store)
+        assert self.store == metrics
+        assert self.store[-1] == metrics[-1]
+        assert self.store[2:4] == metrics[2:4]
+
+        self.store.insert(0, Metric("lr", 0.01))
+        del self.store[1]
+        metrics[0] = Metric("lr", 0.01)
+        assert self.store == metrics
+        assert self.store.first("loss") == metrics[2]
+
+    def test_downsampling(self):
+        store = MetricStore(max_points_per_key=100)
+        for step in range(10_000):
+            store.append(Metric("loss", step, step=step))
+            store.append(Metric("accuracy", step, step=step))
+        assert len(store.query("loss")) <= 100
+        assert store.first("loss").step == 0
+        assert store.latest("loss").step == 9999
+        steps = [metric.step for metric in store.query("accuracy")]
+        assert steps == sorted(steps)
+
+        with self.assertRaises(ValueError):
+            MetricStore(max_points_per_key=1)
+
+    def test_values_are_kept(self):
+        metrics = [Metric("num_sensors", 200), Metric("label", "best"), Metric("t", 0.5, 1.5)]
+        store = MetricStore(metrics)
+        assert store == metrics
+        assert type(store.latest("num_sensors").value) is int
+        assert store.contains("label", "best")
+        assert store.to_frame()["value"].iloc[0] == 200.0
+
+        store = MetricStore(max_points_per_key=2)
+        store.extend([Metric("n", 1), Metric("n", 2), Metric("n", 3)])
+        assert store == [Metric("n", 1), Metric("n", 3)]
+
+    def test_numpy_values(self):
+        store = MetricStore()
+        for step in range(100):
+            store.append(Metric("loss", np.float32(1 / (step + 1)), np.int64(step), step=step))
+            store.append(Metric("n", np.int64(step), step=np.int32(step)))
+            store.append(Metric("lr", 10**-step, step=step))
+
+        # Real numbers that fit a float exactly are stored in the columns only
+        assert not store._originals
+        assert store.latest("loss") == Metric("loss", np.float32(0.01), 99, 99)
+        assert type(store.latest("n").value) is int
+        assert store.contains("n", np.int64(42))
+        assert store.contains("loss", float(np.float32(0.5)))
+        assert not store.contains("loss", 0.3)
+
+        store.append(Metric("big", 2**60 + 1))
+        assert list(store._originals) == [300]
+        assert store.latest("big").value == 2**60 + 1
+
+    def test_to_frame(self):
+        df = self.store.to_frame()
+        assert list(df.columns) == ["key", "value", "timestamp", "step"]
+        assert len(df) == 20
+        assert df["key"].cat.categories.tolist() == ["loss", "accuracy"]
+        assert df[df["key"] == "loss"]["value"].iloc[-1] == 0.1
+
+    def test_to_arrow(self):
+        table = self.store.to_arrow()
+        assert table.num_rows == 20
+        assert table.column("key").to_pylist()[:2] == ["loss", "accuracy"]
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import pandas as pd
+from dummy_model import DummyModel, local_config, unit_config, write_long_data
+
+from twinn_ml_interface.mocks import ExecutorMock, ModelPool
+from twinn_ml_interface.objectmodels import Metric
+
+
+class TestModelPool(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "data.parquet"
+        write_long_data(self.path, ["UNIT1"], 10)
+        self.config = unit_config("UNIT1")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def executor(self, model_name: str, pool: ModelPool) -> ExecutorMock:
+        config = local_config(DummyModel, self.path, self.tmpdir.name, model_name)
+        return ExecutorMock(config, self.config, model_pool=pool)
+
+    def test_reuse(self):
+        pool = ModelPool()
+        executor = self.executor("model", pool)
+        executor.run_train_flow()
+
+        first = executor.predict()
+        executor.run_predict_flow()
+        assert (pool.stats.hits, pool.stats.misses) == (1, 1)
+        assert pool.stats.hit_rate == 0.5
+        # Writing predictions next to the model does not count as a change of the model
+        pd.testing.assert_frame_equal(first[0], executor.predict()[0])
+        assert (pool.stats.hits, pool.stats.misses) == (2, 1)
+
+    def test_reload_changed_files(self):
+        pool = ModelPool()
+        executor = self.executor("model", pool)
+        executor.run_train_flow()
+        model, _ = pool.get(DummyModel, self.tmpdir.name, "model", self.config)
+
+        executor.run_train_flow()
+        path = Path(self.tmpdir.name) / "model.pkl"
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+        reloaded, _ = pool.get(DummyModel, self.tmpdir.name, "model", self.config)
+
+        assert reloaded is not model
+        assert pool.stats.misses == 2
+        assert len(pool) == 1
+
+    def test_reset_logger(self):
+        pool = ModelPool()
+        self.executor("model", pool).run_train_flow()
+        _, logger = pool.get(DummyModel, self.tmpdir.name, "model", self.config)
+        logger.log_metric(Metric("m1", 1.0))
+
+        _, next_logger = pool.get(DummyModel, self.tmpdir.name, "model", self.config)
+        assert next_logger is logger
+        assert not next_logger.metrics
+
+    def test_evict_least_recently_used(self):
+        pool = ModelPool(max_models=2)
+        for name in ["a", "b", "c"]:
+            self.executor(name, pool).run_train_flow()
+        for name in ["a", "b", "a", "c", "a"]:
+            pool.get(DummyModel, self.tmpdir.name, name, self.config)
+
+        assert (pool.stats.hits, pool.stats.misses, pool.stats.evictions) == (2, 3, 1)
+        pool.get(DummyModel, self.tmpdir.name, "b", self.config)
+        assert pool.stats.misses == 4
+
+    def test_loading_does_not_block_other_models(self):
+        for name in ["slow", "fast"]:
+            self.executor(name, ModelPool()).run_train_flow()
+        loading, release = threading.Event(), threading.Event()
+
+        class SlowModel(DummyModel):
+            @staticmethod
+            def load(foldername, filename, configuration, logger):
+                loading.set()
+                assert release.wait(10)
+                return DummyModel.load(foldername, filename, configuration, logger)
+
+        pool = ModelPool()
+        slow = threading.Thread(
+            target=pool.get, args=(SlowModel, self.tmpdir.name, "slow", self.config)
+        )
+        slow.start()
+        try:
+            assert loading.wait(10)
+            # Another model is loaded while the slow one is still loading
+            pool.get(DummyModel, self.tmpdir.name, "fast", self.config)
+            assert pool.stats.misses == 2
+            assert len(pool) == 1
+        finally:
+            release.set()
+            slow.join()
+        assert len(pool) == 2
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from twinn_ml_interface.input_data import (
+    InputData,
+    concat,
+    iter_long_parquet,
+    read_long_parquet,
+)
+
+
+class TestLongParquet(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        times = pd.date_range(start="2024-01-01", periods=48, freq="1h", tz="UTC")
+        self.data = (
+            pd.concat(
+                [
+                    pd.DataFrame({"TIME": times, "ID": unit, "TYPE": tag, "VALUE": rng.random(48)})
+                    for unit in ["UNIT1", "UNIT2"]
+                    for tag in ["FLOW", "LEVEL"]
+                ]
+            )
+            .sample(frac=1, random_state=0)
+            .reset_index(drop=True)
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "data.parquet"
+        self.data.to_parquet(self.path, row_group_size=20)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_read_all(self):
+        input_data = read_long_parquet(self.path, batch_size=7)
+        assert input_data == InputData.from_long_df(self.data)
+
+    def test_read_filtered(self):
+        start, end = pd.Timestamp("2024-01-01 10:00"), pd.Timestamp("2024-01-02 10:00")
+        input_data = read_long_parquet(
+            self.path, start=start, end=end, unit_tags=["UNIT1:FLOW", "UNIT2:LEVEL"], batch_size=7
+        )
+
+        mask = self.data["TIME"].between(start.tz_localize("UTC"), end.tz_localize("UTC"))
+        expected = InputData.from_long_df(self.data[mask])
+        del expected["UNIT1:LEVEL"], expected["UNIT2:FLOW"]
+        assert input_data == expected
+        assert read_long_parquet(self.path, unit_tags=[]) == InputData()
+
+    def test_read_columns(self):
+        data = self.data.assign(QUALITY=1, SOURCE="sensor")
+        data.to_parquet(self.path, row_group_size=20)
+
+        def expected(df: pd.DataFrame) -> InputData:
+            # The record batches are concatenated, which sorts the columns
+            input_data = InputData.from_long_df(df)
+            return InputData({key: df[sorted(df.columns)] for key, df in input_data.items()})
+
+        # All columns are read, unless only some are requested
+        assert read_long_parquet(self.path) == expected(data)
+        assert read_long_parquet(self.path, columns=["QUALITY"]) == expected(
+            data.drop(columns="SOURCE")
+        )
+        assert read_long_parquet(self.path, columns=[]) == InputData.from_long_df(self.data)
+
+    def test_iter_windows(self):
+        windows = list(
+            iter_long_parquet(
+                self.path,
+                start=pd.Timestamp("2024-01-01"),
+                end=pd.Timestamp("2024-01-03"),
+                window=timedelta(hours=10),
+            )
+        )
+
+        assert len(windows) == 5
+        assert all(
+            window.max_datetime - window.min_datetime <= timedelta(hours=9) for window in windows
+        )
+        assert concat(*windows) == InputData.from_long_df(self.data)
@@ -0,0 +1,136 @@
+import unittest
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from twinn_ml_interface.mocks import ConfigurationMock, DataRequest, DataRequestPlanner
+from twinn_ml_interface.mocks.planner import merge_intervals
+from twinn_ml_interface.objectmodels import (
+    AvailabilityLevel,
+    DataLabelConfigTemplate,
+    DataLevel,
+    UnitTag,
+)
+
+NOW = pd.Timestamp("2024-01-10", tz="UTC")
+
+
+def unit_tags(*names: str) -> list[UnitTag]:
+    return [UnitTag.from_string(name) for name in names]
+
+
+class ModelStub:
+    @staticmethod
+    def get_target_template() -> UnitTag:
+        return UnitTag.from_string("UNIT1:TARGET")
+
+    @staticmethod
+    def get_data_config_template() -> list[DataLabelConfigTemplate]:
+        return [
+            DataLabelConfigTemplate(
+                DataLevel.SENSOR, unit_tags("UNIT1:A", "UNIT1:B"), max_lookback=timedelta(days=7)
+            ),
+            DataLabelConfigTemplate(
+                DataLevel.SENSOR, unit_tags("UNIT1:B"), max_lookback=timedelta(days=2)
+            ),
+            DataLabelConfigTemplate(
+                DataLevel.WEATHER,
+                unit_tags("UNIT1:RAIN"),
+                max_lookback=timedelta(days=1),
+                horizon=timedelta(days=2),
+            ),
+        ]
+
+
+class OtherModelStub(ModelStub):
+    @staticmethod
+    def get_data_config_template() -> list[DataLabelConfigTemplate]:
+        return [
+            DataLabelConfigTemplate(
+                DataLevel.SENSOR,
+                unit_tags("UNIT1:A"),
+                availability_level=AvailabilityLevel.FILTER,
+                max_lookback=timedelta(days=1),
+            ),
+        ]
+
+
+class TestDataRequestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.config = ConfigurationMock("UNIT1:TARGET", "UNIT1", {}, [], [])
+
+    def test_plan(self):
+        planner = DataRequestPlanner()
+        assert planner.add(ModelStub, self.config, NOW) == {
+            "UNIT1:A",
+            "UNIT1:B",
+            "UNIT1:RAIN",
+            "UNIT1:TARGET",
+        }
+
+        # B is requested twice, the shorter range is contained in the longer one
+        assert planner.plan() == [
+            DataRequest(
+                DataLevel.SENSOR,
+                AvailabilityLevel.ALL,
+                ("UNIT1:A", "UNIT1:B"),
+                NOW - timedelta(days=7),
+                NOW,
+            ),
+            DataRequest(
+                DataLevel.SENSOR,
+                AvailabilityLevel.ALL,
+                ("UNIT1:TARGET",),
+                NOW - timedelta(days=7),
+                NOW + timedelta(days=2),
+            ),
+            DataRequest(
+                DataLevel.WEATHER,
+                AvailabilityLevel.ALL,
+                ("UNIT1:RAIN",),
+                NOW - timedelta(days=1),
+                NOW + timedelta(days=2),
+            ),
+        ]
+
+    def test_plan_many_models(self):
+        planner = DataRequestPlanner()
+        planner.add(ModelStub, self.config, NOW)
+        planner.add(ModelStub, self.config, NOW + timedelta(days=3))
+        planner.add(OtherModelStub, self.config, datetime(2024, 1, 30))
+
+        requests = planner.plan()
+        sensor = [request for request in requests if "UNIT1:A" in request.unit_tags]
+        assert [(r.availability_level, r.start, r.end) for r in sensor] == [
+            (AvailabilityLevel.ALL, NOW - timedelta(days=7), NOW + timedelta(days=3)),
+            (
+                AvailabilityLevel.FILTER,
+                pd.Timestamp("2024-01-29", tz="UTC"),
+                pd.Timestamp("2024-01-30", tz="UTC"),
+            ),
+        ]
+
+        merged = planner.plan(merge_levels=True)
+        assert {request.data_level for request in merged} == {None}
+        a_ranges = [(r.start, r.end) for r in merged if "UNIT1:A" in r.unit_tags]
+        assert a_ranges == [
+            (NOW - timedelta(days=7), NOW + timedelta(days=3)),
+            (pd.Timestamp("2024-01-29", tz="UTC"), pd.Timestamp("2024-01-30", tz="UTC")),
+        ]
+
+    def test_without_reference_time(self):
+        planner = DataRequestPlanner()
+        planner.add(ModelStub, self.config)
+
+        assert planner.plan(merge_levels=True) == [
+            DataRequest(None, None, ("UNIT1:A", "UNIT1:B", "UNIT1:RAIN", "UNIT1:TARGET"))
+        ]
+
+    def test_merge_intervals(self):
+        day = timedelta(days=1)
+        assert merge_intervals([(NOW + 2 * day, NOW + 3 * day), (NOW, NOW + day)]) == [
+            (NOW, NOW + day),
+            (NOW + 2 * day, NOW + 3 * day),
+        ]
+        assert merge_intervals([(NOW, NOW + 2 * day), (NOW + day, None)]) == [(NOW, None)]
+        assert merge_intervals([(NOW, NOW + day), (None, NOW)]) == [(None, NOW + day)]
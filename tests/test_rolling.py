@@ -0,0 +1,56 @@
+import unittest
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from twinn_ml_interface.input_data import InputData, RollingInputData
+from twinn_ml_interface.objectmodels import DataLabelConfigTemplate, DataLevel
+
+
+class TestRollingInputData(unittest.TestCase):
+    def setUp(self):
+        times = pd.date_range(start="2024-01-01", periods=100, freq="1min", tz="UTC")
+        self.data = pd.concat(
+            [
+                pd.DataFrame({"TIME": times, "ID": unit, "TYPE": "TAG", "VALUE": np.arange(100.0)})
+                for unit in ["UNIT1", "UNIT2"]
+            ]
+        ).reset_index(drop=True)
+
+    def test_append_in_ticks(self):
+        window = RollingInputData()
+        for start in range(0, 100, 7):
+            window.append_long_df(self.data[self.data["TIME"].dt.minute.between(start, start + 6)])
+
+        assert window.to_input_data() == InputData.from_long_df(self.data)
+
+    def test_late_data(self):
+        window = RollingInputData()
+        window.append_long_df(self.data.iloc[50:100])
+        window.append_long_df(self.data.iloc[0:50])
+
+        assert window.to_input_data() == InputData.from_long_df(self.data.iloc[0:100])
+
+    def test_eviction(self):
+        config = [
+            DataLabelConfigTemplate(DataLevel.SENSOR, [], max_lookback=timedelta(minutes=5)),
+            DataLabelConfigTemplate(DataLevel.SENSOR, [], max_lookback=timedelta(minutes=10)),
+        ]
+        window = RollingInputData.from_data_config(config)
+        window.append_long_df(self.data)
+        input_data = window.to_input_data()
+
+        assert window.max_lookback == timedelta(minutes=10)
+        assert input_data.max_datetime - input_data.min_datetime == timedelta(minutes=10)
+        assert len(window) == 22
+
+    def test_views_remain_valid(self):
+        window = RollingInputData(max_lookback=timedelta(minutes=3))
+        window.append_long_df(self.data.iloc[:10])
+        before = window.to_input_data()
+        expected = before["UNIT1:TAG"].copy()
+        for start in range(10, 100, 10):
+            window.append_long_df(self.data.iloc[start : start + 10])
+
+        assert before["UNIT1:TAG"].equals(expected)
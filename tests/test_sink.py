@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+
+import pandas as pd
+
+from twinn_ml_interface.mocks import PredictionSink
+
+
+class TestPredictionSink(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        index = pd.date_range(start="2024-01-01", periods=3, freq="1h", tz="UTC", name="TIME")
+        self.prediction = pd.DataFrame({"UNIT1:TAG": [1.0, 2.0, 3.0]}, index=index)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_batches(self):
+        sink = PredictionSink(self.tmpdir.name, max_rows=5)
+        sink.add("model_a", [self.prediction])
+        assert not sink.files
+        sink.add("model_b", [self.prediction, self.prediction])
+        assert len(sink.files) == 1
+        sink.add("model_c", [self.prediction])
+        sink.close()
+
+        assert len(sink.files) == 2
+        written = pd.read_parquet(self.tmpdir.name)
+        assert written["MODEL"].value_counts().to_dict() == {
+            "model_b": 6,
+            "model_a": 3,
+            "model_c": 3,
+        }
+
+    def test_empty(self):
+        with PredictionSink(self.tmpdir.name) as sink:
+            sink.add("model_a", [])
+
+        assert not sink.files
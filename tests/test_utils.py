@@ -0,0 +1,135 @@
+import unittest
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from twinn_ml_interface.input_data import (
+    DuplicatePolicy,
+    InputData,
+    align_to_array,
+    aligned_index,
+    concat,
+    take_slice,
+    take_slices,
+)
+
+
+class TestInputDataUtils(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame(
+            {
+                "TIME": pd.date_range(start="2024-01-01", periods=10, freq="1h", tz="UTC"),
+                "ID": ["UNIT1"] * 5 + ["UNIT2"] * 5,
+                "TYPE": "TAG",
+                "VALUE": np.arange(10, dtype="float64"),
+            }
+        )
+        self.input_data = InputData.from_long_df(self.data)
+
+    def test_to_wide(self):
+        data = self.data.assign(ID=["UNIT1", "UNIT2"] * 5)
+        data.loc[4, "VALUE"] = np.nan
+        input_data = InputData.from_long_df(data)
+
+        wide = input_data.to_wide()
+        assert wide.columns.tolist() == ["UNIT1:TAG", "UNIT2:TAG"]
+        assert len(wide) == 10
+        assert wide["UNIT1:TAG"].isna().sum() == 6
+
+        resampled = input_data.to_wide("2h", agg="mean")
+        expected = pd.concat(
+            [df[key].resample("2h").mean() for key, df in input_data.items()], axis=1
+        )
+        pd.testing.assert_frame_equal(resampled, expected, check_freq=False)
+
+        filled = input_data.to_wide(ffill_limit=1)
+        np.testing.assert_array_equal(
+            filled["UNIT1:TAG"], [0, 0, 2, 2, np.nan, np.nan, 6, 6, 8, 8]
+        )
+
+    def test_align_into_buffer(self):
+        index = aligned_index(self.input_data, "3h")
+        out = np.empty((len(index), 2))
+        result_index, columns, values = align_to_array(self.input_data, "3h", agg="max", out=out)
+
+        assert values is out
+        assert result_index.equals(index)
+        np.testing.assert_array_equal(out[:, columns.index("UNIT1:TAG")], [2, 4, np.nan, np.nan])
+
+    def test_concat(self):
+        first = InputData.from_long_df(self.data.iloc[:3])
+        second = InputData.from_long_df(self.data.iloc[3:])
+
+        assert concat(first, second) == self.input_data
+        # Chunks that are not in chronological order are sorted
+        assert concat(second, first) == self.input_data
+        assert concat() == InputData()
+
+    def test_concat_duplicates(self):
+        first = InputData.from_long_df(self.data)
+        second = InputData.from_long_df(self.data.assign(VALUE=-1.0).iloc[3:7])
+
+        assert len(concat(first, second)["UNIT1:TAG"]) == 7
+        keep_first = concat(first, second, duplicates=DuplicatePolicy.KEEP_FIRST)
+        assert keep_first == first
+        keep_last = concat(first, second, duplicates=DuplicatePolicy.KEEP_LAST)
+        assert keep_last["UNIT1:TAG"]["UNIT1:TAG"].tolist() == [0, 1, 2, -1, -1]
+        with self.assertRaises(ValueError):
+            concat(first, second, duplicates=DuplicatePolicy.ERROR)
+
+    def test_concat_duplicates_in_single_data(self):
+        data = InputData.from_long_df(pd.concat([self.data.iloc[:3], self.data.iloc[1:2]]))
+        empty = take_slice(
+            data,
+            datetime(2024, 1, 2, tzinfo=timezone.utc),
+            datetime(2024, 1, 3, tzinfo=timezone.utc),
+        )
+
+        # The policy applies when only one InputData has data for a unit tag
+        for others in [(), (empty,)]:
+            keep_first = concat(data, *others, duplicates=DuplicatePolicy.KEEP_FIRST)
+            assert not keep_first["UNIT1:TAG"].index.has_duplicates
+            with self.assertRaises(ValueError):
+                concat(data, *others, duplicates=DuplicatePolicy.ERROR)
+
+    def test_take_slice(self):
+        result = take_slice(self.input_data, datetime(2024, 1, 1, 3), datetime(2024, 1, 1, 6))
+
+        assert result["UNIT1:TAG"]["UNIT1:TAG"].tolist() == [3, 4]
+        assert result["UNIT2:TAG"]["UNIT2:TAG"].tolist() == [5, 6]
+
+    def test_take_slice_views(self):
+        start, end = datetime(2024, 1, 1, 3), datetime(2024, 1, 1, 6)
+        view = take_slice(self.input_data, start, end)["UNIT1:TAG"]
+        copy = take_slice(self.input_data, start, end, copy=True)["UNIT1:TAG"]
+
+        # Writing to a view writes to the source, unless the slice is copied
+        view.iloc[0, 0] = 100.0
+        assert self.input_data["UNIT1:TAG"]["UNIT1:TAG"].tolist() == [0, 1, 2, 100, 4]
+        copy.iloc[1, 0] = -1.0
+        assert self.input_data["UNIT1:TAG"].iloc[4, 0] == 4
+
+    def test_take_slice_empty(self):
+        result = take_slice(
+            self.input_data,
+            datetime(2024, 1, 2, tzinfo=timezone.utc),
+            datetime(2024, 1, 3, tzinfo=timezone.utc),
+        )
+
+        assert result.unit_tags == self.input_data.unit_tags
+        assert not result
+
+    def test_take_slices(self):
+        windows = [
+            (datetime(2024, 1, 1, 0), datetime(2024, 1, 1, 4)),
+            (datetime(2024, 1, 1, 5), datetime(2024, 1, 1, 9)),
+            (datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 5)),
+        ]
+        first, second, empty = take_slices(self.input_data, windows)
+
+        assert first == take_slice(self.input_data, *windows[0])
+        assert first.unit_tags == {"UNIT1:TAG", "UNIT2:TAG"}
+        assert first["UNIT2:TAG"].empty
+        assert second["UNIT2:TAG"]["UNIT2:TAG"].tolist() == [5, 6, 7, 8, 9]
+        assert not empty
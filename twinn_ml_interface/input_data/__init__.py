@@ -1,8 +1,27 @@
-from .input_data import InputData
-from .utils import concat, take_slice
+from .align import align, align_to_array, aligned_index
+from .arrow import ArrowLayout
+from .cache import InputDataCache, PreprocessCache
+from .columnar import ColumnarInputData
+from .input_data import InputData, ValidationMode
+from .parquet import iter_long_parquet, read_long_parquet
+from .rolling import RollingInputData
+from .utils import DuplicatePolicy, concat, take_slice, take_slices
 
 __all__ = [
+    "ArrowLayout",
+    "ColumnarInputData",
+    "DuplicatePolicy",
     "InputData",
+    "InputDataCache",
+    "PreprocessCache",
+    "RollingInputData",
+    "ValidationMode",
+    "align",
+    "align_to_array",
+    "aligned_index",
     "concat",
+    "iter_long_parquet",
+    "read_long_parquet",
     "take_slice",
+    "take_slices",
 ]
@@ -0,0 +1,64 @@
+"""Content hashes of DataFrames, computed over the underlying buffers."""
+
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+DIGEST_SIZE = 16
+
+
+def _update(digest, values) -> None:
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        array = np.ascontiguousarray(values)
+        digest.update(f"{array.dtype.str}:{len(array)}".encode())
+        digest.update(array.view(np.uint8))
+    else:
+        # Strings, objects and extension arrays are hashed element wise by pandas first
+        hashes = pd.util.hash_array(values)
+        digest.update(f"{values.dtype!r}:{len(hashes)}".encode())
+        digest.update(hashes.view(np.uint8))
+        if values.dtype == object:
+            # pandas hashes 1 and "1" alike, so the type of every element is hashed as well
+            types = np.array([type(value).__qualname__ for value in values], dtype=object)
+            digest.update(pd.util.hash_array(types).view(np.uint8))
+
+
+def frame_digest(df: pd.DataFrame) -> bytes:
+    """Hash the index, column names, dtypes and values of a DataFrame.
+
+    Equal digests mean equal DataFrames. The reverse does not always hold, for instance 0.0 and
+    -0.0 are equal but hash differently.
+
+    Args:
+        df (pd.DataFrame): the DataFrame.
+
+    Returns:
+        bytes: the digest
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    index = df.index
+    digest.update(str(index.dtype).encode())
+    _update(digest, index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy())
+    for name, column in df.items():
+        digest.update(repr(name).encode())
+        _update(digest, column.to_numpy() if isinstance(column.dtype, np.dtype) else column.array)
+    return digest.digest()
+
+
+def combine_digests(digests: dict[str, bytes]) -> str:
+    """Combine the digests of all unit tags, independent of their order.
+
+    Args:
+        digests (dict[str, bytes]): digest per unit tag.
+
+    Returns:
+        str: hexadecimal digest
+    """
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    for key in sorted(digests):
+        digest.update(key.encode())
+        digest.update(digests[key])
+    return digest.hexdigest()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMS_LONG_FORMAT = {"TIME", "ID", "TYPE", "VALUE"}
+
+
+def check_long_df(df: pd.DataFrame) -> None:
+    if missing_cols := REQUIRED_COLUMS_LONG_FORMAT - set(df.columns):
+        raise KeyError(f"DataFrame does not contain required columns {missing_cols}")
+    if not pd.api.types.is_datetime64_any_dtype(df["TIME"]):
+        raise TypeError("Column TIME of the long format DataFrame must be of datetime type")
+
+
+def group_long_df(
+    df: pd.DataFrame, assume_sorted: bool = False
+) -> tuple[list[str], np.ndarray, np.ndarray | None]:
+    """Compute the `UNIT:TAG` groups of a long format DataFrame in a single pass.
+
+    Rows are (stably) ordered by ID, TYPE and TIME, which is the order in which `InputData`
+    stores its series. Rows with a missing ID or TYPE are dropped, like `DataFrame.groupby` does.
+
+    Args:
+        df (pd.DataFrame): DataFrame with at least the columns TIME, ID and TYPE.
+        assume_sorted (bool, optional): Whether the rows are already ordered by ID, TYPE and TIME.
+            The order is verified, which is much cheaper than sorting. Defaults to False.
+
+    Returns:
+        list[str]: the sorted unit tags, one per group.
+        np.ndarray: offsets of length `len(unit_tags) + 1`, group `i` spans the rows
+            `offsets[i]:offsets[i + 1]` of the ordered DataFrame.
+        np.ndarray | None: positions that order the rows of `df`, None if no reordering is needed.
+    """
+    id_codes, ids = pd.factorize(df["ID"], sort=True)
+    type_codes, types = pd.factorize(df["TYPE"], sort=True)
+    valid = (id_codes >= 0) & (type_codes >= 0)
+    group_codes, groups = pd.factorize(
+        np.where(valid, id_codes.astype(np.int64) * len(types) + type_codes, -1), sort=True
+    )
+    if not valid.all():
+        # Rows without ID or TYPE form the first group, since -1 sorts first
+        group_codes -= 1
+        groups = groups[1:]
+    unit_tags = [f"{ids[group // len(types)]}:{types[group % len(types)]}" for group in groups]
+
+    times = df["TIME"].array.asi8
+    if assume_sorted:
+        if not valid.all():
+            raise ValueError("DataFrame contains rows without ID or TYPE")
+        same_group = np.diff(group_codes) == 0
+        if (np.diff(group_codes) < 0).any() or (np.diff(times)[same_group] < 0).any():
+            raise ValueError("DataFrame is not sorted by ID, TYPE and TIME")
+        order = None
+    else:
+        order = np.lexsort((times, group_codes))
+        if not valid.all():
+            order = order[valid[order]]
+        if len(order) == len(df) and (np.diff(order) == 1).all():
+            order = None
+
+    offsets = np.zeros(len(groups) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(group_codes[valid], minlength=len(groups)), out=offsets[1:])
+    return unit_tags, offsets, order
+
+
+def concat_arrays(arrays: list[np.ndarray | pd.api.extensions.ExtensionArray]):
+    """Concatenate arrays into one newly allocated array, keeping extension dtypes."""
+    # `Series.array` wraps NumPy data in a NumpyExtensionArray, unwrapping it is free
+    arrays = [
+        array.to_numpy() if isinstance(array, pd.arrays.NumpyExtensionArray) else array
+        for array in arrays
+    ]
+    if all(isinstance(array, np.ndarray) for array in arrays):
+        return np.concatenate(arrays)
+    return pd.concat([pd.Series(array, copy=False) for array in arrays], ignore_index=True).array
+
+
+def repeat_labels(
+    labels: list[str], lengths: np.ndarray, categorical: bool
+) -> pd.Categorical | np.ndarray:
+    """Repeat every label `lengths` times, as categorical or as object array."""
+    codes, categories = pd.factorize(np.asarray(labels, dtype=object), sort=True)
+    codes = np.repeat(codes, lengths)
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=categories)
+    return np.asarray(categories, dtype=object).take(codes)
+
+
+def epochs_to_index(epochs: np.ndarray, tz=None) -> pd.DatetimeIndex:
+    """Create a DatetimeIndex named TIME from nanosecond epochs (UTC).
+
+    The epochs are not copied for naive indexes. Localizing to a timezone copies them once.
+    """
+    index = pd.DatetimeIndex(epochs.view("M8[ns]"), name="TIME", copy=False)
+    return index if tz is None else index.tz_localize("UTC").tz_convert(tz)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+from ._long_format import epochs_to_index
+
+AGGREGATIONS = ("mean", "sum", "min", "max", "first", "last", "count")
+
+
+def _epochs(df: pd.DataFrame) -> np.ndarray:
+    return df.index.as_unit("ns").asi8
+
+
+def _step(freq: str | pd.Timedelta) -> int:
+    offset = pd.tseries.frequencies.to_offset(freq)
+    try:
+        return pd.Timedelta(offset).value
+    except ValueError as error:
+        raise ValueError(
+            f"Only fixed frequencies can be used to align data, not {freq}"
+        ) from error
+
+
+def _timezone(data: Mapping[str, pd.DataFrame]):
+    return next(iter(data.values())).index.tz if data else None
+
+
+def _grid(
+    data: Mapping[str, pd.DataFrame], freq: str | pd.Timedelta | None
+) -> tuple[np.ndarray | tuple[int, int], int]:
+    """The union of all timestamps if `freq` is None, else the origin and step of the grid."""
+    non_empty = [df for df in data.values() if not df.empty]
+    if freq is None:
+        epochs = [_epochs(df) for df in non_empty]
+        return np.unique(np.concatenate(epochs)) if epochs else np.array([], dtype=np.int64), 0
+
+    step = _step(freq)
+    if not non_empty:
+        return (0, step), 0
+    first = min(df.index[0] for df in non_empty)
+    last = max(_epochs(df)[-1] for df in non_empty)
+    # Like `DataFrame.resample`, the bins start at midnight of the first day
+    origin = first.normalize().as_unit("ns").value
+    return (origin, step), (last - origin) // step + 1
+
+
+def aligned_index(
+    data: Mapping[str, pd.DataFrame], freq: str | pd.Timedelta | None = None
+) -> pd.DatetimeIndex:
+    """Get the index of the aligned data, for instance to allocate a buffer for `align_to_array`.
+
+    Args:
+        data (Mapping[str, pd.DataFrame]): the data to align.
+        freq (str | pd.Timedelta | None, optional): fixed frequency of the grid. Defaults to
+            None, using the union of all timestamps.
+
+    Returns:
+        pd.DatetimeIndex: the timestamps of the aligned data
+    """
+    return _index(*_grid(data, freq), freq, _timezone(data))
+
+
+def _index(grid: np.ndarray | tuple[int, int], n_rows: int, freq, tz) -> pd.DatetimeIndex:
+    if freq is not None:
+        origin, step = grid
+        grid = origin + step * np.arange(n_rows, dtype=np.int64)
+    return epochs_to_index(grid, tz)
+
+
+def _aggregate(values: np.ndarray, starts: np.ndarray, agg: str) -> np.ndarray:
+    if agg == "first":
+        return values[starts]
+    if agg == "last":
+        return values[np.append(starts[1:], len(values)) - 1]
+    if agg == "min":
+        return np.minimum.reduceat(values, starts)
+    if agg == "max":
+        return np.maximum.reduceat(values, starts)
+    counts = np.diff(np.append(starts, len(values)))
+    if agg == "count":
+        return counts
+    sums = np.add.reduceat(values, starts)
+    return sums if agg == "sum" else sums / counts
+
+
+def _forward_fill(column: np.ndarray, limit: int | None) -> None:
+    positions = np.arange(len(column))
+    last_valid = np.where(np.isnan(column), -1, positions)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    fill = np.isnan(column) & (last_valid >= 0)
+    if limit is not None:
+        fill &= positions - last_valid <= limit
+    column[fill] = column[last_valid[fill]]
+
+
+def align_to_array(
+    data: Mapping[str, pd.DataFrame],
+    freq: str | pd.Timedelta | None = None,
+    agg: str = "mean",
+    ffill_limit: int | None = 0,
+    unit_tags: list[str] | None = None,
+    out: np.ndarray | None = None,
+) -> tuple[pd.DatetimeIndex, list[str], np.ndarray]:
+    """Align all unit tags on a common time grid, as a 2-D array with one column per unit tag.
+
+    Every unit tag is placed on the grid with a single vectorised pass over its sorted index,
+    without joining DataFrames. With a frequency, the values within every bin are aggregated
+    (NaNs are ignored); without one, the grid is the union of all timestamps.
+
+    Args:
+        data (Mapping[str, pd.DataFrame]): the data to align, the column named after the unit
+            tag must be numeric.
+        freq (str | pd.Timedelta | None, optional): fixed frequency of the grid, like "15min".
+            Defaults to None, using the union of all timestamps.
+        agg (str, optional): aggregation of the values within a bin, one of AGGREGATIONS.
+            Defaults to "mean".
+        ffill_limit (int | None, optional): maximum number of consecutive missing values to
+            forward fill, None to fill all. Defaults to 0, no forward filling.
+        unit_tags (list[str] | None, optional): unit tags to use as columns, in this order.
+            Defaults to None, using all unit tags.
+        out (np.ndarray | None, optional): float64 buffer of shape (len(index), len(unit_tags))
+            to write the result into, for instance a `np.memmap`. See `aligned_index`.
+            Defaults to None, allocating a new array.
+
+    Returns:
+        pd.DatetimeIndex: the timestamps of the rows
+        list[str]: the unit tags of the columns
+        np.ndarray: the aligned values
+    """
+    if agg not in AGGREGATIONS:
+        raise ValueError(f"agg must be one of {AGGREGATIONS}, not {agg}")
+    unit_tags = list(data) if unit_tags is None else list(unit_tags)
+    selection = {key: data[key] for key in unit_tags}
+    grid, n_rows = _grid(selection, freq)
+    index = _index(grid, n_rows, freq, _timezone(selection))
+
+    shape = (len(index), len(unit_tags))
+    if out is None:
+        out = np.empty(shape, dtype=np.float64)
+    elif out.shape != shape or out.dtype != np.float64:
+        raise ValueError(f"out must be a float64 array of shape {shape}")
+    # Like `DataFrame.resample`, empty bins count and sum to 0
+    out.fill(0 if agg in ("count", "sum") and freq is not None else np.nan)
+
+    for column, key in enumerate(unit_tags):
+        values = data[key][key].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            continue
+        epochs, values = _epochs(data[key])[valid], values[valid]
+        if freq is None:
+            bins = np.searchsorted(grid, epochs)
+        else:
+            origin, step = grid
+            bins = (epochs - origin) // step
+        starts = np.flatnonzero(np.diff(bins, prepend=-1))
+        out[bins[starts], column] = _aggregate(values, starts, agg)
+        if ffill_limit != 0:
+            _forward_fill(out[:, column], ffill_limit)
+
+    return index, unit_tags, out
+
+
+def align(
+    data: Mapping[str, pd.DataFrame],
+    freq: str | pd.Timedelta | None = None,
+    agg: str = "mean",
+    ffill_limit: int | None = 0,
+    unit_tags: list[str] | None = None,
+    out: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """Align all unit tags on a common time grid, as a DataFrame with one column per unit tag.
+
+    See `align_to_array` for the arguments. The DataFrame is a view on the aligned array.
+
+    Returns:
+        pd.DataFrame: the aligned data, indexed by TIME
+    """
+    index, columns, values = align_to_array(data, freq, agg, ffill_limit, unit_tags, out)
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
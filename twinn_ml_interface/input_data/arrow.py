@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ._long_format import REQUIRED_COLUMS_LONG_FORMAT, epochs_to_index
+from .input_data import InputData
+
+ArrowData = pa.Table | pa.RecordBatch | pa.RecordBatchReader | Iterable[pa.RecordBatch]
+
+# Schema metadata with the columns and dtypes of the unit tags whose batch was cast to the
+# common schema, so `from_arrow` can restore them
+COLUMNS_METADATA_KEY = b"twinn_ml_interface.columns"
+
+
+class ArrowLayout(str, Enum):
+    """Layout of InputData as Arrow data.
+
+    `LONG` has the columns TIME, VALUE, ID and TYPE (and any other columns of the DataFrames),
+    with one row per value. `WIDE` has a TIME column and one column per unit tag, with the
+    unit tags aligned on a common time grid.
+    """
+
+    LONG = "long"
+    WIDE = "wide"
+
+
+def _time_array(index: pd.DatetimeIndex) -> pa.Array:
+    # Epochs are UTC, so a tz-aware index keeps its instants. `asi8` is a view, only other
+    # units than ns are converted.
+    epochs = (index if index.unit == "ns" else index.as_unit("ns")).asi8
+    tz = None if index.tz is None else str(index.tz)
+    return pa.array(epochs).view(pa.timestamp("ns", tz=tz))
+
+
+def _value_array(values: np.ndarray | pd.api.extensions.ExtensionArray) -> pa.Array:
+    # Numeric numpy buffers are wrapped without copying, NaN becomes null like in pandas
+    if isinstance(values, pd.arrays.NumpyExtensionArray):
+        values = values.to_numpy()
+    return pa.array(values, from_pandas=True)
+
+
+def _long_batches(input_data: InputData) -> list[pa.RecordBatch]:
+    keys = list(input_data.keys())
+    ids, types = zip(*(key.split(":") for key in keys)) if keys else ((), ())
+    id_codes, id_dictionary = pd.factorize(np.asarray(ids, dtype=object), sort=True)
+    type_codes, type_dictionary = pd.factorize(np.asarray(types, dtype=object), sort=True)
+    id_dictionary = pa.array(id_dictionary, type=pa.string())
+    type_dictionary = pa.array(type_dictionary, type=pa.string())
+
+    batches = []
+    for key, id_code, type_code in zip(keys, id_codes, type_codes):
+        df = input_data[key]
+        columns = {"TIME": _time_array(df.index), "VALUE": _value_array(df[key].array)}
+        for column in df.columns:
+            if column != key:
+                columns[column] = _value_array(df[column].array)
+        # Every batch holds one unit tag, so the ID and TYPE indices are constant
+        n = len(df)
+        columns["ID"] = pa.DictionaryArray.from_arrays(
+            np.full(n, id_code, dtype=np.int32), id_dictionary
+        )
+        columns["TYPE"] = pa.DictionaryArray.from_arrays(
+            np.full(n, type_code, dtype=np.int32), type_dictionary
+        )
+        batches.append(pa.RecordBatch.from_pydict(columns))
+    return batches
+
+
+def _unify_batches(input_data: InputData, batches: list[pa.RecordBatch]) -> pa.Table:
+    # Promotes the types of the columns, like int64 and double to double, and adds missing
+    # columns as nulls
+    try:
+        schema = pa.unify_schemas(
+            [batch.schema for batch in batches], promote_options="permissive"
+        )
+    except (pa.ArrowTypeError, pa.ArrowInvalid, pa.ArrowNotImplementedError) as error:
+        types: dict[str, set[str]] = {}
+        for batch in batches:
+            for field in batch.schema:
+                types.setdefault(field.name, set()).add(str(field.type))
+        conflicts = {name: sorted(names) for name, names in types.items() if len(names) > 1}
+        raise TypeError(
+            f"The unit tags have columns with types that Arrow cannot combine: {conflicts}. "
+            "Convert these columns to one type first."
+        ) from error
+    restore, unified = {}, []
+    for key, batch in zip(input_data.keys(), batches):
+        if batch.schema != schema:
+            restore[key] = [
+                [column, str(dtype)] for column, dtype in input_data[key].dtypes.items()
+            ]
+            names = batch.schema.names
+            columns = [
+                (
+                    batch.column(field.name).cast(field.type)
+                    if field.name in names
+                    else pa.nulls(batch.num_rows, field.type)
+                )
+                for field in schema
+            ]
+            batch = pa.RecordBatch.from_arrays(columns, schema=schema)
+        unified.append(batch)
+    schema = schema.with_metadata({COLUMNS_METADATA_KEY: json.dumps(restore)})
+    return pa.Table.from_batches(unified, schema=schema)
+
+
+def _wide_table(input_data: InputData, **align_kwargs) -> pa.Table:
+    wide = input_data.to_wide(**align_kwargs)
+    columns = {"TIME": _time_array(wide.index)}
+    for column in wide.columns:
+        columns[column] = _value_array(wide[column].to_numpy())
+    return pa.table(columns)
+
+
+def to_arrow(
+    input_data: InputData,
+    layout: ArrowLayout | str = ArrowLayout.LONG,
+    **align_kwargs,
+) -> pa.Table:
+    """Convert InputData to a `pyarrow.Table`.
+
+    In the long layout, the table has one chunk per unit tag that wraps the buffers of its
+    DataFrame: numeric values and timestamps are not copied. ID and TYPE are dictionary
+    encoded. When the DataFrames of the unit tags have different columns or dtypes, the chunks
+    of the other unit tags are cast to a common schema, for instance int64 to double, and get
+    null columns for the columns they miss. Their own columns and dtypes are kept in the schema
+    metadata, so `from_arrow` restores them. Types that cannot be combined, like numbers and
+    strings, raise a TypeError. The wide layout aligns the unit tags with `InputData.to_wide`
+    first.
+
+    Timestamps keep their timezone, so UTC data stays UTC, and are stored in nanoseconds.
+    Indexes in other units than nanoseconds are converted, which copies their timestamps.
+
+    Args:
+        input_data (InputData): the data.
+        layout (ArrowLayout | str, optional): long or wide. Defaults to long.
+        **align_kwargs: arguments of `InputData.to_wide` (freq, agg, ffill_limit) for the wide
+            layout.
+
+    Returns:
+        pa.Table: the data
+
+    Raises:
+        TypeError: if a column has types in different unit tags that cannot be combined.
+    """
+    layout = ArrowLayout(layout)
+    if layout is ArrowLayout.WIDE:
+        return _wide_table(input_data, **align_kwargs)
+    if align_kwargs:
+        raise TypeError(f"Unexpected arguments for the long layout: {sorted(align_kwargs)}")
+
+    batches = _long_batches(input_data)
+    if batches and all(batch.schema == batches[0].schema for batch in batches[1:]):
+        return pa.Table.from_batches(batches)
+    if batches:
+        return _unify_batches(input_data, batches)
+    return pa.Table.from_pandas(input_data.to_long_format(categorical=True), preserve_index=False)
+
+
+def to_arrow_batches(
+    input_data: InputData,
+    layout: ArrowLayout | str = ArrowLayout.LONG,
+    max_chunksize: int | None = None,
+    **align_kwargs,
+) -> pa.RecordBatchReader:
+    """Stream InputData as Arrow record batches, see `to_arrow`.
+
+    The reader can be passed to Arrow IPC writers and to Arrow-native libraries without
+    materialising a table in between.
+
+    Args:
+        input_data (InputData): the data.
+        layout (ArrowLayout | str, optional): long or wide. Defaults to long.
+        max_chunksize (int | None, optional): maximum number of rows per batch. Defaults to
+            None, one batch per unit tag in the long layout, and a single batch in the wide
+            layout.
+        **align_kwargs: arguments of `InputData.to_wide` for the wide layout.
+
+    Returns:
+        pa.RecordBatchReader: reader of the batches
+    """
+    table = to_arrow(input_data, layout, **align_kwargs)
+    return pa.RecordBatchReader.from_batches(
+        table.schema, table.to_batches(max_chunksize=max_chunksize)
+    )
+
+
+def _to_batches(data: ArrowData) -> Iterator[pa.RecordBatch]:
+    if isinstance(data, pa.Table):
+        return iter(data.to_batches())
+    if isinstance(data, pa.RecordBatch):
+        return iter([data])
+    return iter(data)
+
+
+def _time_index(time: pa.Array | pa.ChunkedArray) -> pd.DatetimeIndex:
+    if isinstance(time, pa.ChunkedArray):
+        time = time.combine_chunks()
+    if not pa.types.is_timestamp(time.type):
+        raise TypeError("Column TIME must be of Arrow timestamp type")
+    tz = time.type.tz
+    if time.type.unit != "ns":
+        time = pc.cast(time, pa.timestamp("ns", tz=tz))
+    return epochs_to_index(time.view(pa.int64()).to_numpy(zero_copy_only=False), tz)
+
+
+def _column_values(
+    column: pa.Array | pa.ChunkedArray, copy: bool = False
+) -> np.ndarray | pd.api.extensions.ExtensionArray:
+    # Numeric columns without nulls become read-only numpy views on the Arrow buffers
+    if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+        values = column.to_numpy(zero_copy_only=False)
+        return values.copy() if copy and not values.flags.writeable else values
+    return column.to_pandas().array
+
+
+def _frame(key: str, index: pd.DatetimeIndex, columns: dict[str, object]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {key if name == "VALUE" else name: values for name, values in columns.items()},
+        index=index,
+        copy=False,
+    )
+
+
+def _single_unit_tag(batch: pa.RecordBatch) -> str | None:
+    if batch.num_rows == 0 or batch.column("TIME").null_count:
+        return None
+    labels = []
+    for name in ("ID", "TYPE"):
+        unique = pc.unique(batch.column(name))
+        if len(unique) != 1 or not unique.is_valid()[0].as_py():
+            return None
+        labels.append(unique[0].as_py())
+    return ":".join(labels)
+
+
+def _from_long(batches: list[pa.RecordBatch], copy: bool) -> InputData:
+    if batches and (missing := REQUIRED_COLUMS_LONG_FORMAT - set(batches[0].schema.names)):
+        raise KeyError(f"Arrow data does not contain required columns {missing}")
+
+    keys = [_single_unit_tag(batch) for batch in batches]
+    if None in keys:
+        # Batches with several unit tags have to be grouped, which pandas does in one pass
+        table = pa.Table.from_batches(batches)
+        return InputData.from_long_df(table.to_pandas())
+
+    # Every batch holds a single unit tag, like the output of `to_arrow`: its buffers are used
+    # as they are
+    pieces: dict[str, list[pd.DataFrame]] = {}
+    for key, batch in zip(keys, batches):
+        columns = {
+            name: _column_values(batch.column(name), copy)
+            for name in batch.schema.names
+            if name not in ("TIME", "ID", "TYPE")
+        }
+        pieces.setdefault(key, []).append(_frame(key, _time_index(batch.column("TIME")), columns))
+    return InputData._from_owned(
+        {
+            key: frames[0] if len(frames) == 1 else pd.concat(frames)
+            for key, frames in pieces.items()
+        }
+    )
+
+
+def _from_wide(batches: list[pa.RecordBatch], schema: pa.Schema | None, copy: bool) -> InputData:
+    if schema is None:
+        return InputData()
+    if "TIME" not in schema.names:
+        raise KeyError("Arrow data does not contain required column TIME")
+    table = pa.Table.from_batches(batches, schema=schema)
+    index = _time_index(table.column("TIME"))
+    return InputData._from_owned(
+        {
+            name: _frame(
+                name, index, {name: _column_values(table.column(name).combine_chunks(), copy)}
+            )
+            for name in table.column_names
+            if name != "TIME"
+        }
+    )
+
+
+def _restore_columns(input_data: InputData, schema: pa.Schema | None) -> InputData:
+    metadata = (schema.metadata or {}) if schema is not None else {}
+    if COLUMNS_METADATA_KEY not in metadata:
+        return input_data
+    for key, columns in json.loads(metadata[COLUMNS_METADATA_KEY]).items():
+        if key in input_data:
+            input_data[key] = input_data[key][[column for column, _ in columns]].astype(
+                dict(columns)
+            )
+    return input_data
+
+
+def from_arrow(
+    data: ArrowData, layout: ArrowLayout | str = ArrowLayout.LONG, copy: bool = False
+) -> InputData:
+    """Build InputData from Arrow data in long or wide layout, see `to_arrow`.
+
+    Numeric columns and timestamps without nulls are not copied when the data is already
+    grouped per unit tag: in the long layout when every record batch holds a single unit tag,
+    and always in the wide layout, where every unit tag gets a column of the table and all
+    unit tags share the same index. Other long format data is grouped through pandas.
+    Timestamps keep the timezone of the Arrow type. Unit tags that `to_arrow` cast to a common
+    schema get their own columns and dtypes back.
+
+    Columns that are not copied are read-only, since Arrow buffers are immutable: assigning
+    values to them raises a ValueError. Use `copy` for DataFrames that will be modified.
+
+    Args:
+        data (ArrowData): a table, a record batch, a record batch reader or an iterable of
+            record batches.
+        layout (ArrowLayout | str, optional): long or wide. Defaults to long.
+        copy (bool, optional): Whether to copy the numeric columns, so that they can be
+            modified. Defaults to False.
+
+    Returns:
+        InputData: One DataFrame per unit tag (ID:TYPE)
+    """
+    layout = ArrowLayout(layout)
+    schema = data.schema if isinstance(data, pa.Table | pa.RecordBatchReader) else None
+    batches = list(_to_batches(data))
+    if schema is None and batches:
+        schema = batches[0].schema
+    if layout is ArrowLayout.WIDE:
+        return _from_wide(batches, schema, copy)
+    return _restore_columns(_from_long(batches, copy), schema)
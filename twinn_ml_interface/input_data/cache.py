@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+from twinn_ml_interface.objectmodels import DataLabelConfigTemplate
+
+from .columnar import ColumnarInputData
+from .input_data import InputData
+
+
+class InputDataCache:
+    """Local disk cache of InputData, stored in a layout that can be memory-mapped.
+
+    Opening a cached entry does not read or parse the data: the arrays are memory-mapped, so
+    repeated runs (hyperparameter sweeps, retries) start in milliseconds, and worker processes
+    that open the same entry share its pages. When the cache grows beyond `max_bytes`, the
+    least recently used entries are removed, and entries that have not been used for
+    `max_age` are removed as well.
+
+    Examples
+    --------
+    >>> cache = InputDataCache("/tmp/input_data_cache", max_bytes=10 * 2**30)
+    >>> key = cache.make_key(model.get_data_config_template(), start, end)
+    >>> if (data := cache.get(key)) is None:
+    ...     data = cache.put(key, fetch_data())
+    >>> model.preprocess(data.to_input_data())
+    """
+
+    def __init__(
+        self,
+        directory: os.PathLike,
+        max_bytes: int | None = None,
+        max_age: timedelta | None = None,
+    ) -> None:
+        """
+        Args:
+            directory (os.PathLike): directory to store the entries in, created if needed.
+            max_bytes (int | None, optional): maximum total size of the entries. Defaults to
+                None, no limit.
+            max_age (timedelta | None, optional): time after its last use after which an entry
+                expires. Defaults to None, entries do not expire.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    @staticmethod
+    def make_key(
+        data_config: list[DataLabelConfigTemplate],
+        start: datetime | None = None,
+        end: datetime | None = None,
+        source: str | None = None,
+    ) -> str:
+        """Create a cache key from the data config of a model and the requested time range.
+
+        Args:
+            data_config (list[DataLabelConfigTemplate]): output of `get_data_config_template()`.
+            start (datetime | None, optional): start of the data. Defaults to None.
+            end (datetime | None, optional): end of the data. Defaults to None.
+            source (str | None, optional): anything else that identifies the data, like a path.
+                Defaults to None.
+
+        Returns:
+            str: the key
+        """
+        start = None if start is None else pd.Timestamp(start).isoformat()
+        end = None if end is None else pd.Timestamp(end).isoformat()
+        description = repr((data_config, start, end, source))
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key
+
+    def __contains__(self, key: str) -> bool:
+        path = self._path(key)
+        return path.is_dir() and not self._expired(path.stat().st_mtime)
+
+    def _expired(self, last_used: float) -> bool:
+        return self.max_age is not None and last_used < time.time() - self.max_age.total_seconds()
+
+    def _save(self, data: Mapping[str, pd.DataFrame], path: Path) -> None:
+        if not isinstance(data, ColumnarInputData):
+            data = ColumnarInputData.from_input_data(data)
+        data.save(path)
+
+    def _load(self, path: Path) -> ColumnarInputData:
+        return ColumnarInputData.load(path)
+
+    def get(self, key: str) -> ColumnarInputData | None:
+        """Open a cached entry.
+
+        Args:
+            key (str): the key of the entry.
+
+        Returns:
+            ColumnarInputData | None: the memory-mapped data, None if the key is not cached
+                or has expired
+        """
+        if key not in self:
+            return None
+        path = self._path(key)
+        try:
+            data = self._load(path)
+        except FileNotFoundError:
+            return None
+        # The modification time of the entry is used as last access time
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: Mapping[str, pd.DataFrame]) -> ColumnarInputData:
+        """Store data in the cache and open it from there.
+
+        Args:
+            key (str): the key of the entry.
+            data (Mapping[str, pd.DataFrame]): the data to store, only the column named after
+                the unit tag is stored for every DataFrame.
+
+        Returns:
+            ColumnarInputData: the memory-mapped data
+
+        Raises:
+            TypeError: if the data cannot be stored without changing it, see
+                `ColumnarInputData`.
+        """
+        self._store(key, data)
+        return self.get(key)
+
+    def _store(self, key: str, data: Mapping[str, pd.DataFrame]) -> None:
+        # Write to a temporary directory first, so that readers never see a partial entry
+        tmp_path = self.directory / f".tmp-{key}-{uuid.uuid4().hex}"
+        try:
+            self._save(data, tmp_path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        path = self._path(key)
+        if path.is_dir() and self._expired(path.stat().st_mtime):
+            shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rename(tmp_path, self._path(key))
+        except OSError:
+            # Another process stored the same entry in the meantime
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.evict(keep=key)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.startswith(".tmp-") or not path.is_dir():
+                continue
+            size = sum(file.stat().st_size for file in path.iterdir())
+            entries.append((path.stat().st_mtime, size, path))
+        return sorted(entries)
+
+    @property
+    def size(self) -> int:
+        """Get the total size of all entries.
+
+        Returns:
+            int: size in bytes
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: str | None = None) -> None:
+        """Remove the expired entries, and the least recently used entries until the cache fits
+        in `max_bytes`.
+
+        Args:
+            keep (str | None, optional): key of an entry that should not be removed.
+                Defaults to None.
+        """
+        if self.max_bytes is None and self.max_age is None:
+            return
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for last_used, size, path in entries:
+            if path.name == keep:
+                continue
+            if not self._expired(last_used) and (
+                self.max_bytes is None or total <= self.max_bytes
+            ):
+                break
+            # Processes that have the entry memory-mapped can keep using it
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+# Names of the time and value columns in the files of a `PreprocessCache`
+_TIME = "__time__"
+_VALUE = "__value__"
+
+
+def _model_version(model_class: type) -> str | None:
+    version = getattr(model_class, "__version__", None)
+    if version is None:
+        package = sys.modules.get(model_class.__module__.partition(".")[0])
+        version = getattr(package, "__version__", None)
+    return None if version is None else str(version)
+
+
+class PreprocessCache(InputDataCache):
+    """Local disk cache of the output of `ModelInterfaceV4.preprocess`.
+
+    Entries are keyed by the model class, its version and the fingerprint of the InputData
+    that was preprocessed, so that retries and hyperparameter sweeps on the same data skip
+    preprocessing. Unlike `InputDataCache`, all columns and dtypes of the DataFrames are kept:
+    unit tags whose DataFrames have the same columns are stored together in an uncompressed
+    Arrow IPC file, which is memory-mapped when the entry is opened.
+
+    Examples
+    --------
+    >>> cache = PreprocessCache("/tmp/preprocess_cache", max_age=timedelta(days=1))
+    >>> key = cache.make_key(model, input_data, context=configuration.modelled_unit_code)
+    >>> if (preprocessed := cache.get(key)) is None:
+    ...     preprocessed = cache.put(key, model.preprocess(input_data))
+    >>> model.train(preprocessed)
+    """
+
+    def __init__(
+        self,
+        directory: os.PathLike,
+        max_bytes: int | None = None,
+        max_age: timedelta | None = None,
+        copy: bool = True,
+    ) -> None:
+        """
+        Args:
+            directory (os.PathLike): directory to store the entries in, created if needed.
+            max_bytes (int | None, optional): maximum total size of the entries. Defaults to
+                None, no limit.
+            max_age (timedelta | None, optional): time after its last use after which an entry
+                expires. Defaults to None, entries do not expire.
+            copy (bool, optional): Whether opened entries are copied into memory, so that
+                models can modify them in place. Without a copy, the DataFrames are read-only
+                views of the memory-mapped files. Defaults to True.
+        """
+        super().__init__(directory, max_bytes, max_age)
+        self.copy = copy
+
+    @staticmethod
+    def make_key(
+        model: type | object,
+        input_data: InputData,
+        version: str | None = None,
+        context: object = None,
+    ) -> str:
+        """Create a cache key for preprocessing data with a model.
+
+        Args:
+            model (type | object): the model, or its class.
+            input_data (InputData): the data to preprocess.
+            version (str | None, optional): version of the model. Defaults to None, using the
+                `__version__` of the model class or of its top level package, if any.
+            context (object, optional): anything else the preprocessing depends on, like the
+                configuration or the stored model state. Its repr is part of the key.
+                Defaults to None.
+
+        Returns:
+            str: the key
+        """
+        model_class = model if isinstance(model, type) else type(model)
+        if version is None:
+            version = _model_version(model_class)
+        name = f"{model_class.__module__}.{model_class.__qualname__}"
+        description = repr((name, version, context, input_data.fingerprint))
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _save(self, data: Mapping[str, pd.DataFrame], path: Path) -> None:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        # Group the unit tags by the layout of their DataFrames, so every group is one table
+        groups: dict[tuple, list[str]] = {}
+        for key, df in data.items():
+            layout = (
+                df.index.name,
+                tuple(None if column == key else column for column in df.columns),
+                tuple(str(dtype) for dtype in df.dtypes),
+            )
+            groups.setdefault(layout, []).append(key)
+
+        path.mkdir(parents=True)
+        metadata = {"unit_tags": list(data), "groups": []}
+        for number, ((index_name, columns, _), keys) in enumerate(groups.items()):
+            renamed = [_VALUE if column is None else column for column in columns]
+            table = pd.concat([data[key].set_axis(renamed, axis=1) for key in keys])
+            table.index.name = _TIME
+            file = f"group-{number}.arrow"
+            feather.write_feather(
+                pa.Table.from_pandas(table), path / file, compression="uncompressed"
+            )
+            metadata["groups"].append(
+                {
+                    "file": file,
+                    "index_name": index_name,
+                    "columns": list(columns),
+                    "unit_tags": keys,
+                    "lengths": [len(data[key]) for key in keys],
+                }
+            )
+        with open(path / "metadata.json", "w") as file:
+            json.dump(metadata, file)
+
+    def _load(self, path: Path) -> InputData:
+        import pyarrow.feather as feather
+
+        with open(path / "metadata.json") as file:
+            metadata = json.load(file)
+        frames = {}
+        for group in metadata["groups"]:
+            table = feather.read_table(path / group["file"], memory_map=True)
+            table = table.to_pandas(split_blocks=True)
+            start = 0
+            for key, length in zip(group["unit_tags"], group["lengths"]):
+                # Slices are views, renaming their axes does not copy the values
+                df = table.iloc[start : start + length]
+                if self.copy:
+                    df = df.copy()
+                df.columns = [key if column is None else column for column in group["columns"]]
+                df.index.name = group["index_name"]
+                frames[key] = df
+                start += length
+        # The DataFrames were valid when they were stored
+        return InputData._from_validated({key: frames[key] for key in metadata["unit_tags"]})
+
+    def get(self, key: str) -> InputData | None:
+        """Open a cached entry.
+
+        Args:
+            key (str): the key of the entry.
+
+        Returns:
+            InputData | None: the preprocessed data, None if the key is not cached or has
+                expired
+        """
+        return super().get(key)
+
+    def put(self, key: str, data: Mapping[str, pd.DataFrame]) -> InputData:
+        """Store preprocessed data in the cache.
+
+        Args:
+            key (str): the key of the entry.
+            data (Mapping[str, pd.DataFrame]): the preprocessed data.
+
+        Returns:
+            InputData: the data itself, not the stored copy, so it stays writable
+        """
+        self._store(key, data)
+        return data if isinstance(data, InputData) else InputData(data)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ._long_format import check_long_df, epochs_to_index, group_long_df
+from .input_data import InputData, _mapping_equals
+
+
+class ColumnarInputData(Mapping[str, pd.DataFrame]):
+    """Read-only alternative to `InputData` that keeps all series in one shared buffer.
+
+    Instead of one DataFrame per `UNIT:TAG`, the timestamps and values of all unit tags are
+    stored in two arrays, ordered by unit tag and time, together with the offsets at which the
+    series of each unit tag starts. DataFrames are only created when a unit tag is accessed,
+    and they are views on the shared buffer.
+
+    Only the value of every series is stored, extra columns of a long format DataFrame are
+    dropped. The values of all series share one numeric dtype, so data with other values, or
+    with series of different dtypes, cannot be stored and raises a TypeError. Use
+    `to_input_data` to get a regular `InputData` to pass to a model.
+
+    Examples
+    --------
+    >>> data = ColumnarInputData.from_long_df(long_df)
+    >>> data["SENSOR1:TAG"]
+    ...
+    >>> model.preprocess(data.to_input_data())
+    """
+
+    def __init__(
+        self,
+        unit_tags: list[str],
+        offsets: np.ndarray,
+        index: pd.DatetimeIndex,
+        values: np.ndarray,
+    ) -> None:
+        """
+        Args:
+            unit_tags (list[str]): the unit tags (unit code:tag), one per series.
+            offsets (np.ndarray): array of length `len(unit_tags) + 1`, the series of
+                `unit_tags[i]` spans the positions `offsets[i]:offsets[i + 1]`.
+            index (pd.DatetimeIndex): timestamps of all series, sorted within every series.
+            values (np.ndarray): values of all series, same length as `index`.
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if len(offsets) != len(unit_tags) + 1:
+            raise ValueError("offsets must contain exactly one element more than unit_tags")
+        if len(index) != len(values) or offsets[-1] != len(values):
+            raise ValueError("index and values must have the length given by the offsets")
+        if not isinstance(index, pd.DatetimeIndex):
+            raise TypeError("index must be of type pandas.DatetimeIndex")
+        if not isinstance(values, np.ndarray) or values.dtype.kind not in "biuf":
+            raise TypeError("values must be a numpy.ndarray with a numeric dtype")
+
+        self._unit_tags = list(unit_tags)
+        self._positions = {key: i for i, key in enumerate(self._unit_tags)}
+        self._offsets = offsets
+        # Timestamps are kept as epochs (ns, UTC), so they can be stored and memory-mapped.
+        # `asi8` is a view, only other units are converted.
+        self._epochs = (index if index.unit == "ns" else index.as_unit("ns")).asi8
+        self._tz = index.tz
+        self._values = values
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        start, stop = self._span(self._positions[key])
+        return pd.DataFrame(
+            {key: self._values[start:stop]},
+            index=epochs_to_index(self._epochs[start:stop], self._tz),
+            copy=False,
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._unit_tags)
+
+    def __len__(self) -> int:
+        return len(self._unit_tags)
+
+    def __bool__(self) -> bool:
+        return len(self._values) > 0
+
+    def __eq__(self, __value: object) -> bool:
+        return _mapping_equals(self, __value)
+
+    def _span(self, position: int) -> tuple[int, int]:
+        return int(self._offsets[position]), int(self._offsets[position + 1])
+
+    @property
+    def nbytes(self) -> int:
+        """Get the number of bytes used by the shared buffer.
+
+        Returns:
+            int: bytes used by the timestamps, values and offsets
+        """
+        return self._epochs.nbytes + self._values.nbytes + self._offsets.nbytes
+
+    @property
+    def unit_codes(self) -> set[str]:
+        """Get a set of all the unit_codes.
+
+        Returns:
+            set[str]: the unit codes
+        """
+        return {key.split(":")[0] for key in self._unit_tags}
+
+    @property
+    def unit_tags(self) -> set[str]:
+        """Get a set of all the unit_tags (unit code:tag).
+
+        Returns:
+            set[str]: the ids
+        """
+        return set(self._unit_tags)
+
+    @property
+    def max_datetime(self) -> pd.Timestamp:
+        """Get the max time of all timestamps.
+
+        Returns:
+            pd.Timestamp: The biggest timestap
+        """
+        starts, stops = self._offsets[:-1], self._offsets[1:]
+        return max(epochs_to_index(self._epochs[stops[stops > starts] - 1], self._tz))
+
+    @property
+    def min_datetime(self) -> pd.Timestamp:
+        """Get the min time of all timestamps.
+
+        Returns:
+            pd.Timestamp: The smallest timestap
+        """
+        starts, stops = self._offsets[:-1], self._offsets[1:]
+        return min(epochs_to_index(self._epochs[starts[stops > starts]], self._tz))
+
+    def to_input_data(self) -> InputData:
+        """Materialise all unit tags as an `InputData`, whose DataFrames are views on the buffer.
+
+        Returns:
+            InputData: the same data, one DataFrame per unit tag
+        """
+        return InputData._from_validated({key: self[key] for key in self._unit_tags})
+
+    @classmethod
+    def from_input_data(cls, data: Mapping[str, pd.DataFrame]) -> ColumnarInputData:
+        """Copy the series of an `InputData` into a single buffer.
+
+        Args:
+            data (Mapping[str, pd.DataFrame]): the data, only the column named after the unit tag
+                is kept for every DataFrame.
+
+        Returns:
+            ColumnarInputData: the same data in a shared buffer
+
+        Raises:
+            TypeError: if the values are not numeric, or do not have the same dtype for every
+                unit tag, since concatenating them would change their dtype.
+        """
+        unit_tags = sorted(data)
+        lengths = [len(data[key]) for key in unit_tags]
+        offsets = np.zeros(len(unit_tags) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        if not unit_tags:
+            return cls([], offsets, pd.DatetimeIndex([], name="TIME"), np.array([]))
+
+        if len({data[key][key].dtype for key in unit_tags}) > 1:
+            raise TypeError("The values of all unit tags must have the same dtype")
+        index = data[unit_tags[0]].index.append([data[key].index for key in unit_tags[1:]])
+        values = np.concatenate([data[key][key].to_numpy() for key in unit_tags])
+        return cls(unit_tags, offsets, index, values)
+
+    @classmethod
+    def from_long_df(cls, df: pd.DataFrame, assume_sorted: bool = False) -> ColumnarInputData:
+        """Build from a long format DataFrame with the columns TIME, ID, TYPE and VALUE.
+
+        Args:
+            df (pd.DataFrame): the long format data.
+            assume_sorted (bool, optional): Whether `df` is already sorted by ID, TYPE and TIME,
+                so that no reordering is needed. Defaults to False.
+
+        Returns:
+            ColumnarInputData: the data of all unit tags in a shared buffer
+        """
+        check_long_df(df)
+        unit_tags, offsets, order = group_long_df(df, assume_sorted=assume_sorted)
+        index = pd.DatetimeIndex(df["TIME"])
+        values = df["VALUE"].to_numpy()
+        if order is not None:
+            index, values = index[order], values[order]
+        return cls(unit_tags, offsets, index, values)
+
+    def save(self, directory: os.PathLike) -> None:
+        """Store the buffer in a directory, in a layout that `load` can memory-map.
+
+        Args:
+            directory (os.PathLike): directory to create, it should not exist yet.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True)
+        np.save(directory / "epochs.npy", self._epochs, allow_pickle=False)
+        np.save(directory / "values.npy", self._values, allow_pickle=False)
+        np.save(directory / "offsets.npy", self._offsets, allow_pickle=False)
+        tz = None if self._tz is None else str(self._tz)
+        with open(directory / "metadata.json", "w") as file:
+            json.dump({"unit_tags": self._unit_tags, "tz": tz}, file)
+
+    @classmethod
+    def load(cls, directory: os.PathLike, mmap_mode: str | None = "c") -> ColumnarInputData:
+        """Open a buffer stored with `save`.
+
+        Args:
+            directory (os.PathLike): the directory passed to `save`.
+            mmap_mode (str | None, optional): how to memory-map the arrays, see `numpy.load`.
+                Defaults to "c", copy-on-write: pages are shared between processes until they
+                are modified, modifications are never written to disk.
+
+        Returns:
+            ColumnarInputData: the stored data, backed by the files
+        """
+        directory = Path(directory)
+        with open(directory / "metadata.json") as file:
+            metadata = json.load(file)
+        epochs = np.load(directory / "epochs.npy", mmap_mode=mmap_mode, allow_pickle=False)
+        # The index is a view on the memory-mapped epochs, which are used as they are
+        index = epochs_to_index(epochs)
+        data = cls(
+            metadata["unit_tags"],
+            np.load(directory / "offsets.npy", allow_pickle=False),
+            index,
+            np.load(directory / "values.npy", mmap_mode=mmap_mode, allow_pickle=False),
+        )
+        # The epochs are in UTC, so only the timezone needs to be restored
+        data._tz = metadata["tz"]
+        return data
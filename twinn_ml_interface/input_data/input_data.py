@@ -1,27 +1,126 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import MutableMapping
+from collections.abc import Mapping
+from enum import Enum, auto
 
+import numpy as np
 import pandas as pd
 
-REQUIRED_COLUMS_LONG_FORMAT = {"TIME", "ID", "TYPE", "VALUE"}
+from ._fingerprint import combine_digests, frame_digest
+from ._long_format import (
+    REQUIRED_COLUMS_LONG_FORMAT,  # noqa: F401
+    check_long_df,
+    concat_arrays,
+    group_long_df,
+    repeat_labels,
+)
+from .align import align
+
+
+def _mapping_equals(left: Mapping[str, pd.DataFrame], right: object) -> bool:
+    if not isinstance(right, Mapping):
+        raise TypeError("A dict-like object is needed to compare")
+    if set(left.keys()) != set(right.keys()):
+        logging.info("Dict keys are different")
+        return False
+    for key, df in left.items():
+        if not df.equals(right[key]):
+            logging.info(f"DataFrame in {key} is different")
+            return False
+    return True
+
+
+def _tag_metadata(
+    key: str, df: pd.DataFrame
+) -> tuple[str, pd.Timestamp | None, pd.Timestamp | None]:
+    # The index is sorted, so the first and last timestamps are the min and max
+    if df.empty:
+        return key.split(":")[0], None, None
+    return key.split(":")[0], df.index[0], df.index[-1]
+
+
+class ValidationMode(Enum):
+    """When the DataFrames that are added to an InputData are validated and sorted.
+
+    EAGER: when they are added
+    LAZY: when they are accessed for the first time, so unused unit tags are never validated
+    TRUSTED: never, for data from a loader that guarantees valid DataFrames with sorted indexes.
+        The DataFrames are not copied, so they should not be modified by the caller afterwards.
+    """
+
+    EAGER = auto()
+    LAZY = auto()
+    TRUSTED = auto()
 
 
 class InputData(dict[str, pd.DataFrame]):
-    def __init__(self, mapping: dict[str, pd.DataFrame] | None = None, **kwargs) -> None:
+    def __init__(
+        self,
+        mapping: dict[str, pd.DataFrame] | None = None,
+        validation: ValidationMode = ValidationMode.EAGER,
+        **kwargs,
+    ) -> None:
+        self.__dict__["_validation"] = validation
         if mapping:
             if not isinstance(mapping, dict):
                 msg = "Input must be a dict"
                 raise TypeError(msg)
-            self._check_valid_mapping(mapping)
-            _mapping = self._format_mapping(mapping)
+            if validation is ValidationMode.EAGER:
+                self._check_valid_mapping(mapping)
+                _mapping = self._format_mapping(mapping)
+            else:
+                _mapping = mapping
         else:
             _mapping = {}
 
-        if kwargs:
+        if kwargs and validation is ValidationMode.EAGER:
             self._check_valid_mapping(kwargs)
         super().__init__(_mapping, **kwargs)
+        if validation is ValidationMode.LAZY:
+            self.__dict__["_unvalidated"] = set(self.keys())
+
+    @property
+    def validation(self) -> ValidationMode:
+        """Get when DataFrames are validated and sorted, see `ValidationMode`.
+
+        Returns:
+            ValidationMode: the validation mode
+        """
+        return self.__dict__.get("_validation", ValidationMode.EAGER)
+
+    def _validate_pending(self, key: str | None = None) -> None:
+        """Validate and sort DataFrames that were added in lazy mode, only `key` if given."""
+        unvalidated = self.__dict__.get("_unvalidated")
+        if not unvalidated:
+            return
+        keys = [key] if key is not None else list(unvalidated)
+        for pending_key in keys:
+            if pending_key not in unvalidated:
+                continue
+            value = dict.__getitem__(self, pending_key)
+            self._validate_element(key=pending_key, value=value)
+            dict.__setitem__(self, pending_key, self._sort_df_by_index(value))
+            unvalidated.discard(pending_key)
+
+    @classmethod
+    def _from_validated(cls, mapping: dict[str, pd.DataFrame]) -> InputData:
+        """Build an InputData from DataFrames that are known to be valid and sorted."""
+        input_data = cls()
+        dict.update(input_data, mapping)
+        return input_data
+
+    @classmethod
+    def _from_owned(cls, mapping: dict[str, pd.DataFrame]) -> InputData:
+        """Build an InputData from new DataFrames that nobody else holds, like the DataFrames of
+        a loader: they are validated and sorted, but not copied when already sorted."""
+        input_data = cls()
+        input_data._check_valid_mapping(mapping)
+        dict.update(
+            input_data,
+            {key: cls._sort_df_by_index(df, copy=False) for key, df in mapping.items()},
+        )
+        return input_data
 
     @staticmethod
     def _validate_element(key: str, value: pd.DataFrame) -> None:
@@ -40,7 +139,12 @@ class InputData(dict[str, pd.DataFrame]):
             raise TypeError(f"The index from {key} dataframe should be named 'TIME'")
 
     @staticmethod
-    def _sort_df_by_index(df: pd.DataFrame) -> pd.DataFrame:
+    def _sort_df_by_index(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        # Checking is O(n), most data is already sorted and only needs a copy instead of a
+        # sort. Like a sort, the copy keeps the cached metadata and fingerprints valid when the
+        # caller modifies its DataFrame later.
+        if df.index.is_monotonic_increasing:
+            return df.copy() if copy else df
         return df.sort_index()
 
     def _format_mapping(self, mapping: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
@@ -50,26 +154,152 @@ class InputData(dict[str, pd.DataFrame]):
         for key, value in mapping.items():
             self._validate_element(key=key, value=value)
 
+    @property
+    def _metadata(self) -> dict[str, tuple[str, pd.Timestamp | None, pd.Timestamp | None]]:
+        # Unit code, first and last timestamp per unit tag, computed once and kept up to date
+        # on __setitem__. Accessed through __dict__, since pickle sets items before the state.
+        metadata = self.__dict__.get("_tag_metadata")
+        if metadata is None:
+            metadata = {key: _tag_metadata(key, df) for key, df in self.items()}
+            self.__dict__["_tag_metadata"] = metadata
+        return metadata
+
+    def _cached(self, name: str, compute):
+        aggregates = self.__dict__.setdefault("_aggregates", {})
+        if name not in aggregates:
+            aggregates[name] = compute()
+        return aggregates[name]
+
+    def _invalidate(self) -> None:
+        self.__dict__.pop("_tag_metadata", None)
+        self.__dict__.pop("_aggregates", None)
+        self.__dict__.pop("_digests", None)
+
+    def __getitem__(self, key: str) -> pd.DataFrame:
+        self._validate_pending(key)
+        return super().__getitem__(key)
+
+    def get(self, key: str, default=None):
+        self._validate_pending(key)
+        return super().get(key, default)
+
+    def items(self):
+        self._validate_pending()
+        return super().items()
+
+    def values(self):
+        self._validate_pending()
+        return super().values()
+
     def __setitem__(self, key: str, value: pd.DataFrame) -> None:
-        self._validate_element(key=key, value=value)
-        super().__setitem__(key, self._sort_df_by_index(df=value))
+        validation = self.validation
+        if validation is ValidationMode.LAZY:
+            super().__setitem__(key, value)
+            self.__dict__.setdefault("_unvalidated", set()).add(key)
+            self._invalidate()
+            return
+        if validation is ValidationMode.EAGER:
+            self._validate_element(key=key, value=value)
+            value = self._sort_df_by_index(df=value)
+        super().__setitem__(key, value)
+        self.__dict__.pop("_aggregates", None)
+        self.__dict__.get("_digests", {}).pop(key, None)
+        if "_tag_metadata" in self.__dict__:
+            self.__dict__["_tag_metadata"][key] = _tag_metadata(key, value)
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.__dict__.get("_unvalidated", set()).discard(key)
+        self._invalidate()
+
+    def _mark_unvalidated(self, keys) -> None:
+        # DataFrames added in lazy mode are validated when they are accessed
+        if self.validation is ValidationMode.LAZY:
+            self.__dict__.setdefault("_unvalidated", set()).update(keys)
+
+    def __ior__(self, other):
+        other = dict(other)
+        result = super().__ior__(other)
+        self._mark_unvalidated(other.keys())
+        self._invalidate()
+        return result
+
+    def clear(self) -> None:
+        super().clear()
+        self.__dict__.pop("_unvalidated", None)
+        self._invalidate()
+
+    def pop(self, key: str, *args):
+        self._validate_pending(key)
+        result = super().pop(key, *args)
+        self._invalidate()
+        return result
+
+    def popitem(self) -> tuple[str, pd.DataFrame]:
+        self._validate_pending()
+        result = super().popitem()
+        self._invalidate()
+        return result
+
+    def setdefault(self, key: str, *args):
+        self._validate_pending(key)
+        if key not in self:
+            self._mark_unvalidated([key])
+        result = super().setdefault(key, *args)
+        self._invalidate()
+        return result
+
+    def update(self, *args, **kwargs) -> None:
+        other = dict(*args, **kwargs)
+        super().update(other)
+        self._mark_unvalidated(other.keys())
+        self._invalidate()
 
     def __bool__(self) -> bool:
-        if not self.keys():
-            return False
-        return not all(df.empty for df in self.values())
+        return self._cached(
+            "bool", lambda: any(first is not None for _, first, _ in self._metadata.values())
+        )
 
     def __eq__(self, __value: object) -> bool:
-        if not isinstance(__value, MutableMapping):
-            raise TypeError("A dict-like object is needed to compare")
-        if set(self.keys()) != set(__value.keys()):
-            logging.info("Dict keys are different")
-            return False
+        # The DataFrames are always compared: the cached fingerprints do not see DataFrames
+        # that are modified in place, and equal data can hash differently (0.0 and -0.0)
+        return _mapping_equals(self, __value)
+
+    def __ne__(self, __value: object) -> bool:
+        return not self == __value
+
+    def _tag_digests(self) -> dict[str, bytes]:
+        # Digest per unit tag, kept until the unit tag is replaced. Like the metadata, stored
+        # in __dict__, since pickle sets items before the state.
+        digests = self.__dict__.setdefault("_digests", {})
         for key, df in self.items():
-            if not df.equals(__value[key]):
-                logging.info(f"DataFrame in {key} is different")
-                return False
-        return True
+            if key not in digests:
+                digests[key] = frame_digest(df)
+        return digests
+
+    @property
+    def tag_fingerprints(self) -> dict[str, str]:
+        """Get a content hash of the DataFrame of every unit tag.
+
+        The hashes are computed from the index, columns and values of the DataFrames and kept
+        until the InputData is modified. Modifying a DataFrame in place is not detected.
+
+        Returns:
+            dict[str, str]: hexadecimal hash per unit tag
+        """
+        return {key: digest.hex() for key, digest in self._tag_digests().items()}
+
+    @property
+    def fingerprint(self) -> str:
+        """Get a content hash of the whole InputData, for instance to use as cache key.
+
+        The hash is kept until the InputData is modified, DataFrames that are modified in place
+        are not detected. Comparing InputData with `==` does not use it. See `tag_fingerprints`.
+
+        Returns:
+            str: hexadecimal hash
+        """
+        return self._cached("fingerprint", lambda: combine_digests(self._tag_digests()))
 
     @property
     def unit_codes(self) -> set[str]:
@@ -78,7 +308,11 @@ class InputData(dict[str, pd.DataFrame]):
         Returns:
             set[str]: the unit codes
         """
-        return {key.split(":")[0] for key in self}
+        return set(
+            self._cached(
+                "unit_codes", lambda: {unit_code for unit_code, _, _ in self._metadata.values()}
+            )
+        )
 
     @property
     def unit_tags(self) -> set[str]:
@@ -93,41 +327,205 @@ class InputData(dict[str, pd.DataFrame]):
     def max_datetime(self) -> pd.Timestamp:
         """Get the max time of all timestamps.
 
+        The result is cached until the InputData is modified. Changes made in place to one of
+        the DataFrames are not detected.
+
         Returns:
             pd.Timestamp: The biggest timestap
         """
-        return max([v.index.max() for _, v in self.items() if not v.empty])
+        return self._cached(
+            "max_datetime",
+            lambda: max([last for _, _, last in self._metadata.values() if last is not None]),
+        )
 
     @property
     def min_datetime(self) -> pd.Timestamp:
         """Get the min time of all timestamps.
 
+        The result is cached until the InputData is modified. Changes made in place to one of
+        the DataFrames are not detected.
+
         Returns:
             pd.Timestamp: The smallest timestap
         """
-        return min([v.index.min() for _, v in self.items() if not v.empty])
+        return self._cached(
+            "min_datetime",
+            lambda: min([first for _, first, _ in self._metadata.values() if first is not None]),
+        )
 
-    def to_long_format(self):
-        data = []
-        for k, v in self.items():
-            id_, type_ = k.split(":")
-            long_format = v.rename(columns={k: "VALUE"})
-            long_format["ID"] = id_
-            long_format["TYPE"] = type_
-            long_format.reset_index(names="TIME", inplace=True)
-            data.append(long_format)
+    def summary(self) -> pd.DataFrame:
+        """Get the number of values, first and last timestamp and number of NaNs per unit tag.
 
-        return pd.concat(data).reset_index(drop=True)
+        Returns:
+            pd.DataFrame: one row per unit tag, with the columns COUNT, FIRST, LAST and NAN_COUNT
+        """
+        metadata = self._metadata
+        return pd.DataFrame(
+            {
+                "COUNT": [len(df) for df in self.values()],
+                "FIRST": [metadata[key][1] for key in self],
+                "LAST": [metadata[key][2] for key in self],
+                "NAN_COUNT": [int(df[key].isna().sum()) for key, df in self.items()],
+            },
+            index=pd.Index(list(self), name="UNIT_TAG", dtype=object),
+        )
+
+    def to_long_format(self, categorical: bool = False) -> pd.DataFrame:
+        """Convert to a DataFrame in long format, with the columns TIME, VALUE, ID and TYPE.
+
+        The timestamps and values of all unit tags are copied once into new arrays, other
+        columns of the DataFrames are kept between VALUE and ID.
+
+        Args:
+            categorical (bool, optional): Whether the ID and TYPE columns are categorical,
+                which uses far less memory than strings. Defaults to False.
+
+        Returns:
+            pd.DataFrame: the data in long format
+        """
+        if not self.keys():
+            return pd.DataFrame(columns=["TIME", "VALUE", "ID", "TYPE"])
+
+        keys, frames = list(self.keys()), list(self.values())
+        ids, types = zip(*(key.split(":") for key in keys))
+        lengths = np.array([len(df) for df in frames], dtype=np.int64)
+
+        long_format = pd.DataFrame(
+            {
+                "TIME": frames[0].index.append([df.index for df in frames[1:]]),
+                "VALUE": concat_arrays([df[key].array for key, df in zip(keys, frames)]),
+            },
+            copy=False,
+        )
+        if any(len(df.columns) > 1 for df in frames):
+            extra_columns = pd.concat(
+                [df.drop(columns=key) for key, df in zip(keys, frames)], ignore_index=True
+            )
+            long_format = pd.concat([long_format, extra_columns], axis=1)
+        long_format["ID"] = repeat_labels(ids, lengths, categorical)
+        long_format["TYPE"] = repeat_labels(types, lengths, categorical)
+        return long_format
+
+    def to_wide(
+        self,
+        freq: str | pd.Timedelta | None = None,
+        agg: str = "mean",
+        ffill_limit: int | None = 0,
+        out: np.ndarray | None = None,
+    ) -> pd.DataFrame:
+        """Align all unit tags on a common time grid, with one column per unit tag.
+
+        Args:
+            freq (str | pd.Timedelta | None, optional): fixed frequency of the grid, like
+                "15min". Defaults to None, using the union of all timestamps.
+            agg (str, optional): aggregation of the values within a bin, one of "mean", "sum",
+                "min", "max", "first", "last" and "count". Defaults to "mean".
+            ffill_limit (int | None, optional): maximum number of consecutive missing values to
+                forward fill, None to fill all. Defaults to 0, no forward filling.
+            out (np.ndarray | None, optional): float64 buffer to write the result into, see
+                `align_to_array`. Defaults to None.
+
+        Returns:
+            pd.DataFrame: the aligned data, indexed by TIME
+        """
+        return align(self, freq=freq, agg=agg, ffill_limit=ffill_limit, out=out)
+
+    def to_arrow(self, layout: str = "long", **align_kwargs):
+        """Convert to a `pyarrow.Table` in long format, with dictionary encoded ID and TYPE, or
+        in wide format, aligned with `to_wide`.
+
+        Numeric values and timestamps are handed over to Arrow without copying them, see
+        `arrow.to_arrow`.
+
+        Args:
+            layout (str, optional): "long" or "wide". Defaults to "long".
+            **align_kwargs: arguments of `to_wide` (freq, agg, ffill_limit) for the wide layout.
+
+        Returns:
+            pyarrow.Table: the data
+        """
+        from .arrow import to_arrow
+
+        return to_arrow(self, layout, **align_kwargs)
+
+    def to_arrow_batches(
+        self, layout: str = "long", max_chunksize: int | None = None, **align_kwargs
+    ):
+        """Stream the data as Arrow record batches, one per unit tag in the long layout.
+
+        Args:
+            layout (str, optional): "long" or "wide". Defaults to "long".
+            max_chunksize (int | None, optional): maximum number of rows per batch. Defaults
+                to None.
+            **align_kwargs: arguments of `to_wide` (freq, agg, ffill_limit) for the wide layout.
+
+        Returns:
+            pyarrow.RecordBatchReader: reader of the batches
+        """
+        from .arrow import to_arrow_batches
+
+        return to_arrow_batches(self, layout, max_chunksize, **align_kwargs)
+
+    @classmethod
+    def from_arrow(cls, data, layout: str = "long", copy: bool = False) -> InputData:
+        """Build an InputData from an Arrow table, record batch(es) or record batch reader.
+
+        Numeric columns and timestamps are used without copying when the data is grouped per
+        unit tag, like the output of `to_arrow`, see `arrow.from_arrow`. Such columns are
+        read-only, unless `copy` is set.
+
+        Args:
+            data: Arrow data with the columns TIME, ID, TYPE and VALUE (long), or with a TIME
+                column and one column per unit tag (wide).
+            layout (str, optional): "long" or "wide". Defaults to "long".
+            copy (bool, optional): Whether to copy the numeric columns, so that they can be
+                modified. Defaults to False.
+
+        Returns:
+            InputData: One DataFrame per unit tag (ID:TYPE)
+        """
+        from .arrow import from_arrow
+
+        return from_arrow(data, layout, copy)
 
     @classmethod
-    def from_long_df(cls, df: pd.DataFrame) -> InputData:
-        if missing_cols := REQUIRED_COLUMS_LONG_FORMAT - set(df.columns):
-            raise KeyError(f"DataFrame does not contain required columns {missing_cols}")
+    def from_long_df(cls, df: pd.DataFrame, assume_sorted: bool = False) -> InputData:
+        """Build an InputData from a DataFrame in long format.
+
+        The rows are ordered once by ID, TYPE and TIME, after which the DataFrame of every unit
+        tag is a slice of the ordered data. Since these DataFrames are valid and sorted by
+        construction, they are not validated and sorted again.
+
+        Args:
+            df (pd.DataFrame): DataFrame with at least the columns TIME, ID, TYPE and VALUE.
+                Other columns are kept next to the value of every unit tag.
+            assume_sorted (bool, optional): Whether `df` is already sorted by ID, TYPE and TIME,
+                in which case the (cheap) order check replaces the sort. Defaults to False.
+
+        Returns:
+            InputData: One DataFrame per unit tag (ID:TYPE), with the VALUE column renamed
+                to the unit tag.
+        """
+        check_long_df(df)
+        unit_tags, offsets, order = group_long_df(df, assume_sorted=assume_sorted)
+
+        columns = [column for column in df.columns if column not in ("TIME", "ID", "TYPE")]
+        index = pd.DatetimeIndex(df["TIME"], name="TIME")
+        if order is None:
+            # Copy once, so the resulting DataFrames do not share memory with `df`
+            arrays = {column: df[column].array.copy() for column in columns}
+        else:
+            index = index[order]
+            arrays = {column: df[column].array.take(order) for column in columns}
 
         data_chunks = {}
-        for name, chunk in df.groupby(["ID", "TYPE"]):
-            new_name = ":".join(name)
-            chunk.set_index("TIME", inplace=True)
-            chunk.drop(columns=["ID", "TYPE"], inplace=True)
-            data_chunks[new_name] = chunk.rename(columns={"VALUE": new_name})
-        return cls(data_chunks)
+        for key, start, stop in zip(unit_tags, offsets[:-1], offsets[1:]):
+            data_chunks[key] = pd.DataFrame(
+                {
+                    key if column == "VALUE" else column: array[start:stop]
+                    for column, array in arrays.items()
+                },
+                index=index[start:stop],
+                copy=False,
+            )
+        return cls._from_validated(data_chunks)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ._long_format import REQUIRED_COLUMS_LONG_FORMAT
+from .input_data import InputData
+from .utils import concat
+
+DEFAULT_BATCH_SIZE = 2**20
+
+
+def _time_scalar(timestamp: datetime, time_type: pa.DataType) -> pa.Scalar:
+    # Naive timestamps are interpreted as UTC, like in `take_slice`
+    timestamp = pd.to_datetime(timestamp, utc=True)
+    if getattr(time_type, "tz", None) is None:
+        timestamp = timestamp.tz_localize(None)
+    return pa.scalar(timestamp, type=time_type)
+
+
+def _build_filter(
+    dataset: ds.Dataset,
+    start: datetime | None,
+    end: datetime | None,
+    unit_tags: set[str] | None,
+    end_inclusive: bool,
+) -> ds.Expression | None:
+    time_type = dataset.schema.field("TIME").type
+    conditions = []
+    if start is not None:
+        conditions.append(ds.field("TIME") >= _time_scalar(start, time_type))
+    if end is not None:
+        end_scalar = _time_scalar(end, time_type)
+        conditions.append(
+            ds.field("TIME") <= end_scalar if end_inclusive else ds.field("TIME") < end_scalar
+        )
+    if unit_tags is not None:
+        conditions.append(ds.field("ID").isin(sorted({key.split(":")[0] for key in unit_tags})))
+        conditions.append(ds.field("TYPE").isin(sorted({key.split(":")[1] for key in unit_tags})))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _projection(schema: pa.Schema, columns: list[str] | None) -> list[str]:
+    # Columns are read in the order of the file, like `pd.read_parquet`
+    if columns is None:
+        # All columns, except the index that pandas stored next to the data
+        metadata = schema.pandas_metadata or {}
+        skipped = {
+            column for column in metadata.get("index_columns", []) if isinstance(column, str)
+        }
+        return [name for name in schema.names if name not in skipped]
+    requested = REQUIRED_COLUMS_LONG_FORMAT | set(columns)
+    # Missing columns are kept, so the scanner reports them
+    missing = sorted(requested - set(schema.names))
+    return [name for name in schema.names if name in requested] + missing
+
+
+def _scan(
+    path: os.PathLike,
+    start: datetime | None,
+    end: datetime | None,
+    unit_tags: set[str] | None,
+    columns: list[str] | None,
+    batch_size: int,
+    end_inclusive: bool = True,
+) -> Iterator[InputData]:
+    if unit_tags is not None and not unit_tags:
+        return
+    dataset = ds.dataset(path, format="parquet")
+    scanner = dataset.scanner(
+        columns=_projection(dataset.schema, columns),
+        filter=_build_filter(dataset, start, end, unit_tags, end_inclusive),
+        batch_size=batch_size,
+    )
+    for batch in scanner.to_batches():
+        if batch.num_rows == 0:
+            continue
+        chunk = InputData.from_long_df(batch.to_pandas())
+        if unit_tags is not None:
+            # The pushed down filter works per column, so it can still return unrequested pairs
+            for key in chunk.unit_tags - unit_tags:
+                del chunk[key]
+        yield chunk
+
+
+def read_long_parquet(
+    path: os.PathLike,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    unit_tags: Iterable[str] | None = None,
+    columns: list[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> InputData:
+    """Read long format parquet data into an InputData, one record batch at a time.
+
+    Only the requested columns are read, and the filters on TIME, ID and TYPE are pushed down
+    to the parquet reader, so row groups outside of the requested data are skipped. The full
+    long format DataFrame is never materialised.
+
+    Args:
+        path (os.PathLike): parquet file or directory with parquet files.
+        start (datetime | None, optional): first time to read (inclusive), naive datetimes are
+            interpreted as UTC. Defaults to None, reading from the start of the data.
+        end (datetime | None, optional): last time to read (inclusive), naive datetimes are
+            interpreted as UTC. Defaults to None, reading until the end of the data.
+        unit_tags (Iterable[str] | None, optional): the unit tags (ID:TYPE) to read.
+            Defaults to None, reading all unit tags.
+        columns (list[str] | None, optional): columns to read next to TIME, ID, TYPE and VALUE,
+            an empty list to read only those. Defaults to None, reading all columns.
+        batch_size (int, optional): maximum number of rows per record batch.
+            Defaults to DEFAULT_BATCH_SIZE.
+
+    Returns:
+        InputData: the requested data
+    """
+    unit_tags = set(unit_tags) if unit_tags is not None else None
+    return concat(*_scan(path, start, end, unit_tags, columns, batch_size))
+
+
+def iter_long_parquet(
+    path: os.PathLike,
+    start: datetime,
+    end: datetime,
+    window: timedelta,
+    unit_tags: Iterable[str] | None = None,
+    columns: list[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[InputData]:
+    """Read long format parquet data as consecutive time windows.
+
+    Every window is a separate filtered scan, so only the data of one window is in memory at
+    the same time, regardless of how the parquet data is ordered.
+
+    Args:
+        path (os.PathLike): parquet file or directory with parquet files.
+        start (datetime): start of the first window (inclusive).
+        end (datetime): end of the last window (exclusive).
+        window (timedelta): length of every window. The windows are half open, so that every
+            row is returned exactly once.
+        unit_tags (Iterable[str] | None, optional): the unit tags (ID:TYPE) to read.
+            Defaults to None, reading all unit tags.
+        columns (list[str] | None, optional): columns to read next to TIME, ID, TYPE and VALUE,
+            an empty list to read only those. Defaults to None, reading all columns.
+        batch_size (int, optional): maximum number of rows per record batch.
+            Defaults to DEFAULT_BATCH_SIZE.
+
+    Yields:
+        InputData: the data of each window
+    """
+    if window <= timedelta(0):
+        raise ValueError("window must be a positive timedelta")
+    unit_tags = set(unit_tags) if unit_tags is not None else None
+    window_start, end = pd.to_datetime(start, utc=True), pd.to_datetime(end, utc=True)
+    while window_start < end:
+        window_end = min(window_start + window, end)
+        yield concat(
+            *_scan(
+                path, window_start, window_end, unit_tags, columns, batch_size, end_inclusive=False
+            )
+        )
+        window_start = window_end
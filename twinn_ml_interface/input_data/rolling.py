@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from twinn_ml_interface.objectmodels import DataLabelConfigTemplate
+
+from ._long_format import check_long_df, epochs_to_index, group_long_df
+from .input_data import InputData
+
+MIN_CAPACITY = 16
+
+
+class _GrowableSeries:
+    """Timestamps (epochs in ns) and values of one unit tag, stored in arrays with spare room.
+
+    The live data is `times[start:stop]` and `values[start:stop]`. Arrays are never modified
+    in place inside the live range, so views that were handed out remain valid.
+    """
+
+    def __init__(self, dtype: np.dtype) -> None:
+        self.times = np.empty(MIN_CAPACITY, dtype=np.int64)
+        self.values = np.empty(MIN_CAPACITY, dtype=dtype)
+        self.start = 0
+        self.stop = 0
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def _reallocate(self, times: np.ndarray, values: np.ndarray) -> None:
+        capacity = max(MIN_CAPACITY, 2 * len(times))
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty(capacity, dtype=self.values.dtype)
+        self.times[: len(times)] = times
+        self.values[: len(values)] = values
+        self.start, self.stop = 0, len(times)
+
+    def extend(self, times: np.ndarray, values: np.ndarray) -> None:
+        """Add sorted timestamps and their values, in amortised O(len(times))."""
+        if len(self) and times[0] < self.times[self.stop - 1]:
+            # Late data: merge it with the live data. This is O(len(self)), but rare.
+            all_times = np.concatenate([self.times[self.start : self.stop], times])
+            all_values = np.concatenate([self.values[self.start : self.stop], values])
+            order = np.argsort(all_times, kind="stable")
+            self._reallocate(all_times[order], all_values[order])
+        elif self.stop + len(times) > len(self.times):
+            self._reallocate(
+                np.concatenate([self.times[self.start : self.stop], times]),
+                np.concatenate([self.values[self.start : self.stop], values]),
+            )
+        else:
+            self.times[self.stop : self.stop + len(times)] = times
+            self.values[self.stop : self.stop + len(values)] = values
+            self.stop += len(times)
+
+    def evict_before(self, epoch: int) -> None:
+        """Drop all timestamps before `epoch`."""
+        live = self.times[self.start : self.stop]
+        self.start += int(np.searchsorted(live, epoch, side="left"))
+
+
+class RollingInputData:
+    """Window of recent data that is updated with new rows instead of being rebuilt.
+
+    Meant for near-real-time predictions: every tick, only the new rows are added in
+    amortised O(new rows), and rows older than `max_lookback` before the latest timestamp are
+    evicted. The series stay sorted without sorting them again.
+
+    Examples
+    --------
+    >>> window = RollingInputData.from_data_config(model.get_data_config_template())
+    >>> window.append_long_df(initial_long_df)
+    >>> while True:
+    ...     window.append_long_df(fetch_last_minutes())
+    ...     predictions, _ = model.predict(model.preprocess(window.to_input_data()))
+    """
+
+    def __init__(self, max_lookback: timedelta | None = None, dtype: np.dtype = np.float64):
+        """
+        Args:
+            max_lookback (timedelta | None, optional): how far back data is kept, relative to
+                the latest timestamp. Defaults to None, keeping all data.
+            dtype (np.dtype, optional): dtype of the values. Defaults to np.float64.
+        """
+        self.max_lookback = max_lookback
+        self.dtype = np.dtype(dtype)
+        self._series: dict[str, _GrowableSeries] = {}
+        self._tz = None
+        self._has_tz: bool | None = None
+
+    @classmethod
+    def from_data_config(
+        cls, data_config: list[DataLabelConfigTemplate], dtype: np.dtype = np.float64
+    ) -> RollingInputData:
+        """Create a window that keeps the largest `max_lookback` of a model's data config.
+
+        Args:
+            data_config (list[DataLabelConfigTemplate]): output of `get_data_config_template()`.
+            dtype (np.dtype, optional): dtype of the values. Defaults to np.float64.
+
+        Returns:
+            RollingInputData: an empty window
+        """
+        lookbacks = [config.max_lookback for config in data_config]
+        if not lookbacks or any(lookback is None for lookback in lookbacks):
+            return cls(max_lookback=None, dtype=dtype)
+        return cls(max_lookback=max(lookbacks), dtype=dtype)
+
+    def __len__(self) -> int:
+        return sum(len(series) for series in self._series.values())
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    @property
+    def unit_tags(self) -> set[str]:
+        """Get a set of all the unit_tags (unit code:tag) in the window.
+
+        Returns:
+            set[str]: the ids
+        """
+        return set(self._series)
+
+    @property
+    def max_datetime(self) -> pd.Timestamp:
+        """Get the max time of all timestamps.
+
+        Returns:
+            pd.Timestamp: The biggest timestap
+        """
+        return epochs_to_index(self._max_epoch(), self._tz)[0]
+
+    def _max_epoch(self) -> np.ndarray:
+        return np.array(
+            [series.times[series.stop - 1] for series in self._series.values() if len(series)]
+        ).max(keepdims=True)
+
+    def append_long_df(self, df: pd.DataFrame) -> None:
+        """Add new rows in long format and evict the rows that fall outside of the window.
+
+        Args:
+            df (pd.DataFrame): DataFrame with the columns TIME, ID, TYPE and VALUE. Other
+                columns are ignored.
+        """
+        check_long_df(df)
+        index = pd.DatetimeIndex(df["TIME"])
+        if self._has_tz is None:
+            self._has_tz, self._tz = index.tz is not None, index.tz
+        elif self._has_tz != (index.tz is not None):
+            raise TypeError("Cannot mix timezone aware and naive timestamps")
+
+        unit_tags, offsets, order = group_long_df(df)
+        times = index.as_unit("ns").asi8
+        values = df["VALUE"].to_numpy(dtype=self.dtype)
+        if order is not None:
+            times, values = times[order], values[order]
+        for key, start, stop in zip(unit_tags, offsets[:-1], offsets[1:]):
+            if key not in self._series:
+                self._series[key] = _GrowableSeries(self.dtype)
+            self._series[key].extend(times[start:stop], values[start:stop])
+
+        if self.max_lookback is not None and self:
+            self.evict_before(self.max_datetime - self.max_lookback)
+
+    def evict_before(self, timestamp: pd.Timestamp) -> None:
+        """Drop all rows before a timestamp.
+
+        Args:
+            timestamp (pd.Timestamp): the first timestamp to keep. Naive timestamps are
+                interpreted as UTC.
+        """
+        epoch = pd.to_datetime(timestamp, utc=True).as_unit("ns").value
+        for series in self._series.values():
+            series.evict_before(epoch)
+
+    def to_input_data(self) -> InputData:
+        """Get the current window as InputData.
+
+        The values are views on the internal buffers and remain valid after later updates.
+
+        Returns:
+            InputData: one DataFrame per unit tag
+        """
+        return InputData._from_validated(
+            {
+                key: pd.DataFrame(
+                    {key: series.values[series.start : series.stop]},
+                    index=epochs_to_index(series.times[series.start : series.stop], self._tz),
+                    copy=False,
+                )
+                for key, series in self._series.items()
+            }
+        )
@@ -1,28 +1,139 @@
+from collections.abc import Iterable
 from datetime import datetime
+from enum import Enum, auto
 
+import numpy as np
 import pandas as pd
 
 from .input_data import InputData
 
 
-def concat(*data_objects: InputData) -> InputData:
-    result = InputData()
+class DuplicatePolicy(Enum):
+    """What to do with timestamps that occur more than once for a unit tag.
+
+    KEEP_ALL: keep all rows
+    KEEP_FIRST: keep the row of the first InputData that contains the timestamp
+    KEEP_LAST: keep the row of the last InputData that contains the timestamp
+    ERROR: raise a ValueError
+    """
+
+    KEEP_ALL = auto()
+    KEEP_FIRST = auto()
+    KEEP_LAST = auto()
+    ERROR = auto()
+
+
+def _merge_frames(feature: str, frames: list[pd.DataFrame], duplicates: DuplicatePolicy):
+    non_empty = [df for df in frames if not df.empty]
+    if len(non_empty) <= 1:
+        # A single DataFrame is not concatenated, but can still contain duplicates
+        merged = non_empty[0] if non_empty else frames[0]
+    else:
+        merged = pd.concat(non_empty, sort=True)
+        in_order = all(
+            previous.index[-1] <= current.index[0]
+            for previous, current in zip(non_empty[:-1], non_empty[1:])
+        )
+        if not in_order:
+            # A stable sort keeps duplicate timestamps in the order of the InputData objects
+            merged = merged.sort_index(kind="stable")
+
+    if duplicates is DuplicatePolicy.KEEP_ALL:
+        return merged
+    if duplicates is DuplicatePolicy.ERROR:
+        if merged.index.has_duplicates:
+            raise ValueError(f"The data of {feature} contains duplicate timestamps")
+        return merged
+    if not merged.index.has_duplicates:
+        return merged
+    keep = "first" if duplicates is DuplicatePolicy.KEEP_FIRST else "last"
+    return merged[~merged.index.duplicated(keep=keep)]
+
+
+def concat(
+    *data_objects: InputData, duplicates: DuplicatePolicy = DuplicatePolicy.KEEP_ALL
+) -> InputData:
+    """Concatenate InputData objects, for instance incremental loads of the same unit tags.
+
+    The DataFrames of every unit tag are gathered first and concatenated once. If they are
+    already in chronological order, which is the case for consecutive, non-overlapping chunks,
+    the result is not sorted again.
+
+    Args:
+        *data_objects (InputData): the data to concatenate.
+        duplicates (DuplicatePolicy, optional): what to do with timestamps that occur more than
+            once for a unit tag. Defaults to DuplicatePolicy.KEEP_ALL.
+
+    Returns:
+        InputData: all unit tags of all data objects
+    """
+    pieces: dict[str, list[pd.DataFrame]] = {}
     for data in data_objects:
-        result |= {
-            feature: pd.concat([result[feature], data[feature]], sort=True)
-            for feature in data.unit_tags.intersection(result.unit_tags)
-        }
-        result |= {
-            feature: data[feature] for feature in data.unit_tags.difference(result.unit_tags)
-        }
-    return result
-
-
-def take_slice(data: InputData, start: datetime, end: datetime) -> InputData:
-    result = InputData()
+        for feature, df in data.items():
+            pieces.setdefault(feature, []).append(df)
+
+    return InputData._from_validated(
+        {feature: _merge_frames(feature, frames, duplicates) for feature, frames in pieces.items()}
+    )
+
+
+def take_slices(
+    data: InputData, windows: Iterable[tuple[datetime, datetime]], copy: bool = False
+) -> list[InputData]:
+    """Take many time slices of the data at once, for instance the folds of a backtest.
+
+    Since every DataFrame in InputData is sorted by its index, the bounds of all windows are
+    found with a single binary search per unit tag. The resulting DataFrames are views on the
+    DataFrames of `data`, so nothing is copied or sorted again.
+
+    Because they are views, modifying the values of a slice in place also modifies `data`,
+    and the cached metadata and fingerprint of `data` no longer match its values. Use `copy`
+    for slices that will be modified.
+
+    Args:
+        data (InputData): the data to slice.
+        windows (Iterable[tuple[datetime, datetime]]): (start, end) pairs, both inclusive.
+            Naive datetimes are interpreted as UTC.
+        copy (bool, optional): Whether to copy the slices, so that modifying them does not
+            modify `data`. Defaults to False.
+
+    Returns:
+        list[InputData]: one InputData per window
+    """
+    windows = list(windows)
+    starts = pd.to_datetime([start for start, _ in windows], utc=True)
+    ends = pd.to_datetime([end for _, end in windows], utc=True)
+    # Epochs of the window bounds per time unit of the indexes. Naive indexes are compared
+    # as if they are in UTC.
+    bounds: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+
+    slices = [{} for _ in windows]
     for feature, df in data.items():
-        result[feature] = df.loc[
-            (df.index >= pd.to_datetime(start, utc=True).to_pydatetime())
-            & (df.index <= pd.to_datetime(end, utc=True).to_pydatetime())
-        ]
-    return result
+        unit = df.index.unit
+        if unit not in bounds:
+            bounds[unit] = (starts.as_unit(unit).asi8, ends.as_unit(unit).asi8)
+        lower = np.searchsorted(df.index.asi8, bounds[unit][0], side="left")
+        upper = np.searchsorted(df.index.asi8, bounds[unit][1], side="right")
+        for result, start, stop in zip(slices, lower, upper):
+            result[feature] = pd.DataFrame(df.iloc[start : max(start, stop)], copy=copy)
+    return [InputData._from_validated(result) for result in slices]
+
+
+def take_slice(data: InputData, start: datetime, end: datetime, copy: bool = False) -> InputData:
+    """Take a time slice of the data.
+
+    The DataFrames of the slice are views on the DataFrames of `data`: modifying them in place
+    also modifies `data`, see `take_slices`.
+
+    Args:
+        data (InputData): the data to slice.
+        start (datetime): start of the slice (inclusive), naive datetimes are interpreted as UTC.
+        end (datetime): end of the slice (inclusive), naive datetimes are interpreted as UTC.
+        copy (bool, optional): Whether to copy the slice, so that modifying it does not modify
+            `data`. Defaults to False.
+
+    Returns:
+        InputData: the data between start and end, as views on the DataFrames of `data`
+            unless `copy` is set
+    """
+    return take_slices(data, [(start, end)], copy)[0]
@@ -1,7 +1,43 @@
+from .async_executor import AsyncExecutorMock, LocalDataLake
+from .batch import BatchExecutorMock, PredictResult, TrainResult
+from .hierarchy import HierarchyConfiguration, UnitHierarchy
+from .instrumentation import Instrumentation, StageRecord
+from .log_flusher import (
+    JsonLinesLogSink,
+    LogFlusher,
+    LogSink,
+    MlflowDirectoryLogSink,
+    SQLiteLogSink,
+)
 from .mocks import ConfigurationMock, ExecutorMock, LocalConfig
+from .model_pool import ModelPool, ModelPoolStats, model_files_fingerprint
+from .planner import DataRequest, DataRequestPlanner, required_unit_tags, resolve_unit_tags
+from .sink import PredictionSink
 
 __all__ = [
+    "AsyncExecutorMock",
+    "BatchExecutorMock",
     "ExecutorMock",
+    "HierarchyConfiguration",
+    "Instrumentation",
     "ConfigurationMock",
+    "DataRequest",
+    "DataRequestPlanner",
     "LocalConfig",
+    "LocalDataLake",
+    "JsonLinesLogSink",
+    "LogFlusher",
+    "LogSink",
+    "MlflowDirectoryLogSink",
+    "ModelPool",
+    "ModelPoolStats",
+    "PredictionSink",
+    "PredictResult",
+    "SQLiteLogSink",
+    "StageRecord",
+    "TrainResult",
+    "UnitHierarchy",
+    "model_files_fingerprint",
+    "required_unit_tags",
+    "resolve_unit_tags",
 ]
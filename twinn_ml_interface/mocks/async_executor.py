@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import traceback
+from collections.abc import Iterable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from twinn_ml_interface.input_data import InputData, read_long_parquet
+from twinn_ml_interface.objectmodels import Configuration
+
+from .batch import PredictResult
+from .mocks import ConfigurationMock, ExecutorMock, LocalConfig
+from .model_pool import ModelPool
+from .planner import required_unit_tags
+from .sink import DEFAULT_MAX_ROWS, PredictionSink
+
+DEFAULT_IO_WORKERS = 4
+
+
+class LocalDataLake:
+    """Local stand-in for the data lake: reads long format parquet data and writes predictions.
+
+    A fixed `latency` can be added to every read and write, to mimic the round trip to a
+    remote storage.
+    """
+
+    def __init__(
+        self,
+        data_path: os.PathLike,
+        predictions_directory: os.PathLike,
+        latency: float = 0.0,
+        max_rows: int = DEFAULT_MAX_ROWS,
+    ) -> None:
+        """
+        Args:
+            data_path (os.PathLike): parquet file or directory with the data in long format.
+            predictions_directory (os.PathLike): directory to write the predictions to.
+            latency (float, optional): seconds to wait for every read and write.
+                Defaults to 0.0.
+            max_rows (int, optional): number of predicted rows to buffer before they are
+                written, see `PredictionSink`. Defaults to DEFAULT_MAX_ROWS.
+        """
+        self.data_path = data_path
+        self.latency = latency
+        self.sink = PredictionSink(predictions_directory, max_rows)
+
+    def read(
+        self,
+        unit_tags: Iterable[str],
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> InputData:
+        """Read the data of some unit tags.
+
+        Args:
+            unit_tags (Iterable[str]): the unit tags (unit code:tag) to read.
+            start (datetime | None, optional): first time to read. Defaults to None.
+            end (datetime | None, optional): last time to read. Defaults to None.
+
+        Returns:
+            InputData: the requested data
+        """
+        time.sleep(self.latency)
+        return read_long_parquet(self.data_path, start, end, unit_tags)
+
+    def write(self, model_name: str, predictions: list[pd.DataFrame]) -> None:
+        """Write the predictions of a model.
+
+        Args:
+            model_name (str): name of the model that made the predictions.
+            predictions (list[pd.DataFrame]): the predictions.
+        """
+        time.sleep(self.latency)
+        self.sink.add(model_name, predictions)
+
+    def close(self) -> None:
+        """Write the predictions that are still buffered."""
+        self.sink.close()
+
+
+class AsyncExecutorMock:
+    """A mock executor that predicts with many models in a pipeline built on asyncio.
+
+    Fetching data and writing predictions is I/O, and predicting is compute. Instead of doing
+    them one after the other for every model, three stages run concurrently: the data of the
+    next models is fetched and the predictions of the previous model are written while the
+    current model predicts. The stages are connected by bounded queues, so at most
+    `max_prefetch` inputs and outputs are waiting at any time.
+
+    The blocking work runs in thread pools: reading and writing in an I/O pool, and the models
+    in a single compute thread, or in the `compute_executor` that is passed.
+
+    Examples
+    --------
+    >>> data_lake = LocalDataLake("/my/path/data.parquet", "/my/path/predictions")
+    >>> executor = AsyncExecutorMock(jobs, data_lake, model_pool=ModelPool())
+    >>> results = asyncio.run(executor.run_predict_flow())
+    """
+
+    def __init__(
+        self,
+        jobs: list[tuple[LocalConfig, Configuration | None]],
+        data_lake: LocalDataLake,
+        max_prefetch: int = 2,
+        model_pool: ModelPool | None = None,
+        compute_executor: Executor | None = None,
+    ) -> None:
+        """
+        Args:
+            jobs (list[tuple[LocalConfig, Configuration | None]]): the models to predict with,
+                with the configuration to load them with.
+            data_lake (LocalDataLake): where the data is read from and predictions written to.
+            max_prefetch (int, optional): maximum number of fetched inputs, and of predictions
+                that wait to be written. Defaults to 2.
+            model_pool (ModelPool | None, optional): pool of loaded models, see `ExecutorMock`.
+                Defaults to None.
+            compute_executor (Executor | None, optional): executor to run the models in, for
+                instance a thread pool with more workers. Defaults to None, a single thread.
+        """
+        self.jobs = [
+            (local_config, infra_config or ConfigurationMock("", "", {}, [], []))
+            for local_config, infra_config in jobs
+        ]
+        self.data_lake = data_lake
+        self.max_prefetch = max_prefetch
+        self.model_pool = model_pool
+        self.compute_executor = compute_executor
+
+    def _read(self, local_config: LocalConfig, infra_config: Configuration) -> InputData:
+        # Resolving the unit tags walks the hierarchy, so it runs in the I/O pool with the read
+        # instead of blocking the event loop
+        return self.data_lake.read(required_unit_tags(local_config.model, infra_config))
+
+    async def _fetch(self, outputs: asyncio.Queue, io_pool: Executor) -> None:
+        loop = asyncio.get_running_loop()
+        for i, (local_config, infra_config) in enumerate(self.jobs):
+            try:
+                data = await loop.run_in_executor(io_pool, self._read, local_config, infra_config)
+            except Exception:
+                await outputs.put((i, None, traceback.format_exc()))
+            else:
+                await outputs.put((i, data, None))
+        await outputs.put(None)
+
+    async def _predict(
+        self, inputs: asyncio.Queue, outputs: asyncio.Queue, compute_pool: Executor
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await inputs.get()) is not None:
+            i, data, error = item
+            predictions = None
+            if error is None:
+                local_config, infra_config = self.jobs[i]
+                executor = ExecutorMock(local_config, infra_config, model_pool=self.model_pool)
+                try:
+                    predictions = await loop.run_in_executor(compute_pool, executor.predict, data)
+                except Exception:
+                    error = traceback.format_exc()
+            await outputs.put((i, predictions, error))
+        await outputs.put(None)
+
+    async def _write(
+        self, inputs: asyncio.Queue, io_pool: Executor, results: list[PredictResult]
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await inputs.get()) is not None:
+            i, predictions, error = item
+            model_name = self.jobs[i][0].model_name
+            if error is None:
+                try:
+                    await loop.run_in_executor(
+                        io_pool, self.data_lake.write, model_name, predictions
+                    )
+                except Exception:
+                    error = traceback.format_exc()
+            results[i] = PredictResult(model_name, error=error)
+        await loop.run_in_executor(io_pool, self.data_lake.close)
+
+    async def run_predict_flow(self) -> list[PredictResult]:
+        """Load all models, predict and write the predictions to the data lake.
+
+        A model that fails does not stop the others, its traceback is in the result.
+
+        Returns:
+            list[PredictResult]: one result per job, in the same order as the jobs. The
+                predictions are written to the data lake and not kept in the results.
+        """
+        fetched = asyncio.Queue(maxsize=self.max_prefetch)
+        predicted = asyncio.Queue(maxsize=self.max_prefetch)
+        results = [None] * len(self.jobs)
+
+        with ThreadPoolExecutor(max_workers=DEFAULT_IO_WORKERS) as io_pool:
+            compute_pool = self.compute_executor or ThreadPoolExecutor(max_workers=1)
+            try:
+                await asyncio.gather(
+                    self._fetch(fetched, io_pool),
+                    self._predict(fetched, predicted, compute_pool),
+                    self._write(predicted, io_pool, results),
+                )
+            finally:
+                if compute_pool is not self.compute_executor:
+                    compute_pool.shutdown()
+        return results
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import traceback
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from twinn_ml_interface.input_data import (
+    ColumnarInputData,
+    InputData,
+    concat,
+    read_long_parquet,
+)
+from twinn_ml_interface.objectmodels import Configuration, MetaDataLogger
+
+from .mocks import ConfigurationMock, ExecutorMock, LocalConfig
+from .planner import DataRequestPlanner
+from .sink import PredictionSink
+
+# Seconds between checks whether submitted models have started, when there is a timeout
+START_POLL_INTERVAL = 0.05
+
+
+@dataclass
+class TrainResult:
+    """Outcome of training one model in a batch."""
+
+    model_name: str
+    performance_value: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class PredictResult:
+    """Outcome of predicting with one model in a batch."""
+
+    model_name: str
+    predictions: list[pd.DataFrame] | None = None
+    error: str | None = None
+
+
+def _select(data_directory: Path, unit_tags: set[str]) -> InputData:
+    # Every job maps the shared data copy-on-write, so models cannot modify each others data
+    shared_data = ColumnarInputData.load(data_directory)
+    return InputData._from_validated(
+        {key: shared_data[key] for key in sorted(unit_tags) if key in shared_data}
+    )
+
+
+def _executor(local_config: LocalConfig, infra_config: Configuration) -> ExecutorMock:
+    executor = ExecutorMock(local_config, infra_config)
+    # Every job gets its own logger instead of the one that all ExecutorMocks share, so jobs
+    # in threads do not log to, or reset, each others logger
+    executor.metadata_logger = MetaDataLogger()
+    return executor
+
+
+def _run_started(function: Callable, marker: Path, *arguments) -> TrainResult | PredictResult:
+    # Marks the start of a job, for its timeout, in a way that works across processes
+    marker.touch()
+    return function(*arguments)
+
+
+def _run_train_job(
+    local_config: LocalConfig,
+    infra_config: Configuration,
+    data_directory: Path,
+    unit_tags: set[str],
+) -> TrainResult:
+    try:
+        executor = _executor(local_config, infra_config)
+        performance_value = executor.run_train_flow(_select(data_directory, unit_tags))
+    except Exception:
+        return TrainResult(local_config.model_name, error=traceback.format_exc())
+    return TrainResult(local_config.model_name, performance_value)
+
+
+def _run_predict_job(
+    local_config: LocalConfig,
+    infra_config: Configuration,
+    data_directory: Path,
+    unit_tags: set[str],
+) -> PredictResult:
+    try:
+        executor = _executor(local_config, infra_config)
+        predictions = executor.predict(_select(data_directory, unit_tags))
+    except Exception:
+        return PredictResult(local_config.model_name, error=traceback.format_exc())
+    return PredictResult(local_config.model_name, predictions)
+
+
+class BatchExecutorMock:
+    """A mock executor that trains or predicts with many models, loading shared data once.
+
+    In production many similar models, for instance one per unit, are retrained together and
+    their data configs overlap. This executor resolves the unit tags of all models, reads the
+    union of them once per data path, and stores it in a memory-mappable layout. Every model
+    then gets an `InputData` with only its own unit tags, mapped copy-on-write from that shared
+    data, and the models are trained or run in a process pool.
+
+    At most `max_pending` models are submitted to the pool at a time, so that the inputs and
+    results of the other models are not held in memory. Models that take longer than `timeout`
+    after they started are reported as failed, the time waiting in the pool does not count.
+    Their worker cannot be interrupted and keeps running in the background, but no longer
+    holds up the other models.
+
+    Only the column named after the unit tag is shared, other columns of the long format
+    data are not passed to the models.
+
+    Examples
+    --------
+    >>> jobs = [(LocalConfig(MyModel, path, path, model_dir, unit), config) for ...]
+    >>> results = BatchExecutorMock(jobs, max_workers=8).run_train_flow()
+    >>> failed = [result for result in results if result.error is not None]
+    >>> with PredictionSink("/my/path/predictions") as sink:
+    ...     results = BatchExecutorMock(jobs, max_workers=8, timeout=60).run_predict_flow(sink)
+    """
+
+    def __init__(
+        self,
+        jobs: list[tuple[LocalConfig, Configuration | None]],
+        max_workers: int | None = None,
+        max_pending: int | None = None,
+        timeout: float | None = None,
+        use_threads: bool = False,
+        reference_time: datetime | None = None,
+    ) -> None:
+        """
+        Args:
+            jobs (list[tuple[LocalConfig, Configuration | None]]): the models to train, with
+                the configuration to initialize them with.
+            max_workers (int | None, optional): number of worker processes. Use 1 to train all
+                models in the current process. Defaults to None, the number of processors.
+            max_pending (int | None, optional): maximum number of models submitted to the
+                pool at a time. Defaults to None, twice the number of workers.
+            timeout (float | None, optional): seconds after the start of a model after which
+                it is reported as failed, only used with a pool. Defaults to None, no timeout.
+            use_threads (bool, optional): Whether to use threads instead of processes, for
+                models that release the GIL. Defaults to False.
+            reference_time (datetime | None, optional): time the `max_lookback` and `horizon`
+                of the data configs are relative to. Defaults to None, reading all data.
+        """
+        self.jobs = [
+            (local_config, infra_config or ConfigurationMock("", "", {}, [], []))
+            for local_config, infra_config in jobs
+        ]
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.use_threads = use_threads
+        self.reference_time = reference_time
+
+    def load_shared_data(
+        self, directory: os.PathLike, for_prediction: bool = False
+    ) -> list[tuple[Path, set[str]]]:
+        """Read the data of all jobs once per data path and store it in `directory`.
+
+        The data configs of the jobs that share a path are combined by a `DataRequestPlanner`,
+        so every unit tag is read once over the union of the time ranges the jobs need.
+
+        Args:
+            directory (os.PathLike): an existing directory to store the data in.
+            for_prediction (bool, optional): Whether to read the prediction data instead of the
+                training data. Defaults to False.
+
+        Returns:
+            list[tuple[Path, set[str]]]: per job, the stored data and the unit tags it needs
+        """
+        jobs_per_path = defaultdict(list)
+        for i, (local_config, _) in enumerate(self.jobs):
+            path = (
+                local_config.prediction_data_path
+                if for_prediction
+                else local_config.train_data_path
+            )
+            jobs_per_path[os.fspath(path)].append(i)
+
+        shared = [None] * len(self.jobs)
+        for number, (path, indices) in enumerate(jobs_per_path.items()):
+            planner = DataRequestPlanner()
+            unit_tags = {
+                i: planner.add(self.jobs[i][0].model, self.jobs[i][1], self.reference_time)
+                for i in indices
+            }
+            # The local files hold all data levels together
+            data = concat(
+                *(
+                    read_long_parquet(path, request.start, request.end, request.unit_tags)
+                    for request in planner.plan(merge_levels=True)
+                )
+            )
+            data_directory = Path(directory) / str(number)
+            ColumnarInputData.from_input_data(data).save(data_directory)
+            for i in indices:
+                shared[i] = (data_directory, unit_tags[i])
+        return shared
+
+    def _create_pool(self) -> Executor:
+        if self.use_threads:
+            return ThreadPoolExecutor(max_workers=self.max_workers)
+        return ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _run(
+        self, function: Callable, result_type: type, for_prediction: bool
+    ) -> Iterator[tuple[int, TrainResult | PredictResult]]:
+        """Run `function` for every job and yield the job numbers and results as they complete."""
+        with tempfile.TemporaryDirectory() as directory:
+            shared = self.load_shared_data(directory, for_prediction)
+            arguments = [
+                (local_config, infra_config, data_directory, unit_tags)
+                for (local_config, infra_config), (data_directory, unit_tags) in zip(
+                    self.jobs, shared
+                )
+            ]
+            if self.max_workers == 1:
+                for i, job_arguments in enumerate(arguments):
+                    yield i, function(*job_arguments)
+                return
+            started_directory = Path(directory) / "started"
+            started_directory.mkdir()
+            yield from self._run_in_pool(function, result_type, arguments, started_directory)
+
+    def _wait_timeout(self, pending: dict[Future, tuple[int, Path, float | None]]) -> float | None:
+        """Set the deadlines of the jobs that started, and get how long to wait for results."""
+        if self.timeout is None:
+            return None
+        now = time.monotonic()
+        for future, (i, marker, deadline) in pending.items():
+            if deadline is None and marker.exists():
+                pending[future] = (i, marker, now + self.timeout)
+        deadlines = [deadline for _, _, deadline in pending.values()]
+        waits = [deadline - now for deadline in deadlines if deadline is not None]
+        if None in deadlines:
+            # Jobs that have not started yet are checked again after a while
+            waits.append(START_POLL_INTERVAL)
+        return max(min(waits), 0)
+
+    def _run_in_pool(
+        self,
+        function: Callable,
+        result_type: type,
+        arguments: list[tuple],
+        started_directory: Path,
+    ) -> Iterator[tuple[int, TrainResult | PredictResult]]:
+        pool = self._create_pool()
+        max_pending = self.max_pending or 2 * (self.max_workers or os.cpu_count() or 1)
+        # Per pending job: its number, start marker and deadline, once it has started
+        pending: dict[Future, tuple[int, Path, float | None]] = {}
+        jobs = iter(enumerate(arguments))
+        timed_out = False
+        try:
+            while True:
+                # Only submit new jobs when there is room, to bound memory usage
+                while len(pending) < max_pending and (job := next(jobs, None)) is not None:
+                    i, job_arguments = job
+                    marker = started_directory / str(i)
+                    if self.timeout is None:
+                        future = pool.submit(function, *job_arguments)
+                    else:
+                        future = pool.submit(_run_started, function, marker, *job_arguments)
+                    pending[future] = (i, marker, None)
+                if not pending:
+                    break
+
+                done, _ = wait(
+                    pending, timeout=self._wait_timeout(pending), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    i, _, _ = pending.pop(future)
+                    yield i, future.result()
+
+                now = time.monotonic()
+                for future, (i, _, deadline) in list(pending.items()):
+                    if deadline is not None and deadline <= now and not future.done():
+                        future.cancel()
+                        del pending[future]
+                        timed_out = True
+                        error = f"Timed out after {self.timeout} seconds"
+                        yield i, result_type(self.jobs[i][0].model_name, error=error)
+        finally:
+            # Do not wait for the workers of models that timed out
+            pool.shutdown(wait=not timed_out, cancel_futures=True)
+
+    def run_train_flow(self) -> list[TrainResult]:
+        """Train all models and store them.
+
+        A model that fails does not stop the others, its traceback is in the result.
+
+        Returns:
+            list[TrainResult]: one result per job, in the same order as the jobs
+        """
+        results = [None] * len(self.jobs)
+        for i, result in self._run(_run_train_job, TrainResult, for_prediction=False):
+            results[i] = result
+        return results
+
+    def run_predict_flow(self, sink: PredictionSink) -> list[PredictResult]:
+        """Load all models, predict and pass the predictions to a sink as they come in.
+
+        A model that fails does not stop the others, its traceback is in the result.
+
+        Args:
+            sink (PredictionSink): receives the predictions of every model, to write them in
+                batches.
+
+        Returns:
+            list[PredictResult]: one result per job, in the same order as the jobs. The
+                predictions are passed to the sink and not kept in the results.
+        """
+        results = [None] * len(self.jobs)
+        for i, result in self._run(_run_predict_job, PredictResult, for_prediction=True):
+            if result.predictions is not None:
+                sink.add(result.model_name, result.predictions)
+                result.predictions = None
+            results[i] = result
+        return results
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Mapping
+from functools import cached_property
+from typing import Any
+
+import pandas as pd
+
+from twinn_ml_interface.objectmodels import RelativeType, Unit, UnitTag, UnitTagTemplate
+
+_UNIT_FIELDS = (
+    "unit_type_code",
+    "active",
+    "name",
+    "unit_type_name",
+    "geometry",
+    "properties",
+    "metadata",
+)
+
+
+def _optional(value: Any) -> Any:
+    # Missing values of a parquet export are NaN instead of None
+    return None if value is None or (isinstance(value, float) and pd.isna(value)) else value
+
+
+class UnitHierarchy:
+    """In-memory index of the unit tree of a tenant.
+
+    The parent and children of every unit are indexed once, after which relative paths
+    (`RelativeType` chains like [PARENT, CHILDREN]) are resolved by following the index. The
+    units reached by every (unit code, path prefix) are memoised, so templates that share a
+    path, or a prefix of it, are resolved once for all models of a tenant.
+
+    Examples
+    --------
+    >>> hierarchy = UnitHierarchy.from_json("units.json")
+    >>> hierarchy.resolve("PUMP1", [RelativeType.PARENT, RelativeType.CHILDREN])
+    (Unit(unit_code='PUMP1', ...), Unit(unit_code='PUMP2', ...))
+    """
+
+    def __init__(self, units: Iterable[Unit], parents: Mapping[str, str | None]) -> None:
+        """
+        Args:
+            units (Iterable[Unit]): all units of the tree.
+            parents (Mapping[str, str | None]): unit code of the parent of every unit that
+                has one.
+
+        Raises:
+            ValueError: if a parent is not one of the units.
+        """
+        self._units = {unit.unit_code: unit for unit in units}
+        self._parents: dict[str, str] = {}
+        children: dict[str, list[str]] = {}
+        for unit_code, parent in parents.items():
+            if parent is None:
+                continue
+            if parent not in self._units or unit_code not in self._units:
+                raise ValueError(f"Unit {unit_code} or its parent {parent} is not in the units")
+            self._parents[unit_code] = parent
+            children.setdefault(parent, []).append(unit_code)
+        self._children = {parent: tuple(codes) for parent, codes in children.items()}
+        self._resolved: dict[tuple[str, tuple[RelativeType, ...]], tuple[Unit, ...]] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> UnitHierarchy:
+        """Build from records with the fields of `Unit` and a `parent_unit_code`.
+
+        Args:
+            records (Iterable[Mapping[str, Any]]): one record per unit. Only `unit_code` is
+                required, `unit_type_code` defaults to "UNKNOWN" and `active` to True.
+
+        Returns:
+            UnitHierarchy: the indexed tree
+        """
+        units, parents = [], {}
+        for record in records:
+            fields = {field: _optional(record.get(field)) for field in _UNIT_FIELDS}
+            fields["unit_type_code"] = fields["unit_type_code"] or "UNKNOWN"
+            fields["active"] = True if fields["active"] is None else bool(fields["active"])
+            units.append(Unit(record["unit_code"], **fields))
+            parents[record["unit_code"]] = _optional(record.get("parent_unit_code"))
+        return cls(units, parents)
+
+    @classmethod
+    def from_json(cls, path: os.PathLike) -> UnitHierarchy:
+        """Build from a JSON export, a list of records, see `from_records`.
+
+        Args:
+            path (os.PathLike): path of the JSON file.
+
+        Returns:
+            UnitHierarchy: the indexed tree
+        """
+        with open(path) as file:
+            return cls.from_records(json.load(file))
+
+    @classmethod
+    def from_parquet(cls, path: os.PathLike) -> UnitHierarchy:
+        """Build from a parquet export with one row per unit, see `from_records`.
+
+        Args:
+            path (os.PathLike): path of the parquet file or directory.
+
+        Returns:
+            UnitHierarchy: the indexed tree
+        """
+        return cls.from_records(pd.read_parquet(path).to_dict("records"))
+
+    def __contains__(self, unit_code: str) -> bool:
+        return unit_code in self._units
+
+    def __len__(self) -> int:
+        return len(self._units)
+
+    def get_unit(self, unit_code: str) -> Unit:
+        """Get a unit by its code.
+
+        Args:
+            unit_code (str): the unit code.
+
+        Returns:
+            Unit: the unit
+        """
+        return self._units[unit_code]
+
+    def _step(self, unit_code: str, relative_type: RelativeType) -> Iterable[str]:
+        if relative_type is RelativeType.SELF:
+            return (unit_code,)
+        if relative_type is RelativeType.PARENT:
+            parent = self._parents.get(unit_code)
+            return () if parent is None else (parent,)
+        if relative_type is RelativeType.CHILDREN:
+            return self._children.get(unit_code, ())
+        raise ValueError(f"Unknown relative type {relative_type}")
+
+    def _resolve(self, unit_code: str, path: tuple[RelativeType, ...]) -> tuple[Unit, ...]:
+        key = (unit_code, path)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            if not path:
+                resolved = (self._units[unit_code],)
+            else:
+                # The prefix is memoised as well, so paths that share it only take a step
+                previous = self._resolve(unit_code, path[:-1])
+                codes = dict.fromkeys(
+                    code for unit in previous for code in self._step(unit.unit_code, path[-1])
+                )
+                resolved = tuple(self._units[code] for code in codes)
+            self._resolved[key] = resolved
+        return resolved
+
+    def resolve(self, unit_code: str, relative_path: Iterable[RelativeType]) -> tuple[Unit, ...]:
+        """Get the units reached by following a relative path from a unit.
+
+        Args:
+            unit_code (str): the unit to start from.
+            relative_path (Iterable[RelativeType]): the steps, an empty path is the unit itself.
+
+        Raises:
+            KeyError: if the unit is not in the hierarchy.
+
+        Returns:
+            tuple[Unit, ...]: the units, without duplicates, in the order they were reached
+        """
+        if unit_code not in self._units:
+            raise KeyError(f"Unit {unit_code} is not in the hierarchy")
+        return self._resolve(unit_code, tuple(relative_path))
+
+    def unit_tags(self, unit_code: str, template: UnitTagTemplate) -> list[UnitTag]:
+        """Resolve a unit tag template relative to a unit.
+
+        Units whose type is not in the mapping of a tag do not have that tag.
+
+        Args:
+            unit_code (str): the unit to start from.
+            template (UnitTagTemplate): the relative path and tags.
+
+        Returns:
+            list[UnitTag]: a unit tag for every unit and tag
+        """
+        return [
+            UnitTag(unit, tag)
+            for unit in self.resolve(unit_code, template.relative_path)
+            for tag in template.tags
+            if tag.name is not None or unit.unit_type_code in tag.mapping
+        ]
+
+    def resolve_many(self, requests: Iterable[tuple[str, UnitTagTemplate]]) -> list[list[UnitTag]]:
+        """Resolve many templates, for instance of all models of a tenant, in one call.
+
+        Args:
+            requests (Iterable[tuple[str, UnitTagTemplate]]): pairs of the unit to start from
+                and the template.
+
+        Returns:
+            list[list[UnitTag]]: the unit tags of every request, in the same order
+        """
+        return [self.unit_tags(unit_code, template) for unit_code, template in requests]
+
+    def clear_cache(self) -> None:
+        """Forget the memoised paths, for instance to free memory after job setup."""
+        self._resolved.clear()
+
+
+class HierarchyConfiguration:
+    """Implementation of the `Configuration` protocol on top of a `UnitHierarchy`.
+
+    Unlike `ConfigurationMock`, which returns fixed lists, the units and unit tags are resolved
+    from the hierarchy, like in the platform. Many configurations, one per model, can share a
+    hierarchy and its memoised paths.
+
+    Examples
+    --------
+    >>> hierarchy = UnitHierarchy.from_parquet("units.parquet")
+    >>> config = HierarchyConfiguration(hierarchy, "PUMP1", "PUMP1:FLOW")
+    >>> executor = ExecutorMock(local_config, config)
+    """
+
+    def __init__(
+        self,
+        hierarchy: UnitHierarchy,
+        modelled_unit_code: str,
+        target_name: str,
+        tenant: dict[str, Any] | None = None,
+        tenant_config: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Args:
+            hierarchy (UnitHierarchy): the unit tree of the tenant.
+            modelled_unit_code (str): the unit that is being modelled.
+            target_name (str): the target of the model, UNIT_CODE:TAG_NAME.
+            tenant (dict[str, Any] | None, optional): tenant object. Defaults to None.
+            tenant_config (dict[str, Any] | None, optional): tenant config. Defaults to None.
+        """
+        self.hierarchy = hierarchy
+        self._modelled_unit_code = modelled_unit_code
+        self._target_name = target_name
+        self._tenant = tenant
+        self._tenant_config = tenant_config
+
+    @cached_property
+    def target_name(self) -> str:
+        return self._target_name
+
+    @property
+    def modelled_unit_code(self) -> str:
+        return self._modelled_unit_code
+
+    @property
+    def tenant(self) -> dict[str, Any] | None:
+        return self._tenant
+
+    @cached_property
+    def tenant_config(self) -> dict[str, Any] | None:
+        return self._tenant_config
+
+    def get_unit_properties(self, unit_name: str) -> dict[str, Any] | None:
+        if unit_name not in self.hierarchy:
+            return None
+        return self.hierarchy.get_unit(unit_name).properties
+
+    def get_units(self, unit_name: str, relative_path: list[RelativeType]) -> list[Unit] | None:
+        if unit_name not in self.hierarchy:
+            return None
+        return list(self.hierarchy.resolve(unit_name, relative_path))
+
+    def get_unit_tags(self, unit_name: str, unit_tag_template: UnitTagTemplate) -> list[UnitTag]:
+        if unit_name not in self.hierarchy:
+            return []
+        return self.hierarchy.unit_tags(unit_name, unit_tag_template)
+
+    def get_unit_tags_many(
+        self, unit_name: str, unit_tag_templates: Iterable[UnitTagTemplate]
+    ) -> list[list[UnitTag]]:
+        """Resolve many templates relative to the same unit, see `UnitHierarchy.resolve_many`.
+
+        Args:
+            unit_name (str): name of the unit to search from.
+            unit_tag_templates (Iterable[UnitTagTemplate]): the templates.
+
+        Returns:
+            list[list[UnitTag]]: the unit tags of every template, in the same order
+        """
+        if unit_name not in self.hierarchy:
+            return [[] for _ in unit_tag_templates]
+        return self.hierarchy.resolve_many(
+            (unit_name, template) for template in unit_tag_templates
+        )
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from collections import deque
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from twinn_ml_interface.objectmodels import MetaDataLogger, Metric
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+StageHook = Callable[["StageRecord"], None]
+DEFAULT_MAX_RECORDS = 10_000
+
+
+def _peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@dataclass
+class StageRecord:
+    """Measurements of one stage of an executor flow.
+
+    `peak_rss_bytes` is the peak resident memory of the process up to the end of the stage,
+    `peak_traced_bytes` the peak of the memory allocated by Python during the stage, on top of
+    what was allocated before it. The latter is only measured when memory tracing is enabled.
+    """
+
+    flow: str
+    stage: str
+    started_at: float
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: int | None = None
+    peak_traced_bytes: int | None = None
+    rows: int | None = None
+    unit_tags: int | None = None
+    error: str | None = None
+
+    def count(self, data: Mapping[str, pd.DataFrame] | list[pd.DataFrame]) -> None:
+        """Record the number of rows and unit tags of the data the stage produced.
+
+        Args:
+            data (Mapping[str, pd.DataFrame] | list[pd.DataFrame]): InputData, or a list of
+                DataFrames like predictions.
+        """
+        frames = list(data.values()) if isinstance(data, Mapping) else data
+        self.rows = sum(len(frame) for frame in frames)
+        if isinstance(data, Mapping):
+            self.unit_tags = len(data)
+
+    def to_metrics(self) -> list[Metric]:
+        """Convert the measurements to metrics named like `train/preprocess/wall_seconds`.
+
+        Returns:
+            list[Metric]: one metric per measurement that is available
+        """
+        timestamp = int(self.started_at * 1000)
+        measurements = {
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "peak_traced_bytes": self.peak_traced_bytes,
+            "rows": self.rows,
+            "unit_tags": self.unit_tags,
+        }
+        return [
+            Metric(f"{self.flow}/{self.stage}/{name}", value, timestamp)
+            for name, value in measurements.items()
+            if value is not None
+        ]
+
+
+@dataclass
+class Instrumentation:
+    """Measures wall time, CPU time and memory of the stages of the executor flows.
+
+    The last `max_records` records are kept in `records`, and every record is passed to the
+    hooks when its stage ends, for instance to forward it to a telemetry system. Tracing memory
+    allocations with `tracemalloc` slows down Python code considerably, so it is disabled by
+    default.
+
+    Examples
+    --------
+    >>> instrumentation = Instrumentation(hooks=[lambda record: print(record)])
+    >>> executor = ExecutorMock(local_config, instrumentation=instrumentation)
+    >>> executor.run_train_flow()
+    >>> max(instrumentation.records, key=lambda record: record.wall_seconds)
+    StageRecord(flow='train', stage='train', ...)
+    """
+
+    trace_memory: bool = False
+    hooks: list[StageHook] = field(default_factory=list)
+    max_records: int = DEFAULT_MAX_RECORDS
+    records: deque[StageRecord] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.records = deque(maxlen=self.max_records)
+
+    def add_hook(self, hook: StageHook) -> None:
+        """Call `hook` with the record of every stage that ends from now on.
+
+        Args:
+            hook (StageHook): callable that takes a StageRecord.
+        """
+        self.hooks.append(hook)
+
+    @contextmanager
+    def stage(self, flow: str, stage: str) -> Iterator[StageRecord]:
+        """Measure the code in the with block as a stage.
+
+        Args:
+            flow (str): name of the flow, like "train" or "predict".
+            stage (str): name of the stage.
+
+        Yields:
+            StageRecord: the record of the stage, see `StageRecord.count` to add counts
+        """
+        record = StageRecord(flow, stage, started_at=time.time())
+        start_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        if self.trace_memory:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        except BaseException as error:
+            record.error = type(error).__name__
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.process_time() - cpu_start
+            record.peak_rss_bytes = _peak_rss_bytes()
+            if self.trace_memory:
+                record.peak_traced_bytes = tracemalloc.get_traced_memory()[1] - traced_before
+            if start_tracing:
+                tracemalloc.stop()
+            self.records.append(record)
+            for hook in self.hooks:
+                hook(record)
+
+    @staticmethod
+    def log_training_metrics(records: list[StageRecord], logger: MetaDataLogger) -> None:
+        """Log the records as metrics, which is possible during training.
+
+        Args:
+            records (list[StageRecord]): the records to log.
+            logger (MetaDataLogger): the logger of the training run.
+        """
+        logger.log_metrics([metric for record in records for metric in record.to_metrics()])
+
+    @staticmethod
+    def log_prediction_summary(records: list[StageRecord], logger: MetaDataLogger) -> None:
+        """Log the wall time of the records as prediction log, since metrics cannot be logged
+        during predictions.
+
+        Args:
+            records (list[StageRecord]): the records to log.
+            logger (MetaDataLogger): the logger of the prediction run.
+        """
+        stages = ", ".join(f"{record.stage}={record.wall_seconds:.3f}s" for record in records)
+        logger.log_prediction_string(f"Stage wall times: {stages}")
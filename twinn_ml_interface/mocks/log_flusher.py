@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Protocol, runtime_checkable
+
+from twinn_ml_interface.objectmodels import LogBatch, MetaDataLogger
+
+DEFAULT_MAX_ITEMS = 10_000
+DEFAULT_INTERVAL = 5.0
+
+
+@runtime_checkable
+class LogSink(Protocol):
+    """Destination of the batches of a `LogFlusher`.
+
+    `write` is called from the thread of the flusher, or from the thread that calls
+    `LogFlusher.flush`, but never from two threads at the same time.
+    """
+
+    def write(self, batch: LogBatch) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def _json(value: object) -> str:
+    # Parameters and db logs are not always JSON serialisable, those are stored as strings
+    return json.dumps(value, default=str)
+
+
+class JsonLinesLogSink:
+    """Appends every logged item as a JSON object on its own line.
+
+    Every line has a `type`: "metric" with key, value, timestamp and step, "param" and "db_log"
+    with key and value, or "prediction_log" with message.
+
+    Examples
+    --------
+    >>> with JsonLinesLogSink("/my/path/logs.jsonl") as sink:
+    ...     with LogFlusher(md_logger, sink):
+    ...         model.train(input_data)
+    """
+
+    def __init__(self, path: os.PathLike) -> None:
+        """
+        Args:
+            path (os.PathLike): file to append to, created if needed.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a")
+
+    def write(self, batch: LogBatch) -> None:
+        lines = [
+            {
+                "type": "metric",
+                "key": metric.key,
+                "value": metric.value,
+                "timestamp": metric.timestamp,
+                "step": metric.step,
+            }
+            for metric in batch.metrics
+        ]
+        lines += [
+            {"type": "param", "key": key, "value": value} for key, value in batch.params.items()
+        ]
+        lines += [
+            {"type": "db_log", "key": key, "value": value} for key, value in batch.db_logs.items()
+        ]
+        lines += [
+            {"type": "prediction_log", "message": message} for message in batch.prediction_log
+        ]
+        self._file.writelines(_json(line) + "\n" for line in lines)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> JsonLinesLogSink:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # An error of the sink must not hide the error of the with block
+        try:
+            self.close()
+        except Exception:
+            logging.warning("Could not write the remaining logs", exc_info=True)
+
+
+class SQLiteLogSink:
+    """Inserts the logged items into the tables metrics, params, db_logs and prediction_log of
+    a SQLite database.
+
+    Parameters and db logs are overwritten when they are logged again, like in the logger, and
+    their values are stored as JSON.
+
+    Examples
+    --------
+    >>> with SQLiteLogSink("/my/path/logs.db") as sink:
+    ...     with LogFlusher(md_logger, sink):
+    ...         model.train(input_data)
+    >>> pd.read_sql("SELECT * FROM metrics", sqlite3.connect("/my/path/logs.db"))
+    """
+
+    def __init__(self, path: os.PathLike) -> None:
+        """
+        Args:
+            path (os.PathLike): database file, created if needed.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Writes come from the flusher and from callers of `flush`, but never at the same time
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS metrics (
+                    key TEXT NOT NULL, value REAL, timestamp INTEGER, step INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS params (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS db_logs (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS prediction_log (message TEXT);
+                """)
+
+    def write(self, batch: LogBatch) -> None:
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO metrics VALUES (?, ?, ?, ?)",
+                ((m.key, m.value, m.timestamp, m.step) for m in batch.metrics),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO params VALUES (?, ?)",
+                ((key, _json(value)) for key, value in batch.params.items()),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO db_logs VALUES (?, ?)",
+                ((key, _json(value)) for key, value in batch.db_logs.items()),
+            )
+            self._connection.executemany(
+                "INSERT INTO prediction_log VALUES (?)",
+                ((message,) for message in batch.prediction_log),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> SQLiteLogSink:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # An error of the sink must not hide the error of the with block
+        try:
+            self.close()
+        except Exception:
+            logging.warning("Could not write the remaining logs", exc_info=True)
+
+
+class MlflowDirectoryLogSink:
+    """Writes the logged items in the layout of a local mlflow run directory.
+
+    Every metric key is a file in `metrics/` with a "timestamp value step" line per metric,
+    and every parameter a file in `params/` with its value. Db logs, which mlflow does not
+    have, are JSON files in `db_logs/`, and the prediction log is appended to
+    `prediction_log.txt`.
+
+    Examples
+    --------
+    >>> sink = MlflowDirectoryLogSink("/my/path/mlruns/0/run_id")
+    >>> with LogFlusher(md_logger, sink):
+    ...     model.train(input_data)
+    """
+
+    def __init__(self, directory: os.PathLike) -> None:
+        """
+        Args:
+            directory (os.PathLike): the run directory, created if needed.
+        """
+        self.directory = Path(directory)
+        for name in ("metrics", "params", "db_logs"):
+            (self.directory / name).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, folder: str, key: str) -> Path:
+        # Keys can contain slashes, like in mlflow
+        path = self.directory / folder / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def write(self, batch: LogBatch) -> None:
+        lines: dict[str, list[str]] = {}
+        for metric in batch.metrics:
+            lines.setdefault(metric.key, []).append(
+                f"{metric.timestamp} {metric.value} {metric.step}\n"
+            )
+        for key, key_lines in lines.items():
+            with open(self._path("metrics", key), "a") as file:
+                file.writelines(key_lines)
+        for key, value in batch.params.items():
+            self._path("params", key).write_text(str(value))
+        for key, value in batch.db_logs.items():
+            self._path("db_logs", key).write_text(_json(value))
+        if batch.prediction_log:
+            with open(self.directory / "prediction_log.txt", "a") as file:
+                file.writelines(f"{message}\n" for message in batch.prediction_log)
+
+    def close(self) -> None:
+        pass
+
+
+class LogFlusher:
+    """Writes the items logged to a `MetaDataLogger` to a `LogSink` from a background thread.
+
+    The thread drains the logger into a `LogBatch` every `interval` seconds, or as soon as
+    `max_items` metrics, parameters, db logs and prediction logs are pending, and writes the
+    batch to the sink. Logging only appends to the logger, so a training loop never waits for
+    the sink. Drained items stay in the logger, so a model can still look up its earlier
+    metrics.
+
+    A logger has one `on_log` hook, so it can be flushed by one flusher at a time. Errors of
+    the sink are raised by the next `flush` or `close`, and the batch that failed is drained
+    again with the next batch. The sink is not closed by
+    the flusher, so it can be shared by the flushers of many runs.
+
+    Examples
+    --------
+    >>> with SQLiteLogSink("/my/path/logs.db") as sink:
+    ...     with LogFlusher(md_logger, sink, max_items=1000, interval=1.0):
+    ...         for step in range(100_000):
+    ...             md_logger.log_metric(Metric("loss", loss, step=step))
+    """
+
+    def __init__(
+        self,
+        logger: MetaDataLogger,
+        sink: LogSink,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        """
+        Args:
+            logger (MetaDataLogger): the logger to drain.
+            sink (LogSink): where the batches are written.
+            max_items (int, optional): number of pending items at which a batch is written
+                before the interval has passed. Defaults to DEFAULT_MAX_ITEMS.
+            interval (float, optional): seconds between batches. Defaults to DEFAULT_INTERVAL.
+        """
+        self.logger = logger
+        self.sink = sink
+        self.max_items = max_items
+        self.interval = interval
+        self.batches_written = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        # Batches are drained and written under this lock, so they arrive in order
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._error: Exception | None = None
+
+    def start(self) -> LogFlusher:
+        """Start the background thread.
+
+        Returns:
+            LogFlusher: the flusher itself
+
+        Raises:
+            RuntimeError: if the flusher was already started, or the logger is already flushed
+                by another flusher.
+        """
+        if self._thread is not None:
+            raise RuntimeError("LogFlusher was already started")
+        if self.logger.on_log is not None:
+            raise RuntimeError("The logger already has an on_log hook, of another flusher")
+        self._stop.clear()
+        self.logger.on_log = self._on_log
+        self._thread = threading.Thread(target=self._run, name="LogFlusher", daemon=True)
+        self._thread.start()
+        return self
+
+    def _on_log(self, pending: int) -> None:
+        # Called by the logging thread, so it only signals the background thread. After an
+        # error, the next attempt waits for the interval instead of every log call.
+        if pending >= self.max_items and self._error is None:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self._write()
+
+    def _write(self) -> None:
+        with self._write_lock:
+            batch = self.logger.drain()
+            if not len(batch):
+                return
+            try:
+                self.sink.write(batch)
+                self.batches_written += 1
+            except Exception as error:
+                # Nothing is lost: the batch is drained again, and written with the next batch
+                self.logger.restore(batch)
+                if self._error is None:
+                    self._error = error
+
+    def _raise(self) -> None:
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def flush(self) -> None:
+        """Write everything that was logged so far, and wait until it is written.
+
+        Raises:
+            Exception: the first error of the sink since the previous `flush`.
+        """
+        self._write()
+        self._raise()
+
+    def close(self) -> None:
+        """Stop the background thread and write the remaining items. Items that cannot be
+        written are returned by the next `MetaDataLogger.drain`.
+
+        Raises:
+            Exception: the first error of the sink since the previous `flush`.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        if self.logger.on_log == self._on_log:
+            self.logger.on_log = None
+        self.flush()
+
+    def __enter__(self) -> LogFlusher:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # An error of the sink must not hide the error of the with block
+        try:
+            self.close()
+        except Exception:
+            logging.warning("Could not write the remaining logs", exc_info=True)
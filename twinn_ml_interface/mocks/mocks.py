@@ -1,4 +1,6 @@
 import os
+from collections.abc import Iterator
+from contextlib import contextmanager
 from copy import deepcopy
 from dataclasses import dataclass
 from functools import cached_property
@@ -6,7 +8,12 @@ from typing import Any
 
 import pandas as pd
 
-from twinn_ml_interface.input_data import InputData
+from twinn_ml_interface.input_data import (
+    InputData,
+    InputDataCache,
+    PreprocessCache,
+    read_long_parquet,
+)
 from twinn_ml_interface.interface import ModelInterfaceV4
 from twinn_ml_interface.objectmodels import (
     Configuration,
@@ -17,6 +24,10 @@ from twinn_ml_interface.objectmodels import (
     UnitTagTemplate,
 )
 
+from .instrumentation import Instrumentation, StageRecord
+from .log_flusher import LogFlusher, LogSink
+from .model_pool import ModelPool, model_files_fingerprint
+
 
 @dataclass
 class LocalConfig:
@@ -78,11 +89,54 @@ class ExecutorMock:
 
     metadata_logger = MetaDataLogger()
 
-    def __init__(self, local_config: LocalConfig, infra_config: Configuration = None):
+    def __init__(
+        self,
+        local_config: LocalConfig,
+        infra_config: Configuration = None,
+        data_cache: InputDataCache | None = None,
+        model_pool: ModelPool | None = None,
+        instrumentation: Instrumentation | None = None,
+        preprocess_cache: PreprocessCache | None = None,
+        log_sink: LogSink | None = None,
+    ):
         self.local_config = local_config
         self.original_config = (
             infra_config if infra_config is not None else ConfigurationMock("", "", {}, [], [])
         )
+        # Optional local cache for training data, so that repeated runs skip reading it
+        self.data_cache = data_cache
+        # Optional pool of loaded models, so that repeated predictions skip loading the model
+        self.model_pool = model_pool
+        # Optional local cache for preprocessed data, so that repeated runs skip preprocessing
+        self.preprocess_cache = preprocess_cache
+        # Measures the stages of the flows, see `Instrumentation`
+        self.instrumentation = (
+            instrumentation if instrumentation is not None else Instrumentation()
+        )
+        # Optional sink that the logs of every run are written to by a `LogFlusher`. The
+        # flusher hooks into the logger, so the executor gets its own instead of the shared one
+        self.log_sink = log_sink
+        if log_sink is not None:
+            self.metadata_logger = MetaDataLogger()
+        self._log_flusher: LogFlusher | None = None
+
+    @contextmanager
+    def _flushing(self, metadata_logger: MetaDataLogger) -> Iterator[None]:
+        if self.log_sink is None:
+            yield
+            return
+        self._log_flusher = LogFlusher(metadata_logger, self.log_sink).start()
+        try:
+            yield
+        finally:
+            flusher, self._log_flusher = self._log_flusher, None
+            flusher.close()
+
+    @contextmanager
+    def _stage(self, flow: str, stage: str, records: list[StageRecord]) -> Iterator[StageRecord]:
+        with self.instrumentation.stage(flow, stage) as record:
+            records.append(record)
+            yield record
 
     def _init_train(self) -> tuple[ModelInterfaceV4, Configuration]:
         model_class = self.local_config.model
@@ -103,13 +157,56 @@ class ExecutorMock:
         Returns:
             InputData: Input data for ML model
         """
-        long_data = pd.read_parquet(self.local_config.train_data_path)
-        return InputData.from_long_df(long_data)
+        path = self.local_config.train_data_path
+        if self.data_cache is None:
+            return read_long_parquet(path)
+
+        # The mock has no time range, the path and its modification time identify the data
+        source = f"{os.fspath(path)}@{os.path.getmtime(path)}"
+        key = self.data_cache.make_key(model.get_data_config_template(), source=source)
+        if (cached := self.data_cache.get(key)) is not None:
+            return cached.to_input_data()
+        input_data = read_long_parquet(path)
+        if any(len(df.columns) > 1 for df in input_data.values()):
+            # The cache only stores the values, data with other columns is not cached
+            return input_data
+        try:
+            return self.data_cache.put(key, input_data).to_input_data()
+        except TypeError:
+            # Values that are not numeric or differ in dtype would change in the cache
+            return input_data
+
+    def preprocess(
+        self, model: ModelInterfaceV4, input_data: InputData, context: object = None
+    ) -> InputData:
+        """Preprocess input data, or get the result of an earlier run from `preprocess_cache`.
+
+        Args:
+            model (ModelInterfaceV4): ML model
+            input_data (InputData): Input data for ML model
+            context (object, optional): Anything besides the model and the data that the
+                preprocessing depends on, part of the cache key. Defaults to None.
+
+        Returns:
+            InputData: Preprocessed input data
+        """
+        if self.preprocess_cache is None:
+            return model.preprocess(input_data)
+
+        if not isinstance(input_data, InputData):
+            input_data = InputData(input_data)
+        key = self.preprocess_cache.make_key(model, input_data, context=context)
+        if (cached := self.preprocess_cache.get(key)) is None:
+            cached = self.preprocess_cache.put(key, model.preprocess(input_data))
+        return cached
 
     def _write_model(self, model: ModelInterfaceV4) -> None:
         # When running the model in our infra, we store all the logs and then we reset the
         # cache before dumping the model. This means that MetaDataLogger contents won't be
-        # available when loading the model for predictions
+        # available when loading the model for predictions. With a log sink, the logs are
+        # written to it first.
+        if self._log_flusher is not None:
+            self._log_flusher.flush()
         self.metadata_logger.reset_cache()
         model.dump(self.local_config.model_path, self.local_config.model_name)
 
@@ -127,16 +224,43 @@ class ExecutorMock:
         self._write_model(model=model)
         self._postprocess_model_results(model=model, performance_value=performance_value)
 
-    def run_train_flow(self):
-        """Run training flow and cache trained model"""
-        model_class, infra_config = self._init_train()
-        model = model_class.initialize(infra_config, self.metadata_logger)
+    def run_train_flow(self, input_data: InputData | None = None) -> float:
+        """Run training flow and cache trained model
 
-        input_data = self.get_training_data(model, infra_config)
-        preprocessed_data = model.preprocess(input_data)
-        performance_value, _ = model.train(preprocessed_data)
+        Args:
+            input_data (InputData | None, optional): Training data that was already loaded,
+                for instance shared with other models. Defaults to None, getting it with
+                `get_training_data`.
 
-        self.write_results(model, performance_value)
+        Returns:
+            float: Performance value of the trained model
+        """
+        with self._flushing(self.metadata_logger):
+            return self._train(input_data)
+
+    def _train(self, input_data: InputData | None) -> float:
+        records = []
+        model_class, infra_config = self._init_train()
+        with self._stage("train", "initialize", records):
+            model = model_class.initialize(infra_config, self.metadata_logger)
+
+        if input_data is None:
+            with self._stage("train", "get_training_data", records) as record:
+                input_data = self.get_training_data(model, infra_config)
+                record.count(input_data)
+        with self._stage("train", "preprocess", records) as record:
+            # A freshly initialized model can only depend on its configuration
+            context = ("train", infra_config.modelled_unit_code, infra_config.target_name)
+            preprocessed_data = self.preprocess(model, input_data, context)
+            record.count(preprocessed_data)
+        with self._stage("train", "train", records):
+            performance_value, _ = model.train(preprocessed_data)
+
+        # The logger is reset before the model is written, so the stages up to here are logged
+        self.instrumentation.log_training_metrics(records, self.metadata_logger)
+        with self._stage("train", "write_results", records):
+            self.write_results(model, performance_value)
+        return performance_value
 
     def load_model(
         self,
@@ -167,8 +291,7 @@ class ExecutorMock:
         Returns:
             InputData: Input data for ML model
         """
-        long_data = pd.read_parquet(self.local_config.prediction_data_path)
-        return InputData.from_long_df(long_data)
+        return read_long_parquet(self.local_config.prediction_data_path)
 
     def write_predictions(self, predictions: list[pd.DataFrame]):
         """Write predictions to local path. When running the actual infrastructure,
@@ -181,20 +304,70 @@ class ExecutorMock:
             # Predictions are overwritten in the mock for demonstration purposes
             prediction.to_parquet(self.local_config.predictions_path)
 
-    def run_predict_flow(self):
-        """Run predict flow"""
+    def predict(self, input_data: InputData | None = None) -> list[pd.DataFrame]:
+        """Load the saved model and predict, without writing the predictions
+
+        Args:
+            input_data (InputData | None, optional): Prediction data that was already loaded,
+                for instance shared with other models. Defaults to None, getting it with
+                `get_prediction_data`.
+
+        Returns:
+            list[pd.DataFrame]: Predictions made by ML Model
+        """
+        records = []
         infra_config = deepcopy(self.original_config)
-        metadata_logger = (
-            MetaDataLogger()
-        )  # New instance of the logger, information from training is not available
-        model: ModelInterfaceV4 = self.load_model(
-            self.local_config.model, infra_config, metadata_logger
-        )
+        with self._stage("predict", "load_model", records):
+            if self.model_pool is None:
+                metadata_logger = (
+                    MetaDataLogger()
+                )  # New instance of the logger, information from training is not available
+                model: ModelInterfaceV4 = self.load_model(
+                    self.local_config.model, infra_config, metadata_logger
+                )
+            else:
+                # The pooled model gets its logger reset instead of a new instance
+                model, metadata_logger = self.model_pool.get(
+                    self.local_config.model,
+                    self.local_config.model_path,
+                    self.local_config.model_name,
+                    infra_config,
+                )
+
+        with self._flushing(metadata_logger):
+            return self._predict(model, metadata_logger, input_data, records)
+
+    def _predict(
+        self,
+        model: ModelInterfaceV4,
+        metadata_logger: MetaDataLogger,
+        input_data: InputData | None,
+        records: list[StageRecord],
+    ) -> list[pd.DataFrame]:
+        if input_data is None:
+            with self._stage("predict", "get_prediction_data", records) as record:
+                input_data = self.get_prediction_data()
+                record.count(input_data)
+        with self._stage("predict", "preprocess", records) as record:
+            # A loaded model can depend on anything it stored, so its files are part of the key
+            model_files = model_files_fingerprint(
+                self.local_config.model_path, self.local_config.model_name
+            )
+            preprocessed_data = self.preprocess(model, input_data, ("predict", model_files))
+            record.count(preprocessed_data)
+        with self._stage("predict", "predict", records) as record:
+            predictions, _ = model.predict(preprocessed_data)
+            record.count(predictions)
+
+        self.instrumentation.log_prediction_summary(records, metadata_logger)
+        return predictions
 
-        input_data = self.get_prediction_data()
-        preprocessed_data = model.preprocess(input_data)
-        predictions, _ = model.predict(preprocessed_data)
-        self.write_predictions(predictions)
+    def run_predict_flow(self):
+        """Run predict flow"""
+        predictions = self.predict()
+        with self.instrumentation.stage("predict", "write_predictions") as record:
+            self.write_predictions(predictions)
+            record.count(predictions)
 
     def run_full_flow(self):
         """Run both train and predict flows"""
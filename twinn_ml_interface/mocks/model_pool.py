@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from twinn_ml_interface.interface import ModelInterfaceV4
+from twinn_ml_interface.objectmodels import Configuration, MetaDataLogger
+
+DEFAULT_MAX_MODELS = 32
+
+
+@dataclass
+class ModelPoolStats:
+    """Counters of a `ModelPool`."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    load_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of requests that reused a loaded model.
+
+        Returns:
+            float: hits / (hits + misses), 0 without requests
+        """
+        requests = self.hits + self.misses
+        return self.hits / requests if requests else 0.0
+
+
+@dataclass
+class _PooledModel:
+    fingerprint: tuple
+    model: ModelInterfaceV4
+    metadata_logger: MetaDataLogger
+
+
+def model_files_fingerprint(model_path: os.PathLike, model_name: str) -> tuple:
+    """Identify the stored version of a model by the names, sizes and modification times of
+    its files, without reading them.
+
+    Args:
+        model_path (os.PathLike): the folder the model was dumped to.
+        model_name (str): the name it was dumped with, its files are named like
+            `{model_name}.pkl`.
+
+    Returns:
+        tuple: changes when any of the files of the model is written
+    """
+    files = sorted(
+        file
+        for file in Path(model_path).glob(f"{model_name}*")
+        if file.name == model_name or file.name.startswith(f"{model_name}.")
+    )
+    return tuple((file.name, file.stat().st_size, file.stat().st_mtime_ns) for file in files)
+
+
+class ModelPool:
+    """Keeps loaded models in memory to reuse them for many prediction runs.
+
+    Loading a model usually means unpickling large artifacts. The pool loads every model once
+    and keeps the `max_models` most recently used ones. A model is loaded again when its files
+    have changed since it was loaded, for instance after retraining.
+
+    Every model is loaded with its own `MetaDataLogger`, which is reset at the start of every
+    run, so that nothing is carried over from one prediction run to the next. A pooled model
+    keeps the configuration it was loaded with. The pool is thread safe: a model is loaded once
+    when several threads request it, and loading a model does not block requests for other
+    models. A model should not be used by several threads at the same time.
+
+    Examples
+    --------
+    >>> pool = ModelPool(max_models=100)
+    >>> executor = ExecutorMock(local_config, model_pool=pool)
+    >>> while True:
+    ...     executor.run_predict_flow()
+    >>> pool.stats
+    ModelPoolStats(hits=..., misses=1, evictions=0, load_seconds=...)
+    """
+
+    def __init__(self, max_models: int = DEFAULT_MAX_MODELS) -> None:
+        """
+        Args:
+            max_models (int, optional): maximum number of models to keep loaded.
+                Defaults to DEFAULT_MAX_MODELS.
+        """
+        self.max_models = max_models
+        self.stats = ModelPoolStats()
+        self._models: OrderedDict[tuple, _PooledModel] = OrderedDict()
+        # Guards the models and stats, never held while loading a model
+        self._lock = threading.Lock()
+        # Per model key that is being requested: its lock and the number of requests for it,
+        # so a model is loaded once while other models can be loaded and used meanwhile
+        self._key_locks: dict[tuple, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get(
+        self,
+        model_class: ModelInterfaceV4,
+        model_path: os.PathLike,
+        model_name: str,
+        infra_config: Configuration,
+    ) -> tuple[ModelInterfaceV4, MetaDataLogger]:
+        """Get a loaded model, loading it if it is not in the pool or its files have changed.
+
+        Args:
+            model_class (ModelInterfaceV4): class of the model, used to load it.
+            model_path (os.PathLike): the folder the model was dumped to.
+            model_name (str): the name it was dumped with.
+            infra_config (Configuration): configuration to load the model with.
+
+        Returns:
+            ModelInterfaceV4: the loaded model
+            MetaDataLogger: the logger of the model, reset for a new run
+        """
+        key = (model_class, os.fspath(model_path), model_name)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            key_lock[1] += 1
+        try:
+            with key_lock[0]:
+                return self._get(key, model_path, model_name, infra_config)
+        finally:
+            with self._lock:
+                key_lock[1] -= 1
+                if not key_lock[1]:
+                    del self._key_locks[key]
+
+    def _get(
+        self, key: tuple, model_path: os.PathLike, model_name: str, infra_config: Configuration
+    ) -> tuple[ModelInterfaceV4, MetaDataLogger]:
+        # Called with the lock of the key held
+        fingerprint = model_files_fingerprint(model_path, model_name)
+        with self._lock:
+            pooled = self._models.get(key)
+            if pooled is not None and pooled.fingerprint == fingerprint:
+                self.stats.hits += 1
+                self._models.move_to_end(key)
+                pooled.metadata_logger.reset_cache()
+                return pooled.model, pooled.metadata_logger
+            self.stats.misses += 1
+
+        model_class = key[0]
+        metadata_logger = MetaDataLogger()
+        start = time.perf_counter()
+        model = model_class.load(model_path, model_name, infra_config, metadata_logger)
+        load_seconds = time.perf_counter() - start
+
+        with self._lock:
+            self.stats.load_seconds += load_seconds
+            self._models[key] = _PooledModel(fingerprint, model, metadata_logger)
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+                self.stats.evictions += 1
+        return model, metadata_logger
+
+    def clear(self) -> None:
+        """Remove all models from the pool."""
+        with self._lock:
+            self._models.clear()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from twinn_ml_interface.interface import ModelInterfaceV4
+from twinn_ml_interface.objectmodels import (
+    AvailabilityLevel,
+    Configuration,
+    DataLabelConfigTemplate,
+    DataLevel,
+    UnitTag,
+    UnitTagTemplate,
+)
+
+# A time range, None is unbounded
+Interval = tuple[pd.Timestamp | None, pd.Timestamp | None]
+
+
+def resolve_unit_tags(
+    templates: list[UnitTag | UnitTagTemplate], infra_config: Configuration
+) -> set[str]:
+    """Resolve unit tags and unit tag templates to unit tags (unit code:tag).
+
+    Args:
+        templates (list[UnitTag | UnitTagTemplate]): literal unit tags and templates, which are
+            resolved relative to the modelled unit of `infra_config`.
+        infra_config (Configuration): used to get the unit tags from the hierarchy.
+
+    Returns:
+        set[str]: the unit tags
+    """
+    unit_tags = set()
+    for template in templates:
+        if isinstance(template, UnitTagTemplate):
+            found = infra_config.get_unit_tags(infra_config.modelled_unit_code, template)
+            unit_tags.update(str(unit_tag) for unit_tag in found)
+        else:
+            unit_tags.add(str(template))
+    return unit_tags
+
+
+def required_unit_tags(model: ModelInterfaceV4, infra_config: Configuration) -> set[str]:
+    """Get the unit tags that a model needs for training, including its target.
+
+    Args:
+        model (ModelInterfaceV4): ML model class.
+        infra_config (Configuration): used to resolve the templates of the model.
+
+    Returns:
+        set[str]: the unit tags
+    """
+    data_config: list[DataLabelConfigTemplate] = model.get_data_config_template()
+    templates = [template for config in data_config for template in config.unit_tag_templates]
+    return resolve_unit_tags([*templates, model.get_target_template()], infra_config)
+
+
+@dataclass(frozen=True)
+class DataRequest:
+    """Unit tags of one data level and availability level to fetch over a time range.
+
+    `start` and `end` are inclusive UTC timestamps, None is unbounded. The levels are None in
+    a plan that is merged across levels, see `DataRequestPlanner.plan`.
+    """
+
+    data_level: DataLevel | None
+    availability_level: AvailabilityLevel | None
+    unit_tags: tuple[str, ...]
+    start: pd.Timestamp | None = None
+    end: pd.Timestamp | None = None
+
+
+def _interval(
+    reference_time: datetime | None, max_lookback: timedelta | None, horizon: timedelta | None
+) -> Interval:
+    if reference_time is None:
+        return None, None
+    # Naive datetimes are interpreted as UTC, like in `read_long_parquet`
+    reference_time = pd.to_datetime(reference_time, utc=True)
+    start = None if max_lookback is None else reference_time - max_lookback
+    return start, reference_time + (horizon or timedelta(0))
+
+
+def _hull(intervals: list[Interval]) -> Interval:
+    starts = [start for start, _ in intervals]
+    ends = [end for _, end in intervals]
+    return None if None in starts else min(starts), None if None in ends else max(ends)
+
+
+def merge_intervals(intervals: list[Interval]) -> list[Interval]:
+    """Merge overlapping (or touching) time ranges.
+
+    Args:
+        intervals (list[Interval]): (start, end) pairs, None is unbounded.
+
+    Returns:
+        list[Interval]: disjoint time ranges, in chronological order
+    """
+    # Unbounded starts sort first
+    ordered = sorted(intervals, key=lambda interval: (interval[0] is not None, interval[0]))
+    merged: list[Interval] = []
+    for start, end in ordered:
+        if merged and (start is None or merged[-1][1] is None or start <= merged[-1][1]):
+            last_start, last_end = merged[-1]
+            merged[-1] = (
+                last_start,
+                None if last_end is None or end is None else max(last_end, end),
+            )
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class DataRequestPlanner:
+    """Plans the data to fetch for one or many models.
+
+    The `DataLabelConfigTemplate`s of every added model are expanded to unit tags, and every
+    unit tag gets the time range of its template: `max_lookback` before and `horizon` after
+    the reference time of the model. Overlapping ranges of a unit tag are merged per data level
+    and availability level, and unit tags with the same ranges are fetched together, so every
+    value is requested once, however many templates and models need it.
+
+    Examples
+    --------
+    >>> planner = DataRequestPlanner()
+    >>> for model, config in jobs:
+    ...     planner.add(model, config, reference_time=now)
+    >>> for request in planner.plan():
+    ...     fetch(request.data_level, request.unit_tags, request.start, request.end)
+    """
+
+    def __init__(self) -> None:
+        self._intervals: dict[tuple[DataLevel, AvailabilityLevel, str], list[Interval]] = (
+            defaultdict(list)
+        )
+
+    def add(
+        self,
+        model: ModelInterfaceV4,
+        infra_config: Configuration,
+        reference_time: datetime | None = None,
+    ) -> set[str]:
+        """Add the data a model needs, including its target.
+
+        The target is added as sensor data over the combined time range of the templates.
+
+        Args:
+            model (ModelInterfaceV4): ML model class.
+            infra_config (Configuration): used to resolve the templates of the model.
+            reference_time (datetime | None, optional): time the data is relative to, the end
+                of the training window or the time of the prediction. Defaults to None, all
+                available data.
+
+        Returns:
+            set[str]: the unit tags of the model
+        """
+        data_config: list[DataLabelConfigTemplate] = model.get_data_config_template()
+        unit_tags, intervals = set(), []
+        for config in data_config:
+            interval = _interval(reference_time, config.max_lookback, config.horizon)
+            intervals.append(interval)
+            for unit_tag in resolve_unit_tags(config.unit_tag_templates, infra_config):
+                self._intervals[(config.data_level, config.availability_level, unit_tag)].append(
+                    interval
+                )
+                unit_tags.add(unit_tag)
+
+        hull = _hull(intervals) if intervals else _interval(reference_time, None, None)
+        for unit_tag in resolve_unit_tags([model.get_target_template()], infra_config):
+            self._intervals[(DataLevel.SENSOR, AvailabilityLevel.ALL, unit_tag)].append(hull)
+            unit_tags.add(unit_tag)
+        return unit_tags
+
+    def plan(self, merge_levels: bool = False) -> list[DataRequest]:
+        """Create the requests for all added models.
+
+        Args:
+            merge_levels (bool, optional): Whether to merge the ranges of a unit tag across
+                data levels and availability levels, for sources that store all levels
+                together. Defaults to False.
+
+        Returns:
+            list[DataRequest]: the requests, every unit tag and time is in at most one request
+                per data level and availability level
+        """
+        intervals = self._intervals
+        if merge_levels:
+            intervals = defaultdict(list)
+            for (_, _, unit_tag), ranges in self._intervals.items():
+                intervals[(None, None, unit_tag)].extend(ranges)
+
+        requests: dict[tuple, list[str]] = defaultdict(list)
+        for (data_level, availability_level, unit_tag), ranges in intervals.items():
+            for start, end in merge_intervals(ranges):
+                requests[(data_level, availability_level, start, end)].append(unit_tag)
+
+        def order(key: tuple) -> tuple:
+            data_level, availability_level, start, end = key
+            return (
+                "" if data_level is None else data_level.value,
+                0 if availability_level is None else availability_level.value,
+                (start is not None, start),
+                (end is None, end),
+            )
+
+        return [
+            DataRequest(data_level, availability_level, tuple(sorted(unit_tags)), start, end)
+            for (data_level, availability_level, start, end), unit_tags in sorted(
+                requests.items(), key=lambda item: order(item[0])
+            )
+        ]
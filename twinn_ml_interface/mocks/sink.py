@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_MAX_ROWS = 100_000
+
+
+class PredictionSink:
+    """Collects the predictions of many models and writes them in batches.
+
+    Instead of one parquet file per prediction DataFrame, the buffered predictions are written
+    to a new part file in `directory` whenever `max_rows` rows are buffered, and when the sink
+    is closed. A MODEL column with the name of the model is added to every prediction. Part
+    files can have different columns when the models predict different columns.
+
+    Examples
+    --------
+    >>> with PredictionSink("/my/path/predictions") as sink:
+    ...     sink.add("model_a", predictions_a)
+    ...     sink.add("model_b", predictions_b)
+    >>> pd.concat([pd.read_parquet(path) for path in sink.files])
+    """
+
+    def __init__(self, directory: os.PathLike, max_rows: int = DEFAULT_MAX_ROWS) -> None:
+        """
+        Args:
+            directory (os.PathLike): directory to write the part files to, created if needed.
+            max_rows (int, optional): number of buffered rows at which they are written.
+                Defaults to DEFAULT_MAX_ROWS.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_rows = max_rows
+        self.files: list[Path] = []
+        self._buffer: list[pd.DataFrame] = []
+        self._buffered_rows = 0
+
+    def add(self, model_name: str, predictions: list[pd.DataFrame]) -> None:
+        """Buffer the predictions of a model, and write the buffer if it is full.
+
+        Args:
+            model_name (str): name of the model that made the predictions.
+            predictions (list[pd.DataFrame]): the predictions.
+        """
+        for prediction in predictions:
+            self._buffer.append(prediction.assign(MODEL=model_name))
+            self._buffered_rows += len(prediction)
+        if self._buffered_rows >= self.max_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered predictions to a new part file."""
+        if not self._buffer:
+            return
+        path = self.directory / f"part-{len(self.files):05d}.parquet"
+        pd.concat(self._buffer).to_parquet(path)
+        self.files.append(path)
+        self._buffer = []
+        self._buffered_rows = 0
+
+    def close(self) -> None:
+        """Write the remaining predictions."""
+        self.flush()
+
+    def __enter__(self) -> PredictionSink:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
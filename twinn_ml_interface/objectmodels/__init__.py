@@ -18,7 +18,7 @@ from .hierarchy import (
     UnitTag,
     UnitTagTemplate,
 )
-from .logging import MetaDataLogger, Metric
+from .logging import LogBatch, MetaDataLogger, Metric, MetricStore
 from .model_flags import (
     FeatureQualityOption,
     PredictionType,
@@ -42,8 +42,10 @@ __all__ = [
     "LogLevel",
     "FeatureQualityOption",
     "ModelCategory",
+    "LogBatch",
     "MetaDataLogger",
     "Metric",
+    "MetricStore",
     "PredictionType",
     "PreprocessingMode",
     "RelativeType",
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import Enum, IntEnum, auto
@@ -47,7 +49,7 @@ class RelativeType(Enum):
     SELF = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class Unit:
     unit_code: str
     unit_type_code: str
@@ -67,7 +69,7 @@ class Unit:
         return NotImplemented
 
 
-@dataclass
+@dataclass(slots=True)
 class Tag:
     """The tag denotes a timeseries of the unit.
 
@@ -99,24 +101,77 @@ class Tag:
     def __hash__(self) -> int:
         if self.name is not None:
             return hash(self.name)
+        # The mapping can be modified in place, so its hash is not cached
         return hash(frozenset(self.mapping.items()))
 
 
-@dataclass
-class UnitTag:
+class _UnitTagCache:
+    # Slot for the string form, with the unit code and tag name it was built from, see
+    # `UnitTag.__str__`.
+    # Declared outside of the dataclass, so it is not a field.
+    __slots__ = ("_string",)
+
+
+@dataclass(slots=True)
+class UnitTag(_UnitTagCache):
     unit: Unit
     tag: Tag
 
     @classmethod
     def from_string(cls, unit_tag: str, separator: str = ":") -> UnitTag:
-        unit, tag = unit_tag.split(separator)
-        return cls(Unit(unit, "UNKNOWN", True), Tag(tag))
+        """Parse a unit tag like "UNIT:TAG".
+
+        The unit code and tag name are interned, so unit tags parsed from the same unit code or
+        tag name share the strings, but every unit tag gets its own `Unit` and `Tag`.
+
+        Args:
+            unit_tag (str): the unit code and tag name.
+            separator (str, optional): separator between them. Defaults to ":".
+
+        Returns:
+            UnitTag: the unit tag, with a unit of type "UNKNOWN"
+        """
+        unit_code, tag_name = unit_tag.split(separator)
+        unit = Unit(sys.intern(unit_code), "UNKNOWN", True)
+        tag = Tag(sys.intern(tag_name))
+        result = cls(unit, tag)
+        if separator == ":":
+            result._string = (unit.unit_code, tag.name, unit_tag)
+        return result
+
+    @classmethod
+    def from_strings(cls, unit_tags: Iterable[str], separator: str = ":") -> list[UnitTag]:
+        """Parse many unit tags, see `from_string`.
+
+        Args:
+            unit_tags (Iterable[str]): the unit tags, like "UNIT:TAG".
+            separator (str, optional): separator between unit code and tag name.
+                Defaults to ":".
+
+        Returns:
+            list[UnitTag]: the unit tags, in the same order
+        """
+        from_string = cls.from_string
+        return [from_string(unit_tag, separator) for unit_tag in unit_tags]
+
+    def _cached_string(self) -> str:
+        unit, tag = self.unit, self.tag
+        if not tag.name:
+            # A mapping or the unit type can be modified in place, so the string is built again
+            return f"{unit.unit_code}:{tag.to_string(unit.unit_type_code)}"
+        # Strings are immutable, so the string is kept until the unit code or tag name is
+        # replaced. Identity checks are much cheaper than building the string for every hash.
+        cached = getattr(self, "_string", None)
+        if cached is None or cached[0] is not unit.unit_code or cached[1] is not tag.name:
+            cached = (unit.unit_code, tag.name, f"{unit.unit_code}:{tag.name}")
+            self._string = cached
+        return cached[2]
 
     def __str__(self) -> str:
-        return f"{self.unit.unit_code}:{self.tag.to_string(self.unit.unit_type_code)}"
+        return self._cached_string()
 
     def __hash__(self):
-        return hash(self.__str__())
+        return hash(self._cached_string())
 
 
 @dataclass
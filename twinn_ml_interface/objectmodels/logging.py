@@ -1,8 +1,17 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+import numbers
+import threading
+from array import array
+from collections.abc import Callable, Iterable, MutableSequence, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from os import PathLike, listdir
 from os.path import isdir, isfile
-from typing import Hashable
+from typing import Hashable, overload
+
+import numpy as np
+import pandas as pd
 
 
 @dataclass
@@ -13,6 +22,381 @@ class Metric:
     step: int = 0
 
 
+# Kinds of the values in the columns of a `MetricStore`, restored when a metric is read
+_FLOAT = 0
+_INT = 1
+
+
+def _is_int64(value: object) -> bool:
+    return (
+        isinstance(value, (int, np.integer))
+        and not isinstance(value, bool)
+        and -(2**63) <= value < 2**63
+    )
+
+
+def _column_value(value: object) -> tuple[float, int] | None:
+    # The value and kind to store in the columns, None if the value does not fit exactly
+    if isinstance(value, bool) or not isinstance(value, (numbers.Real, np.integer, np.floating)):
+        return None
+    try:
+        as_float = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if as_float != value and as_float == as_float:
+        return None
+    return as_float, _INT if isinstance(value, (int, np.integer)) else _FLOAT
+
+
+def _as_float(value: object) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError, OverflowError):
+        return float("nan")
+
+
+def _as_int64(value: object) -> int:
+    try:
+        value = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+    return value if -(2**63) <= value < 2**63 else 0
+
+
+class MetricStore(MutableSequence[Metric]):
+    """List of metrics stored in columns, with an index per metric key.
+
+    The key (as id), value, timestamp and step of every metric are appended to compact arrays,
+    so long training loops that log thousands of steps take little memory. The positions of
+    the metrics of every key are indexed, so the first and latest metric of a key are found in
+    O(1), and lookups and range queries by step only visit the metrics of that key.
+
+    Real numbers, including NumPy scalars, are stored in the columns and read back as float or
+    int. Metrics whose value is not a real number that a float holds exactly, or whose
+    timestamp or step is not an int, are kept as they were logged as well, so reading them back
+    returns them unchanged. In the columns and exports, their value is converted to float (NaN
+    when that fails).
+
+    To bound memory, `max_points_per_key` downsamples long series: when a key exceeds it, every
+    second metric of the key is dropped, always keeping its first and latest metric.
+
+    Modifying the store anywhere but at the end (insert, replace or delete) rebuilds it.
+
+    Examples
+    --------
+    >>> store = MetricStore(max_points_per_key=1000)
+    >>> for step in range(10_000):
+    ...     store.append(Metric("loss", loss, step=step))
+    >>> store.latest("loss")
+    Metric(key='loss', value=..., timestamp=0, step=9999)
+    >>> store.query("loss", start_step=100, end_step=200)
+    >>> store.to_frame()
+    """
+
+    def __init__(
+        self, metrics: Iterable[Metric] = (), max_points_per_key: int | None = None
+    ) -> None:
+        """
+        Args:
+            metrics (Iterable[Metric], optional): metrics to start with. Defaults to ().
+            max_points_per_key (int | None, optional): maximum number of metrics per key,
+                at least 2. Defaults to None, keeping all metrics.
+        """
+        if max_points_per_key is not None and max_points_per_key < 2:
+            raise ValueError("max_points_per_key must be at least 2")
+        self.max_points_per_key = max_points_per_key
+        self._clear()
+        self.extend(metrics)
+
+    def _clear(self) -> None:
+        self._key_index: dict[str, int] = {}
+        self._keys: list[str] = []
+        # One element per metric
+        self._key_ids = array("q")
+        self._values = array("d")
+        self._kinds = array("b")
+        self._timestamps = array("q")
+        self._steps = array("q")
+        # One element per key: the positions of its metrics, in the order they were logged
+        self._positions: list[array] = []
+        # Metrics that do not fit the columns exactly, by position
+        self._originals: dict[int, Metric] = {}
+
+    def _metric(self, position: int) -> Metric:
+        original = self._originals.get(position)
+        if original is not None:
+            return original
+        return Metric(
+            self._keys[self._key_ids[position]],
+            self._value(position),
+            self._timestamps[position],
+            self._steps[position],
+        )
+
+    def _value(self, position: int) -> object:
+        original = self._originals.get(position)
+        if original is not None:
+            return original.value
+        value = self._values[position]
+        return int(value) if self._kinds[position] == _INT else value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @overload
+    def __getitem__(self, index: int) -> Metric: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Metric]: ...
+
+    def __getitem__(self, index: int | slice) -> Metric | list[Metric]:
+        if isinstance(index, slice):
+            return [self._metric(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MetricStore index out of range")
+        return self._metric(index)
+
+    def __setitem__(self, index: int | slice, value: Metric | Iterable[Metric]) -> None:
+        metrics = list(self)
+        metrics[index] = value
+        self._rebuild(metrics)
+
+    def __delitem__(self, index: int | slice) -> None:
+        metrics = list(self)
+        del metrics[index]
+        self._rebuild(metrics)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, str):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"MetricStore({list(self)!r})"
+
+    def _rebuild(self, metrics: list[Metric]) -> None:
+        self._clear()
+        self.extend(metrics)
+
+    def insert(self, index: int, value: Metric) -> None:
+        if index >= len(self):
+            self.append(value)
+            return
+        metrics = list(self)
+        metrics.insert(index, value)
+        self._rebuild(metrics)
+
+    def append(self, value: Metric) -> None:
+        key_id = self._key_index.get(value.key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._key_index[value.key] = key_id
+            self._keys.append(value.key)
+            self._positions.append(array("q"))
+
+        position = len(self)
+        column_value = _column_value(value.value)
+        if column_value is not None and _is_int64(value.timestamp) and _is_int64(value.step):
+            (metric_value, kind), timestamp, step = column_value, value.timestamp, value.step
+        else:
+            self._originals[position] = value
+            metric_value, kind = _as_float(value.value), _FLOAT
+            timestamp, step = _as_int64(value.timestamp), _as_int64(value.step)
+        self._key_ids.append(key_id)
+        self._values.append(metric_value)
+        self._kinds.append(kind)
+        self._timestamps.append(timestamp)
+        self._steps.append(step)
+
+        positions = self._positions[key_id]
+        positions.append(position)
+        if self.max_points_per_key is not None and len(positions) > self.max_points_per_key:
+            self._downsample(key_id)
+
+    def extend(self, values: Iterable[Metric]) -> None:
+        if values is self:
+            values = list(values)
+        for value in values:
+            self.append(value)
+
+    def clear(self) -> None:
+        self._clear()
+
+    def _downsample(self, key_id: int) -> None:
+        # Every second metric of the key, never the first or the latest one
+        keep = np.ones(len(self), dtype=bool)
+        keep[np.array(self._positions[key_id][1:-1:2], dtype=np.int64)] = False
+        new_positions = np.cumsum(keep) - 1
+
+        # Copies, since the arrays cannot grow while numpy holds a view on them
+        key_ids = np.array(self._key_ids, dtype=np.int64)[keep]
+        self._key_ids = array("q", key_ids.tobytes())
+        self._values = array("d", np.array(self._values, dtype=np.float64)[keep].tobytes())
+        self._kinds = array("b", np.array(self._kinds, dtype=np.int8)[keep].tobytes())
+        self._timestamps = array("q", np.array(self._timestamps, dtype=np.int64)[keep].tobytes())
+        self._steps = array("q", np.array(self._steps, dtype=np.int64)[keep].tobytes())
+        self._originals = {
+            int(new_positions[position]): metric
+            for position, metric in self._originals.items()
+            if keep[position]
+        }
+
+        order = np.argsort(key_ids, kind="stable")
+        bounds = np.cumsum(np.bincount(key_ids, minlength=len(self._keys)))[:-1]
+        self._positions = [
+            array("q", positions.tobytes()) for positions in np.split(order, bounds)
+        ]
+
+    @property
+    def keys(self) -> list[str]:
+        """Get the metric keys, in the order they were first logged.
+
+        Returns:
+            list[str]: the keys
+        """
+        return list(self._keys)
+
+    def first(self, key: str) -> Metric | None:
+        """Get the first metric logged with a key.
+
+        Args:
+            key (str): the metric key.
+
+        Returns:
+            Metric | None: the metric, None if the key was not logged
+        """
+        key_id = self._key_index.get(key)
+        return None if key_id is None else self._metric(self._positions[key_id][0])
+
+    def latest(self, key: str) -> Metric | None:
+        """Get the latest metric logged with a key.
+
+        Args:
+            key (str): the metric key.
+
+        Returns:
+            Metric | None: the metric, None if the key was not logged
+        """
+        key_id = self._key_index.get(key)
+        return None if key_id is None else self._metric(self._positions[key_id][-1])
+
+    def contains(self, key: str, value: object = None) -> bool:
+        """Check if a metric key was logged, optionally with a certain value.
+
+        Args:
+            key (str): the metric key.
+            value (object, optional): the value. Defaults to None, any value.
+
+        Returns:
+            bool: whether a metric with the key (and value) is in the store
+        """
+        key_id = self._key_index.get(key)
+        if key_id is None or value is None:
+            return key_id is not None
+        column_value = _column_value(value)
+        if not self._originals and column_value is not None:
+            return bool(np.any(self._gather(self._values, key_id) == column_value[0]))
+        # Stops at the first match, like a scan of a list
+        return any(self._value(position) == value for position in self._positions[key_id])
+
+    def query(
+        self, key: str, start_step: int | None = None, end_step: int | None = None
+    ) -> list[Metric]:
+        """Get the metrics of a key logged within a range of steps.
+
+        Args:
+            key (str): the metric key.
+            start_step (int | None, optional): first step (inclusive). Defaults to None.
+            end_step (int | None, optional): last step (inclusive). Defaults to None.
+
+        Returns:
+            list[Metric]: the metrics, in the order they were logged
+        """
+        key_id = self._key_index.get(key)
+        if key_id is None:
+            return []
+        positions = np.array(self._positions[key_id], dtype=np.int64)
+        steps = self._gather(self._steps, key_id)
+        mask = np.ones(len(positions), dtype=bool)
+        if start_step is not None:
+            mask &= steps >= start_step
+        if end_step is not None:
+            mask &= steps <= end_step
+        return [self._metric(position) for position in positions[mask].tolist()]
+
+    def _gather(self, column: array, key_id: int) -> np.ndarray:
+        # Copies the elements of a key out of a column. The views on the arrays are released
+        # on return, since the arrays cannot grow while numpy holds a view on them.
+        positions = np.frombuffer(self._positions[key_id], dtype=np.int64)
+        return np.frombuffer(column, dtype=np.dtype(column.typecode))[positions]
+
+    def _columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Copies, since the arrays cannot grow while numpy holds a view on them
+        return (
+            np.array(self._key_ids, dtype=np.int64),
+            np.array(self._values, dtype=np.float64),
+            np.array(self._timestamps, dtype=np.int64),
+            np.array(self._steps, dtype=np.int64),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export to a DataFrame with the columns key (categorical), value, timestamp and step.
+
+        Values, timestamps and steps are converted to float and int, see `MetricStore`.
+
+        Returns:
+            pd.DataFrame: one row per metric
+        """
+        key_ids, values, timestamps, steps = self._columns()
+        keys = pd.Categorical.from_codes(key_ids, categories=pd.Index(self._keys, dtype=object))
+        return pd.DataFrame(
+            {"key": keys, "value": values, "timestamp": timestamps, "step": steps}, copy=False
+        )
+
+    def to_arrow(self):
+        """Export to a `pyarrow.Table`, see `to_frame`, with a dictionary encoded key.
+
+        Returns:
+            pyarrow.Table: one row per metric
+        """
+        import pyarrow as pa
+
+        key_ids, values, timestamps, steps = self._columns()
+        keys = pa.DictionaryArray.from_arrays(key_ids, pa.array(self._keys, type=pa.string()))
+        return pa.table({"key": keys, "value": values, "timestamp": timestamps, "step": steps})
+
+
+@dataclass
+class LogBatch:
+    """Items logged to a `MetaDataLogger` since the previous `MetaDataLogger.drain`."""
+
+    metrics: list[Metric] = field(default_factory=list)
+    params: dict[str, str] = field(default_factory=dict)
+    db_logs: dict[str, Hashable] = field(default_factory=dict)
+    prediction_log: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.metrics) + len(self.params) + len(self.db_logs) + len(self.prediction_log)
+
+    def merge(self, newer: LogBatch) -> LogBatch:
+        """Combine with a batch that was logged later, whose parameters and db logs win.
+
+        Args:
+            newer (LogBatch): the later batch.
+
+        Returns:
+            LogBatch: the combined batch
+        """
+        return LogBatch(
+            self.metrics + newer.metrics,
+            self.params | newer.params,
+            self.db_logs | newer.db_logs,
+            self.prediction_log + newer.prediction_log,
+        )
+
+
 class MetaDataLogger:
     """A logging object with specific methods to keep track of metrics, parameters,
     artifacts/files and images one might want to log to mlflow later on. The information is
@@ -33,17 +417,82 @@ class MetaDataLogger:
     >>> # Reset cache
     >>> md_logger.reset_cache()
     >>> print(md_logger.metrics)
+
+    The metrics are kept in a `MetricStore`, which can be used like a list of metrics. Set
+    `max_points_per_key` to downsample long series of metrics with the same key.
+
+    The logger can be used from several threads. `drain` returns the metrics, parameters, db
+    logs and prediction log since the previous `drain`, for instance to write them to a sink in
+    the background, and `on_log` is called with the number of pending items after every log
+    call. Drained items stay in the logger.
     """
 
-    metrics: list[Metric]
     params: dict[str, str]
     artifacts: dict[str | PathLike, str | None]
     db_logs: dict[str, Hashable]
     prediction_log: list[str]
 
-    def __init__(self):
+    def __init__(self, max_points_per_key: int | None = None):
+        """
+        Args:
+            max_points_per_key (int | None, optional): maximum number of metrics to keep per
+                key, see `MetricStore`. Defaults to None, keeping all metrics.
+        """
+        self.max_points_per_key = max_points_per_key
+        self.on_log: Callable[[int], None] | None = None
+        self._lock = threading.RLock()
         self.reset_cache()
 
+    def __getstate__(self) -> dict:
+        # Locks and callbacks cannot be pickled, for instance when a model pickles its logger
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["on_log"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        # Loggers pickled by earlier versions have a list of metrics and no other new attributes
+        metrics = state.pop("metrics", None)
+        self.__dict__.update(state)
+        self.__dict__.setdefault("max_points_per_key", None)
+        self.__dict__.setdefault("on_log", None)
+        self.__dict__.setdefault("_pending", 0)
+        self.__dict__.setdefault("_unwritten", LogBatch())
+        self._lock = threading.RLock()
+        if metrics is not None:
+            self.metrics = metrics
+
+    def _logged(self, count: int) -> None:
+        # Called with the lock held
+        self._pending += count
+        if self.on_log is not None:
+            self.on_log(self._pending)
+
+    @property
+    def pending(self) -> int:
+        """Get the number of metrics, parameters, db logs and prediction logs since the
+        previous `drain` or `reset_cache`.
+
+        Returns:
+            int: the number of items
+        """
+        return self._pending
+
+    @property
+    def metrics(self) -> MetricStore:
+        """Get the logged metrics.
+
+        Returns:
+            MetricStore: the metrics, in the order they were logged
+        """
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Iterable[Metric]) -> None:
+        if not isinstance(metrics, MetricStore):
+            metrics = MetricStore(metrics, self.max_points_per_key)
+        self._metrics = metrics
+
     def log_metric(self, metric: Metric):
         """Log a Metric.
 
@@ -52,7 +501,10 @@ class MetaDataLogger:
         Args:
             metric (Metric): Any Metric
         """
-        self.metrics.append(metric)
+        with self._lock:
+            self.metrics.append(metric)
+            self._unwritten.metrics.append(metric)
+            self._logged(1)
 
     def log_metrics(self, metrics: list[Metric]):
         """Log multiple metrics
@@ -60,7 +512,11 @@ class MetaDataLogger:
         Args:
             metrics (list[Metric]) : Each element is a metric
         """
-        self.metrics += metrics
+        metrics = list(metrics)
+        with self._lock:
+            self.metrics.extend(metrics)
+            self._unwritten.metrics.extend(metrics)
+            self._logged(len(metrics))
 
     def log_params(self, params: dict[str, str]):
         """Log multiple parameters. If parameter was logged in same run before, it is overwritten.
@@ -69,7 +525,10 @@ class MetaDataLogger:
             params (dict[str, str]): Each dictionary entry denotes one parameter
                 as key value pair.
         """
-        self.params |= params
+        with self._lock:
+            self.params |= params
+            self._unwritten.params |= params
+            self._logged(len(params))
 
     def log_db_logs(self, db_log: dict[str, Hashable]):
         """Log special elements that will be stored in a DB (access by API). If the element was
@@ -78,7 +537,10 @@ class MetaDataLogger:
         Args:
             params (dict[str, Hashable]): Each dictionary entry denotes one lo as key value pair.
         """
-        self.db_logs |= db_log
+        with self._lock:
+            self.db_logs |= db_log
+            self._unwritten.db_logs |= db_log
+            self._logged(len(db_log))
 
     def log_artifacts_in_dir(self, local_dir: PathLike, label: str | None = None):
         """Log an artifact / file.
@@ -109,12 +571,7 @@ class MetaDataLogger:
         Returns:
             bool: wether if the metric is inside the logger with a certain value (optional)
         """
-        for element in self.metrics:
-            if metric_name == element.key and (
-                metric_value is None or metric_value == element.value
-            ):
-                return True
-        return False
+        return self.metrics.contains(metric_name, metric_value)
 
     def get_metric_value(self, metric_name: str) -> float | None:
         """Get the metric value from the logger if it exists, else None
@@ -125,10 +582,8 @@ class MetaDataLogger:
         Returns:
             float | None: MEtrics value if exists, else None
         """
-        for element in self.metrics:
-            if metric_name == element.key:
-                return element.value
-        return None
+        metric = self.metrics.first(metric_name)
+        return None if metric is None else metric.value
 
     def get_artifact_names(self) -> set[str]:
         """Get get all artifact names that have been stored in the logger
@@ -152,13 +607,48 @@ class MetaDataLogger:
         Args:
             prediction_log (str): Some information to log for a prediction run.
         """
-        self.prediction_log.append(prediction_log)
+        with self._lock:
+            self.prediction_log.append(prediction_log)
+            self._unwritten.prediction_log.append(prediction_log)
+            self._logged(1)
+
+    def drain(self) -> LogBatch:
+        """Take the metrics, parameters, db logs and prediction log that were logged since the
+        previous `drain`, for instance to write them elsewhere.
+
+        The logger itself keeps everything, so `get_metric_value` and `is_metric_in_metrics`
+        still find drained metrics. Use `max_points_per_key` to bound its memory.
+
+        Returns:
+            LogBatch: the items logged since the previous `drain` or `reset_cache`
+        """
+        with self._lock:
+            batch, self._unwritten = self._unwritten, LogBatch()
+            self._pending = 0
+        return batch
+
+    def restore(self, batch: LogBatch) -> None:
+        """Put a drained batch back, for instance when it could not be written, so that the
+        next `drain` returns it again.
+
+        The batch goes before everything that was logged after it was drained, parameters and
+        db logs that were logged again since keep their newer value.
+
+        Args:
+            batch (LogBatch): the batch returned by `drain`.
+        """
+        with self._lock:
+            self._unwritten = batch.merge(self._unwritten)
+            self._pending += len(batch)
 
     def reset_cache(self):
         """Clear all stored items in logger cache."""
-        self.created_on = datetime.now(timezone.utc)
-        self.metrics = []
-        self.params = {}
-        self.artifacts = {}
-        self.db_logs = {}
-        self.prediction_log = []
+        with self._lock:
+            self.created_on = datetime.now(timezone.utc)
+            self.metrics = MetricStore(max_points_per_key=self.max_points_per_key)
+            self.params = {}
+            self.artifacts = {}
+            self.db_logs = {}
+            self.prediction_log = []
+            self._unwritten = LogBatch()
+            self._pending = 0